@@ -4,6 +4,7 @@ export APP_HOST=${APP_HOST:-0.0.0.0}
 export APP_PORT=${APP_PORT:-8000}
 export UVICORN_WORKERS=${UVICORN_WORKERS:-4}
 export LOG_LEVEL=${LOG_LEVEL:-INFO}
+export GUNICORN_PRELOAD=${GUNICORN_PRELOAD:-false}
 
 
 if [ "$1" != "pytest" ] && [ -z "$(echo "$@" | grep 'test_')" ]; then
@@ -20,6 +21,6 @@ if [ "$#" -gt 0 ]; then
 else
   export GUNICORN_LOG_LEVEL=$(echo $LOG_LEVEL | tr '[:upper:]' '[:lower:]')
   echo "Starting application..."
-  # Start server with Gunicorn + UvicornWorker
-  exec gunicorn -k uvicorn.workers.UvicornWorker -w $UVICORN_WORKERS -b $APP_HOST:$APP_PORT --log-level $GUNICORN_LOG_LEVEL main:app
+  # Start server with Gunicorn + UvicornWorker (see gunicorn.conf.py, GUNICORN_PRELOAD)
+  exec gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker -w $UVICORN_WORKERS -b $APP_HOST:$APP_PORT --log-level $GUNICORN_LOG_LEVEL main:app
 fi
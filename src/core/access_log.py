@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Логгер — через getLogger, а не core.logger: core.logger сам читает access_log_config
+logger = logging.getLogger("app.access")
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class AccessLogConfig(BaseSettings):
+    enabled: bool = Field(default=True, description="Выборочный access log вместо строки uvicorn на каждый запрос")
+    sample_rate: float = Field(default=0.01, ge=0, le=1, description="Доля обычных запросов, попадающих в лог")
+    slow_ms: float = Field(default=1000.0, ge=0, description="Запросы дольше этого логируются всегда, мс")
+    error_status: int = Field(default=500, description="Ответы с этим статусом и выше логируются всегда")
+    flush_interval: float = Field(default=60.0, gt=0, description="Как часто выводить сводку по маршрутам, сек")
+
+    model_config = SettingsConfigDict(env_prefix="ACCESS_LOG_")
+
+
+access_log_config = AccessLogConfig()
+
+
+@dataclass(slots=True)
+class RouteStats:
+    count: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+
+    def add(self, seconds: float, error: bool) -> None:
+        self.count += 1
+        self.errors += error
+        self.latency_sum += seconds
+        if seconds > self.latency_max:
+            self.latency_max = seconds
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency_avg_ms": round(self.latency_sum / self.count * 1000, 2) if self.count else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 2),
+        }
+
+
+class AccessLogAggregator:
+    """
+    Счётчики по маршрутам (метод + шаблон пути) в памяти воркера.
+
+    Фоновая задача раз в flush_interval выводит по одной записи на маршрут
+    и обнуляет счётчики; записи без запросов не выводятся.
+    """
+
+    def __init__(self, flush_interval: float = access_log_config.flush_interval) -> None:
+        self.flush_interval = flush_interval
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.window_started = time.monotonic()
+        self._task: asyncio.Task | None = None
+
+    def add(self, method: str, route: str, seconds: float, error: bool) -> None:
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        stats.add(seconds, error)
+
+    def flush(self) -> None:
+        routes, self.routes = self.routes, {}
+        window = time.monotonic() - self.window_started
+        self.window_started = time.monotonic()
+        for (method, route), stats in routes.items():
+            summary = stats.as_dict()
+            logger.info(
+                f"{method} {route}: count={summary['count']} errors={summary['errors']} "
+                f"avg={summary['latency_avg_ms']}ms max={summary['latency_max_ms']}ms window={window:.0f}s",
+                extra={"access_summary": {"method": method, "route": route, "window_seconds": window, **summary}},
+            )
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="access-log-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+
+access_log_aggregator = AccessLogAggregator()
+
+
+class AccessLogMiddleware:
+    """
+    Выборочный access log (чистый ASGI, без BaseHTTPMiddleware).
+
+    Ошибки (status >= error_status, исключения) и медленные запросы логируются всегда,
+    остальные — с вероятностью sample_rate. Каждый запрос учитывается в счётчиках маршрута.
+    Должен стоять внутри CorrelationIdMiddleware — тогда в строках есть correlation_id.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        config: AccessLogConfig = access_log_config,
+        aggregator: AccessLogAggregator = access_log_aggregator,
+    ) -> None:
+        self.app = app
+        self.sample_rate = config.sample_rate
+        self.slow_seconds = config.slow_ms / 1000
+        self.error_status = config.error_status
+        self.aggregator = aggregator
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            self._record(scope, status_code, time.perf_counter() - started)
+
+    def _record(self, scope: Scope, status_code: int, seconds: float) -> None:
+        route = scope.get("route")
+        # шаблон пути, а не сам путь: число маршрутов в сводке не растёт от параметров
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+        method = scope["method"]
+        error = status_code >= self.error_status
+        self.aggregator.add(method, route_path, seconds, error)
+
+        if error:
+            reason = "error"
+        elif seconds >= self.slow_seconds:
+            reason = "slow"
+        elif self.sample_rate and random.random() < self.sample_rate:
+            reason = "sampled"
+        else:
+            return
+
+        client = scope.get("client")
+        query = scope.get("query_string", b"")
+        path = scope["path"] + ("?" + query.decode("latin-1") if query else "")
+        logger.log(
+            logging.WARNING if error else logging.INFO,
+            f'{client[0] if client else "-"} - "{method} {path} HTTP/{scope.get("http_version", "1.1")}" '
+            f"{status_code} {seconds * 1000:.1f}ms [{reason}]",
+            extra={
+                "access": {
+                    "method": method,
+                    "route": route_path,
+                    "status": status_code,
+                    "latency_ms": round(seconds * 1000, 2),
+                    "reason": reason,
+                }
+            },
+        )
@@ -0,0 +1,371 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.concurrency import run_in_threadpool
+
+from core.metrics import CACHE_ERRORS, CACHE_REQUESTS, metrics_config
+
+logger = logging.getLogger("app.cache")
+
+
+class CacheConfig(BaseSettings):
+    enabled: bool = Field(default=True)
+    ttl: float = Field(default=30.0, gt=0, description="TTL записи по умолчанию, сек")
+    max_entries: int = Field(default=1024, gt=0, description="Размер LRU в памяти воркера")
+    # Инвалидация из другого воркера до памяти этого воркера не доходит — запись в памяти
+    # живёт не дольше local_ttl, если включён Redis
+    local_ttl: float = Field(default=5.0, gt=0)
+    redis_url: str = Field(default="", description="redis://host:6379/0; пусто — только кэш в памяти")
+    redis_timeout: float = Field(default=0.5, gt=0, description="Таймаут операций с Redis, сек")
+    redis_retry: float = Field(default=5.0, ge=0, description="Пауза после ошибки Redis, сек")
+    key_prefix: str = Field(default="cache:")
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_")
+
+
+cache_config = CacheConfig()
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    LRU с TTL в памяти воркера. Значения не копируются — изменять их нельзя.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache:
+    """
+    Общий для воркеров уровень кэша. Клиент redis.asyncio создаётся при первом
+    обращении — в воркере, а не в мастере gunicorn --preload. Значения — JSON.
+    """
+
+    def __init__(self, url: str, timeout: float, prefix: str) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.prefix = prefix
+        self._client: Any = None
+
+    def client(self) -> Any:
+        if self._client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as exc:
+                raise RuntimeError("Для CACHE_REDIS_URL нужен пакет redis") from exc
+            self._client = redis.Redis.from_url(
+                self.url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout
+            )
+        return self._client
+
+    async def get(self, key: str) -> Any:
+        data = await self.client().get(self.prefix + key)
+        return _MISSING if data is None else json.loads(data)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client().set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self.client().unlink(self.prefix + key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        client = self.client()
+        batch = []
+        async for key in client.scan_iter(match=self.prefix + prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await client.unlink(*batch)
+                batch.clear()
+        if batch:
+            await client.unlink(*batch)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш: LRU в памяти воркера, затем (если настроен) Redis.
+
+    Промахи по одному ключу в воркере объединяются (single-flight): данные загружает
+    первый запрос (в своей задаче, со своими зависимостями), остальные ждут его результата.
+    Ошибки Redis не ломают запрос — кэш работает только в памяти до истечения паузы redis_retry.
+
+    Значения приводятся jsonable_encoder — в кэше одинаковые данные в памяти и в Redis.
+    """
+
+    def __init__(self, config: CacheConfig = cache_config, redis: RedisCache | None = None) -> None:
+        self.config = config
+        self.memory = LRUCache(config.max_entries)
+        if redis is None and config.redis_url:
+            redis = RedisCache(config.redis_url, config.redis_timeout, config.key_prefix)
+        self.redis = redis
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._redis_down_until = 0.0
+
+    @staticmethod
+    def full_key(namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    def _count(self, namespace: str, result: str) -> None:
+        if metrics_config.enabled:
+            CACHE_REQUESTS.inc((namespace, result))
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    async def _redis_call(self, operation: str, call: Awaitable[Any]) -> Any:
+        try:
+            return await asyncio.wait_for(call, self.config.redis_timeout)
+        except Exception as exc:
+            self._redis_down_until = time.monotonic() + self.config.redis_retry
+            if metrics_config.enabled:
+                CACHE_ERRORS.inc()
+            logger.warning(f"Redis cache {operation} failed, using in-memory cache only: {exc!r}")
+            return _MISSING
+
+    def _local_ttl(self, ttl: float) -> float:
+        return min(ttl, self.config.local_ttl) if self.redis is not None else ttl
+
+    async def get_or_set(
+        self, namespace: str, key: str, factory: Callable[[], Awaitable[Any]], ttl: float | None = None
+    ) -> Any:
+        ttl = ttl or self.config.ttl
+        full_key = self.full_key(namespace, key)
+
+        value = self.memory.get(full_key)
+        if value is not _MISSING:
+            self._count(namespace, "hit_memory")
+            return value
+
+        while True:
+            pending = self._inflight.get(full_key)
+            if pending is None:
+                return await self._load_as_owner(namespace, full_key, factory, ttl)
+
+            self._count(namespace, "coalesced")
+            try:
+                # shield: отмена ожидающего запроса не должна отменять общий результат
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not pending.cancelled() or (current is not None and current.cancelling()):
+                    raise
+                # запрос-владелец загрузки отменён — загружаем сами
+
+    async def _load_as_owner(
+        self, namespace: str, full_key: str, factory: Callable[[], Awaitable[Any]], ttl: float
+    ) -> Any:
+        # Загрузка идёт в задаче запроса-владельца, а не в отдельной: factory использует его
+        # зависимости (сессию БД и т.п.), которые живут ровно до конца этого запроса.
+        # Остальные запросы ждут future; если владельца отменили, они повторяют загрузку сами.
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._load(namespace, full_key, factory, ttl, future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # ошибку получили ожидающие; если их нет — не пишем "never retrieved"
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(full_key) is future:
+                del self._inflight[full_key]
+
+    def _invalidated(self, full_key: str, future: asyncio.Future) -> bool:
+        # invalidate() во время загрузки убирает её из _inflight: прочитанное могло устареть
+        return self._inflight.get(full_key) is not future
+
+    async def _load(
+        self,
+        namespace: str,
+        full_key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: float,
+        future: asyncio.Future,
+    ) -> Any:
+        if self._redis_available():
+            value = await self._redis_call("get", self.redis.get(full_key))
+            if value is not _MISSING:
+                self._count(namespace, "hit_redis")
+                if not self._invalidated(full_key, future):
+                    self.memory.set(full_key, value, self._local_ttl(ttl))
+                return value
+
+        self._count(namespace, "miss")
+        value = jsonable_encoder(await factory())
+        if self._invalidated(full_key, future):
+            return value
+        self.memory.set(full_key, value, self._local_ttl(ttl))
+        if self._redis_available():
+            await self._redis_call("set", self.redis.set(full_key, value, ttl))
+        return value
+
+    async def invalidate(self, namespace: str, key: str | None = None) -> None:
+        """Удаляет запись key или все записи namespace (в памяти этого воркера и в Redis)."""
+        if key is None:
+            prefix = self.full_key(namespace, "")
+            self.memory.delete_prefix(prefix)
+            for full_key in [k for k in self._inflight if k.startswith(prefix)]:
+                del self._inflight[full_key]
+            if self._redis_available():
+                await self._redis_call("invalidate", self.redis.delete_prefix(prefix))
+            return
+
+        full_key = self.full_key(namespace, key)
+        self.memory.delete(full_key)
+        self._inflight.pop(full_key, None)
+        if self._redis_available():
+            await self._redis_call("invalidate", self.redis.delete(full_key))
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+
+
+response_cache = ResponseCache()
+
+
+def get_response_cache() -> ResponseCache:
+    """Зависимость FastAPI: Depends(get_response_cache); подменяется через app.dependency_overrides."""
+    return response_cache
+
+
+_KEY_TYPES = (str, int, float, bool, Enum, UUID, date, datetime, BaseModel, type(None))
+
+
+def make_key(**params: Any) -> str:
+    """Ключ из параметров запроса; тот же вызов с теми же параметрами — для invalidate()."""
+    return json.dumps(jsonable_encoder(params), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _key_params(kwargs: dict[str, Any], vary: tuple[str, ...] | None) -> dict[str, Any]:
+    if vary is not None:
+        return {name: kwargs.get(name) for name in vary}
+    # по умолчанию — параметры пути/запроса; сессии, Request и прочие зависимости пропускаются
+    return {
+        name: value
+        for name, value in kwargs.items()
+        if isinstance(value, _KEY_TYPES)
+        or (isinstance(value, list | tuple) and all(isinstance(item, _KEY_TYPES) for item in value))
+    }
+
+
+def cached(
+    namespace: str,
+    ttl: float | None = None,
+    vary: tuple[str, ...] | None = None,
+    cache: ResponseCache | None = None,
+) -> Callable:
+    """
+    Кэширует результат эндпоинта по namespace и параметрам запроса.
+
+    vary — имена параметров для ключа (по умолчанию все простые параметры). Декоратор
+    ставится под @router.get(...): сигнатура эндпоинта сохраняется для FastAPI.
+
+    .. code-block:: python
+
+        @router.get("/items/{item_id}")
+        @cached("items", ttl=60, vary=("item_id",))
+        async def get_item(item_id: int, session: AsyncSession = Depends(get_async_session)): ...
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        is_async = inspect.iscoroutinefunction(endpoint)
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not is_async:
+                call = functools.partial(run_in_threadpool, endpoint, *args, **kwargs)
+            else:
+                call = functools.partial(endpoint, *args, **kwargs)
+            if not cache_config.enabled:
+                return await call()
+            key = make_key(**_key_params(kwargs, vary))
+            return await (cache or response_cache).get_or_set(namespace, key, call, ttl)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*namespaces: str, cache: ResponseCache | None = None) -> Callable:
+    """
+    Сбрасывает namespaces после успешного выполнения эндпоинта (для записи).
+
+    .. code-block:: python
+
+        @router.post("/items")
+        @invalidates("items")
+        async def create_item(...): ...
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        is_async = inspect.iscoroutinefunction(endpoint)
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if is_async:
+                result = await endpoint(*args, **kwargs)
+            else:
+                result = await run_in_threadpool(endpoint, *args, **kwargs)
+            for namespace in namespaces:
+                await (cache or response_cache).invalidate(namespace)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+import sqlalchemy as sa
+from asgi_correlation_id.context import correlation_id
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from core.logger import logger
+from core.metrics import DB_REPLICA_LAG, DB_REPLICA_UP, DB_SESSIONS, metrics_config
+from db.postgres.base import get_async_session
+
+# На самой реплике (pg_is_in_recovery) — сколько секунд назад применена последняя транзакция;
+# если всё полученное уже применено или это не реплика — 0
+LAG_QUERY = sa.text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class DBRoutingConfig(BaseSettings):
+    replica_dsns: str = Field(default="", description="DSN реплик через запятую; пусто — всё идёт в primary")
+    max_lag: float = Field(default=5.0, ge=0, description="Реплика с большим отставанием не получает чтения, сек")
+    check_interval: float = Field(default=5.0, gt=0, description="Период проверки реплик, сек")
+    check_timeout: float = Field(default=2.0, gt=0)
+    sticky_seconds: float = Field(
+        default=10.0, ge=0, description="После записи чтения с тем же correlation_id идут в primary, сек"
+    )
+    pool_size: int = Field(default=5, gt=0)
+    max_overflow: int = Field(default=10, ge=0)
+
+    model_config = SettingsConfigDict(env_prefix="DB_ROUTING_")
+
+    @property
+    def dsns(self) -> list[str]:
+        return [dsn.strip() for dsn in self.replica_dsns.split(",") if dsn.strip()]
+
+
+db_routing_config = DBRoutingConfig()
+
+
+class Replica:
+    def __init__(self, dsn: str) -> None:
+        url = make_url(dsn)
+        self.dsn = dsn
+        self.name = f"{url.host}:{url.port or 5432}/{url.database}"  # без пароля — для логов и метрик
+        self.engine: AsyncEngine | None = None
+        self.sessionmaker: async_sessionmaker[AsyncSession] | None = None
+        self.healthy = False  # до первой проверки чтения на реплику не идут
+        self.lag: float | None = None
+        self.error: str | None = None
+
+    def open(self, pool_size: int, max_overflow: int) -> None:
+        self.engine = create_async_engine(self.dsn, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def measure_lag(self) -> float:
+        async with self.engine.connect() as connection:
+            return float((await connection.execute(LAG_QUERY)).scalar_one())
+
+    async def close(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = self.sessionmaker = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"healthy": self.healthy, "lag_seconds": self.lag, "error": self.error}
+
+
+class ReplicaRouter:
+    """
+    Выбор сессии для чтения: реплика или primary.
+
+    Фоновая задача раз в check_interval проверяет реплики (доступность и отставание);
+    чтения распределяются round-robin по здоровым репликам с lag <= max_lag, а если
+    таких нет — идут в primary. Read-your-writes: после выдачи сессии на запись
+    чтения с тем же correlation_id (тот же запрос или клиент, передающий X-Request-ID)
+    sticky_seconds идут в primary. Привязка хранится в памяти воркера.
+
+    Движки реплик создаются в start() — в воркере, а не в мастере gunicorn --preload.
+    """
+
+    def __init__(self, config: DBRoutingConfig = db_routing_config) -> None:
+        self.config = config
+        self.replicas = [Replica(dsn) for dsn in config.dsns]
+        self._round_robin = itertools.count()
+        self._sticky: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+
+    async def _check(self, replica: Replica) -> None:
+        was_healthy = replica.healthy
+        try:
+            replica.lag = await asyncio.wait_for(replica.measure_lag(), self.config.check_timeout)
+        except Exception as exc:
+            replica.healthy, replica.lag, replica.error = False, None, f"{type(exc).__name__}: {exc}"
+        else:
+            replica.healthy, replica.error = True, None
+
+        if was_healthy and not replica.healthy:
+            logger.warning(f"DB replica {replica.name} is unavailable: {replica.error}")
+        elif not was_healthy and replica.healthy:
+            logger.info(f"DB replica {replica.name} is available, lag {replica.lag:.3f}s")
+        if metrics_config.enabled:
+            DB_REPLICA_UP.set(float(replica.healthy), (replica.name,))
+            DB_REPLICA_LAG.set(replica.lag if replica.lag is not None else -1.0, (replica.name,))
+
+    def _prune_sticky(self, now: float) -> None:
+        # _sticky упорядочен по сроку (mark_write переставляет ключ в конец, окно одно для всех):
+        # истёкшие записи — всегда в начале словаря
+        while self._sticky:
+            cid, until = next(iter(self._sticky.items()))
+            if until > now:
+                break
+            del self._sticky[cid]
+
+    async def refresh(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+        self._prune_sticky(time.monotonic())
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.check_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("DB replica check failed")
+
+    async def start(self) -> None:
+        if not self.replicas or self._task is not None:
+            return
+        for replica in self.replicas:
+            replica.open(self.config.pool_size, self.config.max_overflow)
+        await self.refresh()
+        self._task = asyncio.create_task(self._loop(), name="db-replica-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.close()
+
+    def mark_write(self) -> None:
+        # без реплик все чтения и так идут в primary — привязка не нужна
+        if not self.replicas or not self.config.sticky_seconds:
+            return
+        cid = correlation_id.get()
+        if not cid:
+            return
+        now = time.monotonic()
+        self._prune_sticky(now)
+        self._sticky.pop(cid, None)
+        self._sticky[cid] = now + self.config.sticky_seconds
+
+    def _is_sticky(self) -> bool:
+        cid = correlation_id.get()
+        return cid is not None and self._sticky.get(cid, 0.0) > time.monotonic()
+
+    def route(self) -> tuple[Replica | None, str]:
+        """Реплика для чтения (None — primary) и причина выбора для метрик."""
+        if not self.replicas:
+            return None, "primary"
+        if self._is_sticky():
+            return None, "sticky"
+        eligible = [r for r in self.replicas if r.healthy and r.lag is not None and r.lag <= self.config.max_lag]
+        if not eligible or self._task is None:
+            return None, "fallback"
+        return eligible[next(self._round_robin) % len(eligible)], "replica"
+
+
+replica_router = ReplicaRouter()
+
+
+@asynccontextmanager
+async def _primary_session() -> AsyncIterator[AsyncSession]:
+    # get_async_session — генератор-зависимость из пакета db: ошибку запроса передаём в него,
+    # чтобы его собственная обработка (rollback / commit) отработала как при Depends
+    sessions = get_async_session()
+    session = await anext(sessions)
+    try:
+        yield session
+    except BaseException as exc:
+        with suppress(StopAsyncIteration):
+            await sessions.athrow(exc)
+        raise
+    else:
+        with suppress(StopAsyncIteration):
+            await anext(sessions)
+    finally:
+        await sessions.aclose()
+
+
+def _count(target: str) -> None:
+    if metrics_config.enabled:
+        DB_SESSIONS.inc((target,))
+
+
+async def get_write_session() -> AsyncIterator[AsyncSession]:
+    """Зависимость для эндпоинтов, которые пишут: primary + read-your-writes для correlation_id."""
+    _count("primary")
+    replica_router.mark_write()
+    try:
+        async with _primary_session() as session:
+            yield session
+    finally:
+        # окно отсчитывается от конца запроса: запись видна в primary только после commit
+        replica_router.mark_write()
+
+
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Зависимость для эндпоинтов, которые только читают: реплика, если это безопасно, иначе primary."""
+    replica, target = replica_router.route()
+    _count(target)
+    if replica is None:
+        async with _primary_session() as session:
+            yield session
+        return
+    async with replica.sessionmaker() as session:
+        yield session
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from core.logger import logger
+
+# Проверка зависимости: успешно завершилась — ок, исключение / таймаут — зависимость недоступна
+HealthCheck = Callable[[], Awaitable[Any]]
+
+
+class HealthConfig(BaseSettings):
+    ttl: float = Field(default=5.0, gt=0, description="Как часто фоновая задача перепроверяет зависимости, сек")
+    check_timeout: float = Field(default=2.0, gt=0, description="Таймаут одной проверки, сек")
+    stale_after: float = Field(
+        default=0.0, ge=0, description="Результат старше этого считается устаревшим (0 — 3 * ttl), сек"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="HEALTH_")
+
+
+health_config = HealthConfig()
+
+
+@dataclass(frozen=True, slots=True)
+class CheckResult:
+    ok: bool
+    seconds: float
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class HealthReport:
+    checks: dict[str, CheckResult] = field(default_factory=dict)
+    checked_at: float = 0.0  # time.monotonic()
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.checks.values())
+
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "success": self.ok,
+            "age_seconds": round(self.age(), 3),
+            "checks": {
+                name: {"ok": result.ok, "seconds": round(result.seconds, 4), "error": result.error}
+                for name, result in self.checks.items()
+            },
+        }
+
+
+class HealthMonitor:
+    """
+    Готовность сервиса по зависимостям (БД, Redis, S3, ...).
+
+    Фоновая задача раз в ttl запускает все проверки одновременно, каждую со своим
+    таймаутом, и кэширует отчёт — /health/ready только читает кэш и не трогает
+    зависимости под нагрузкой. Отчёт старше stale_after (задача зависла или не
+    запущена) считается неготовностью.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, HealthCheck] | None = None,
+        ttl: float = health_config.ttl,
+        check_timeout: float = health_config.check_timeout,
+        stale_after: float = health_config.stale_after,
+    ) -> None:
+        self.checks: dict[str, HealthCheck] = dict(checks or {})
+        self.ttl = ttl
+        self.check_timeout = check_timeout
+        self.stale_after = stale_after or 3 * ttl
+        self.report: HealthReport | None = None
+        self._task: asyncio.Task | None = None
+
+    def add_check(self, name: str, check: HealthCheck) -> None:
+        self.checks[name] = check
+
+    async def _run_check(self, name: str, check: HealthCheck) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.check_timeout)
+        except TimeoutError:
+            return CheckResult(False, time.perf_counter() - started, f"timeout after {self.check_timeout}s")
+        except Exception as exc:
+            return CheckResult(False, time.perf_counter() - started, f"{type(exc).__name__}: {exc}")
+        return CheckResult(True, time.perf_counter() - started)
+
+    async def refresh(self) -> HealthReport:
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(name, self.checks[name]) for name in names))
+        report = HealthReport(dict(zip(names, results, strict=True)), time.monotonic())
+
+        previous = self.report
+        for name, result in report.checks.items():
+            was_ok = previous.checks[name].ok if previous and name in previous.checks else True
+            if was_ok and not result.ok:
+                logger.warning(f"Health check '{name}' failed: {result.error}")
+            elif not was_ok and result.ok:
+                logger.info(f"Health check '{name}' recovered")
+
+        self.report = report
+        return report
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:  # сами проверки не бросают — это ошибка монитора
+                logger.exception("Health monitor refresh failed")
+            await asyncio.sleep(self.ttl)
+
+    async def start(self) -> None:
+        """
+        Первая проверка — сразу (к первой пробе отчёт уже есть), дальше — в фоне.
+        """
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._loop(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """
+        (готов ли сервис, тело ответа) по кэшированному отчёту, без обращения к зависимостям.
+        """
+        report = self.report
+        if report is None:
+            return False, {"success": False, "errors": ["health checks have not run yet"]}
+        body = report.as_dict()
+        if report.age() > self.stale_after:
+            body["success"] = False
+            body["errors"] = [f"health report is stale ({report.age():.1f}s old)"]
+            return False, body
+        return report.ok, body
@@ -0,0 +1,207 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from enum import StrEnum
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson — опционально, без него json.dumps
+    orjson = None
+
+
+class OverflowPolicy(StrEnum):
+    drop_new = "drop_new"  # очередь полна — новая запись отбрасывается
+    drop_old = "drop_old"  # вытесняется самая старая запись в очереди
+    block = "block"  # вызывающий ждёт места в очереди (без потерь, но может блокировать event loop)
+
+
+# Атрибуты LogRecord; всё остальное в __dict__ пришло через extra=
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "correlation_id"}
+
+
+class FastJsonFormatter(logging.Formatter):
+    """
+    JSON formatter с фиксированным набором полей (LOG_FIELDS) и extra записи.
+
+    Одна запись — один dict и один вызов сериализатора (orjson, если установлен):
+    без разбора format-строки на каждую запись, как у pythonjsonlogger.
+    request_id — correlation_id запроса (asgi_correlation_id).
+    """
+
+    def __init__(self, fields: list[str] | str, datefmt: str | None = None, extras: bool = True) -> None:
+        super().__init__(datefmt=datefmt)
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(",") if name.strip()]
+        self.fields = tuple(fields)
+        self.extras = extras
+
+    def _value(self, name: str, record: logging.LogRecord) -> Any:
+        if name == "message":
+            return record.getMessage()
+        if name == "asctime":
+            return self.formatTime(record, self.datefmt)
+        if name == "request_id":
+            return getattr(record, "correlation_id", None)
+        if name == "exc_info":
+            if record.exc_info:
+                return self.formatException(record.exc_info)
+            return record.exc_text
+        return getattr(record, name, None)
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {name: self._value(name, record) for name in self.fields}
+        if record.exc_info and "exc_info" not in data:
+            data["exc_info"] = self.formatException(record.exc_info)
+        if self.extras:
+            for key, value in record.__dict__.items():
+                if key not in _RECORD_ATTRS and key not in data:
+                    data[key] = value
+        if orjson is not None:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler с ограниченной очередью: вызывающий код только кладёт запись в очередь,
+    запись в stdout и форматирование — в потоке QueueListener.
+
+    Переполнение — по policy; отброшенные записи считаются в dropped (по уровням).
+    Фильтры этого хендлера (correlation_id) выполняются в вызывающем потоке/задаче.
+    """
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy = OverflowPolicy.drop_new) -> None:
+        super().__init__(queue.Queue(maxsize))
+        self.policy = OverflowPolicy(policy)
+        self.dropped: Counter[str] = Counter()
+        self.dropped_total = 0
+        self._drop_lock = threading.Lock()
+
+    def _count_drop(self, record: logging.LogRecord) -> None:
+        with self._drop_lock:
+            self.dropped[record.levelname] += 1
+            self.dropped_total += 1
+
+    def dropped_snapshot(self) -> dict[str, int]:
+        # dropped меняют потоки-производители — поток listener читает только копию под блокировкой
+        with self._drop_lock:
+            return dict(self.dropped)
+
+    def reset_dropped(self) -> None:
+        self._drop_lock = threading.Lock()
+        self.dropped.clear()
+        self.dropped_total = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # В отличие от QueueHandler.prepare не форматируем запись здесь: только фиксируем
+        # сообщение (args могут измениться после вызова), форматирование — в listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy is OverflowPolicy.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.policy is OverflowPolicy.drop_new:
+                self._count_drop(record)
+                return
+        # drop_old: вытесняем самую старую запись
+        try:
+            self._count_drop(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._count_drop(record)
+
+
+class _Listener(QueueListener):
+    """
+    QueueListener, который после обработки записи сообщает о потерях из-за переполнения.
+    """
+
+    def __init__(self, handler: BoundedQueueHandler, *handlers: logging.Handler) -> None:
+        super().__init__(handler.queue, *handlers, respect_handler_level=True)
+        self.source = handler
+        self.reported = 0
+
+    def enqueue_sentinel(self) -> None:
+        # при policy=block очередь может быть полна — ждём места, а не падаем на put_nowait
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        dropped = self.source.dropped_total
+        if dropped > self.reported:
+            lost, self.reported = dropped - self.reported, dropped
+            super().handle(
+                logging.makeLogRecord(
+                    {
+                        "name": "app",
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"Log queue overflow: {lost} records dropped ({dropped} total)",
+                        "correlation_id": "-",
+                        "log_dropped": self.source.dropped_snapshot(),
+                    }
+                )
+            )
+
+
+class LogPipeline:
+    """
+    Переключает логгеры с синхронного хендлера на очередь + фоновый поток записи.
+
+    handler — хендлер из dictConfig (stdout); он переезжает в QueueListener, а в логгерах
+    его место занимает BoundedQueueHandler с его уровнем и фильтрами.
+    """
+
+    def __init__(self, handler: logging.Handler, maxsize: int, policy: OverflowPolicy) -> None:
+        self.target = handler
+        self.handler = BoundedQueueHandler(maxsize, policy)
+        self.handler.setLevel(handler.level)
+        # фильтры (correlation_id из contextvar) должны выполниться до очереди
+        for flt in list(handler.filters):
+            self.handler.addFilter(flt)
+            handler.removeFilter(flt)
+        self.listener = _Listener(self.handler, handler)
+
+    def install(self, loggers: list[logging.Logger]) -> None:
+        for logger in loggers:
+            if self.target in logger.handlers:
+                logger.removeHandler(self.target)
+                logger.addHandler(self.handler)
+        self.listener.start()
+        atexit.register(self.stop)
+        # поток listener не переживает fork (gunicorn, ProcessPoolExecutor) — в дочернем
+        # процессе нужна своя очередь и свой поток
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self.handler.queue = queue.Queue(self.handler.queue.maxsize)
+        self.handler.reset_dropped()
+        self.listener = _Listener(self.handler, self.target)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Дописывает всё, что осталось в очереди (atexit)."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    @property
+    def dropped(self) -> dict[str, int]:
+        return self.handler.dropped_snapshot()
@@ -5,6 +5,9 @@ from enum import Enum
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from core.access_log import access_log_config
+from core.log_pipeline import LogPipeline, OverflowPolicy
+
 
 class LogLevel(str, Enum):
     DEBUG = "DEBUG"
@@ -23,6 +26,11 @@ class LogFormat(str, Enum):
 class LoggerConfig(BaseSettings):
     level: LogLevel = Field(default=LogLevel.INFO)
     format: LogFormat = Field(default=LogFormat.default)
+    # Поля JSON-формата через запятую; request_id — correlation_id запроса
+    fields: str = Field(default="asctime,levelname,name,request_id,message,exc_info")
+    # Размер очереди записи логов; 0 — писать в stdout синхронно, без очереди
+    queue_size: int = Field(default=10_000, ge=0)
+    overflow: OverflowPolicy = Field(default=OverflowPolicy.drop_new)
 
     model_config = SettingsConfigDict(env_prefix="LOG_")
 
@@ -47,28 +55,8 @@ LOGGING_CONFIG = {
             "format": "[%(correlation_id)s] %(message)s",
         },
         "json": {
-            "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
-            "format": """
-                    asctime: %(asctime)s
-                    created: %(created)f
-                    filename: %(filename)s
-                    funcName: %(funcName)s
-                    levelname: %(levelname)s
-                    levelno: %(levelno)s
-                    lineno: %(lineno)d
-                    request_id: %(correlation_id)s
-                    message: %(message)s
-                    module: %(module)s
-                    msec: %(msecs)d
-                    name: %(name)s
-                    pathname: %(pathname)s
-                    process: %(process)d
-                    processName: %(processName)s
-                    relativeCreated: %(relativeCreated)d
-                    thread: %(thread)d
-                    threadName: %(threadName)s
-                    exc_info: %(exc_info)s
-                """,
+            "()": "core.log_pipeline.FastJsonFormatter",
+            "fields": log_config.fields,
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
     },
@@ -91,7 +79,12 @@ LOGGING_CONFIG = {
         },
         "uvicorn": {"handlers": ["console_handler"], "level": "INFO"},
         "uvicorn.error": {"level": "CRITICAL", "handlers": ["console_handler"], "propagate": False},
-        "uvicorn.access": {"handlers": ["console_handler"], "level": "INFO", "propagate": False},
+        # при выборочном access log (core.access_log) строка uvicorn на каждый запрос не нужна
+        "uvicorn.access": {
+            "handlers": ["console_handler"],
+            "level": "WARNING" if access_log_config.enabled else "INFO",
+            "propagate": False,
+        },
     },
     "root": {
         "level": log_config.level.value,
@@ -103,3 +96,11 @@ LOGGING_CONFIG = {
 
 logging_config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger("app")
+
+# Вызовы логгера не пишут в stdout сами: запись кладётся в ограниченную очередь,
+# форматирование и вывод — в отдельном потоке (см. core.log_pipeline)
+log_pipeline: LogPipeline | None = None
+if log_config.queue_size:
+    _console = next(h for h in logging.getLogger().handlers if h.name == "console_handler")
+    log_pipeline = LogPipeline(_console, log_config.queue_size, log_config.overflow)
+    log_pipeline.install([logging.getLogger(), *(logging.getLogger(name) for name in LOGGING_CONFIG["loggers"])])
@@ -0,0 +1,529 @@
+import asyncio
+import atexit
+import bisect
+import json
+import logging
+import math
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import weakref
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.metrics")
+
+UNMATCHED_ROUTE = "<unmatched>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class MetricsConfig(BaseSettings):
+    enabled: bool = Field(default=True)
+    # Общий каталог файлов воркеров; для gunicorn задаётся в gunicorn.conf.py до fork
+    dir: str = Field(default="")
+    collect_interval: float = Field(default=1.0, gt=0, description="Период замера лага event loop и пулов, сек")
+
+    model_config = SettingsConfigDict(env_prefix="METRICS_")
+
+
+metrics_config = MetricsConfig()
+
+
+# ---------------------------------------------------------------------------
+# Файл значений процесса
+# ---------------------------------------------------------------------------
+
+_USED = struct.Struct("<Q")
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+
+
+def _entry_size(key: bytes) -> tuple[int, int]:
+    """(смещение значения от начала записи, полный размер записи); значение выровнено на 8 байт."""
+    value_at = _KEY_LEN.size + len(key)
+    value_at += -value_at % 8
+    return value_at, value_at + _VALUE.size
+
+
+def _iter_entries(buf: Any, used: int) -> Iterator[tuple[str, int]]:
+    pos = _USED.size
+    while pos < used:
+        (key_len,) = _KEY_LEN.unpack_from(buf, pos)
+        key = bytes(buf[pos + _KEY_LEN.size : pos + _KEY_LEN.size + key_len])
+        value_at, size = _entry_size(key)
+        yield key.decode("utf-8"), pos + value_at
+        pos += size
+
+
+class MmapValues:
+    """
+    Значения метрик одного процесса в файле, отображённом в память (key -> float64).
+
+    Писатель один — процесс-владелец, поэтому обновление значения идёт без блокировок.
+    Записи только добавляются; счётчик занятых байт в заголовке обновляется последним,
+    так что читатели из других процессов не видят недописанных записей.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fp = path.open("a+b")
+        size = os.fstat(self._fp.fileno()).st_size
+        if size == 0:
+            size = _INITIAL_SIZE
+            self._fp.truncate(size)
+        self._mm = mmap.mmap(self._fp.fileno(), size)
+        self._used = _USED.unpack_from(self._mm, 0)[0] or _USED.size
+        # файл мог остаться от процесса с тем же pid — его значения продолжаем
+        self.positions = dict(_iter_entries(self._mm, self._used))
+        # новые ключи редки, но могут прийти и из потоков (синхронные пулы SQLAlchemy)
+        self._lock = threading.Lock()
+
+    def position(self, key: str) -> int:
+        pos = self.positions.get(key)
+        if pos is None:
+            pos = self._add(key)
+        return pos
+
+    def _add(self, key: str) -> int:
+        with self._lock:
+            if key in self.positions:
+                return self.positions[key]
+            encoded = key.encode("utf-8")
+            value_at, size = _entry_size(encoded)
+            if self._used + size > len(self._mm):
+                self._grow(self._used + size)
+            _KEY_LEN.pack_into(self._mm, self._used, len(encoded))
+            self._mm[self._used + _KEY_LEN.size : self._used + _KEY_LEN.size + len(encoded)] = encoded
+            _VALUE.pack_into(self._mm, self._used + value_at, 0.0)
+            pos = self._used + value_at
+            self._used += size
+            _USED.pack_into(self._mm, 0, self._used)
+            self.positions[key] = pos
+            return pos
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._mm)
+        while size < needed:
+            size *= 2
+        self._mm.flush()
+        self._fp.truncate(size)
+        self._mm.close()
+        self._mm = mmap.mmap(self._fp.fileno(), size)
+
+    def inc(self, pos: int, amount: float = 1.0) -> None:
+        mm = self._mm
+        _VALUE.pack_into(mm, pos, _VALUE.unpack_from(mm, pos)[0] + amount)
+
+    def set(self, pos: int, value: float) -> None:
+        _VALUE.pack_into(self._mm, pos, value)
+
+    def close(self) -> None:
+        self._mm.close()
+        self._fp.close()
+
+
+def read_values(path: Path) -> dict[str, float]:
+    """Снимок файла другого процесса (без mmap и без блокировок)."""
+    buf = path.read_bytes()
+    if len(buf) < _USED.size:
+        return {}
+    used = min(_USED.unpack_from(buf, 0)[0], len(buf))
+    return {key: _VALUE.unpack_from(buf, pos)[0] for key, pos in _iter_entries(buf, used)}
+
+
+# ---------------------------------------------------------------------------
+# Метрики
+# ---------------------------------------------------------------------------
+
+
+class _Store:
+    """
+    Файлы текущего процесса: counters_<pid>.db (суммируются по всем процессам, в т.ч. завершившимся)
+    и gauges_<pid>.db (показываются по живым воркерам с меткой worker).
+    """
+
+    def __init__(self) -> None:
+        self.pid: int | None = None
+        self.counters: MmapValues | None = None
+        self.gauges: MmapValues | None = None
+
+    def _open(self) -> None:
+        directory = metrics_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        self.pid = os.getpid()
+        self.counters = MmapValues(directory / f"counters_{self.pid}.db")
+        self.gauges = MmapValues(directory / f"gauges_{self.pid}.db")
+
+    def values(self, kind: str) -> MmapValues:
+        if self.pid is None:
+            self._open()
+        return self.counters if kind == "counters" else self.gauges  # type: ignore[return-value]
+
+    def reset(self) -> None:
+        # после fork файлы родителя не наши: дочерний процесс откроет свои
+        self.pid = self.counters = self.gauges = None
+
+
+METRIC_FILE_PATTERNS = ("counters_*.db", "gauges_*.db")
+
+_store = _Store()
+os.register_at_fork(after_in_child=_store.reset)
+
+_DEFAULT_DIR: Path | None = None
+
+
+def metrics_dir() -> Path:
+    global _DEFAULT_DIR
+    if metrics_config.dir or os.environ.get("METRICS_DIR"):
+        return Path(metrics_config.dir or os.environ["METRICS_DIR"])
+    if _DEFAULT_DIR is None:
+        # одиночный процесс (uvicorn без gunicorn): свой каталог, удаляется при выходе
+        _DEFAULT_DIR = Path(tempfile.gettempdir()) / f"app-metrics-{os.getpid()}"
+        atexit.register(shutil.rmtree, _DEFAULT_DIR, True)
+    return _DEFAULT_DIR
+
+
+def _key(name: str, labels: tuple[str, ...]) -> str:
+    return json.dumps([name, *labels], ensure_ascii=False, separators=(",", ":"))
+
+
+class _Metric:
+    kind = ""
+    store = "counters"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._positions: dict[tuple[str, ...], Any] = {}
+        REGISTRY[name] = self
+        os.register_at_fork(after_in_child=self._positions.clear)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1.0) -> None:
+        pos = self._positions.get(labels)
+        if pos is None:
+            pos = self._positions[labels] = _store.values(self.store).position(_key(self.name, labels))
+        _store.values(self.store).inc(pos, amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    store = "gauges"
+
+    def _pos(self, labels: tuple[str, ...]) -> int:
+        pos = self._positions.get(labels)
+        if pos is None:
+            pos = self._positions[labels] = _store.values(self.store).position(_key(self.name, labels))
+        return pos
+
+    def set(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        _store.values(self.store).set(self._pos(labels), value)
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1.0) -> None:
+        _store.values(self.store).inc(self._pos(labels), amount)
+
+
+class Histogram(_Metric):
+    """
+    Гистограмма; в файле — некумулятивные счётчики корзин, кумулятивными они
+    становятся при выводе. observe() — три обновления значения, без блокировок.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+
+    def _slots(self, labels: tuple[str, ...]) -> tuple[list[int], int, int]:
+        values = _store.values(self.store)
+        slots = (
+            [values.position(_key(f"{self.name}_bucket", (*labels, _le(b)))) for b in self.buckets],
+            values.position(_key(f"{self.name}_sum", labels)),
+            values.position(_key(f"{self.name}_count", labels)),
+        )
+        self._positions[labels] = slots
+        return slots
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        slots = self._positions.get(labels) or self._slots(labels)
+        values = _store.values(self.store)
+        buckets, sum_pos, count_pos = slots
+        values.inc(buckets[bisect.bisect_left(self.buckets, value)])
+        values.inc(sum_pos, value)
+        values.inc(count_pos)
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+REGISTRY: dict[str, _Metric] = {}
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed", ())
+LOOP_LAG = Histogram("event_loop_lag_seconds", "Event loop scheduling lag", (), LAG_BUCKETS)
+LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "Last measured event loop lag", ())
+POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds", "SQLAlchemy pool checkout time (wait + connect)", ("pool",), LATENCY_BUCKETS
+)
+POOL_SIZE = Gauge("db_pool_size", "SQLAlchemy pool size", ("pool",))
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "SQLAlchemy pool connections in use", ("pool",))
+POOL_OVERFLOW = Gauge("db_pool_overflow", "SQLAlchemy pool overflow connections", ("pool",))
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Response cache lookups by result (hit_memory, hit_redis, coalesced, miss)",
+    ("namespace", "result"),
+)
+CACHE_ERRORS = Counter("cache_redis_errors_total", "Failed Redis cache operations", ())
+DB_SESSIONS = Counter(
+    "db_sessions_total", "Sessions handed out by target (primary, replica, sticky, fallback)", ("target",)
+)
+DB_REPLICA_UP = Gauge("db_replica_up", "Replica passed the last health check", ("replica",))
+DB_REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replica replay lag at the last health check", ("replica",))
+
+
+# ---------------------------------------------------------------------------
+# Вывод в формате Prometheus
+# ---------------------------------------------------------------------------
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: list[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)) + "}"
+
+
+def collect_samples() -> dict[str, float]:
+    """
+    Значения всех процессов каталога: счётчики суммируются (включая завершившиеся воркеры),
+    gauge — только по живым воркерам, с меткой worker.
+    """
+    samples: dict[str, float] = {}
+    directory = metrics_dir()
+    if not directory.exists():
+        return samples
+    for path in directory.glob("*.db"):
+        kind, _, pid = path.stem.partition("_")
+        try:
+            values = read_values(path)
+        except FileNotFoundError:  # воркер завершился во время чтения
+            continue
+        if kind == "counters":
+            for key, value in values.items():
+                samples[key] = samples.get(key, 0.0) + value
+        elif kind == "gauges" and pid.isdigit() and _pid_alive(int(pid)):
+            for key, value in values.items():
+                name, *labels = json.loads(key)
+                samples[_key(name, (*labels, pid))] = value
+    return samples
+
+
+def generate_latest() -> str:
+    decoded: dict[str, list[tuple[list[str], float]]] = {}
+    for key, value in collect_samples().items():
+        name, *labels = json.loads(key)
+        decoded.setdefault(name, []).append((labels, value))
+
+    lines: list[str] = []
+    for metric in REGISTRY.values():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            lines.extend(_histogram_lines(metric, decoded))
+        elif isinstance(metric, Gauge):
+            names = (*metric.labelnames, "worker")
+            for labels, value in sorted(decoded.get(metric.name, [])):
+                lines.append(f"{metric.name}{_labels(names, labels)} {value}")
+        else:
+            for labels, value in sorted(decoded.get(metric.name, [])):
+                lines.append(f"{metric.name}{_labels(metric.labelnames, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: Histogram, decoded: dict[str, list[tuple[list[str], float]]]) -> Iterator[str]:
+    buckets: dict[tuple[str, ...], dict[str, float]] = {}
+    for labels, value in decoded.get(f"{metric.name}_bucket", []):
+        *series, le = labels
+        buckets.setdefault(tuple(series), {})[le] = value
+    sums = {tuple(labels): value for labels, value in decoded.get(f"{metric.name}_sum", [])}
+    counts = {tuple(labels): value for labels, value in decoded.get(f"{metric.name}_count", [])}
+
+    names = (*metric.labelnames, "le")
+    for series in sorted(buckets):
+        cumulative = 0.0
+        for bound in metric.buckets:
+            cumulative += buckets[series].get(_le(bound), 0.0)
+            yield f"{metric.name}_bucket{_labels(names, [*series, _le(bound)])} {cumulative}"
+        yield f"{metric.name}_sum{_labels(metric.labelnames, list(series))} {sums.get(series, 0.0)}"
+        yield f"{metric.name}_count{_labels(metric.labelnames, list(series))} {counts.get(series, 0.0)}"
+
+
+def mark_process_dead(pid: int) -> None:
+    """gunicorn child_exit: gauge воркера больше не показываются, счётчики остаются."""
+    (metrics_dir() / f"gauges_{pid}.db").unlink(missing_ok=True)
+
+
+def clear_metrics_files(directory: Path) -> None:
+    """Удаляет только файлы метрик (counters_*.db, gauges_*.db): каталог может быть общим."""
+    for pattern in METRIC_FILE_PATTERNS:
+        for path in directory.glob(pattern):
+            path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Сбор: HTTP, event loop, пулы SQLAlchemy
+# ---------------------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """
+    Латентность запросов по шаблону маршрута и число запросов в обработке (чистый ASGI).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            HTTP_IN_FLIGHT.inc(amount=-1)
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            HTTP_LATENCY.observe(time.perf_counter() - started, (scope["method"], route, f"{status_code // 100}xx"))
+
+
+_pools: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def _pool_name(pool: Any) -> str:
+    name = _pools.get(pool)
+    if name is None:
+        name = _pools[pool] = f"{type(pool).__name__}-{len(_pools)}"
+    return name
+
+
+def install_pool_metrics() -> None:
+    """
+    Время checkout из пулов SQLAlchemy (ожидание свободного соединения + подключение)
+    и размер / занятость пулов. Пулы создаются во внешнем пакете db, поэтому
+    инструментируется сам класс Pool.
+    """
+    from sqlalchemy.pool import Pool
+
+    if getattr(Pool.connect, "_metrics", False):
+        return
+    original = Pool.connect
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            POOL_CHECKOUT.observe(time.perf_counter() - started, (_pool_name(self),))
+
+    connect._metrics = True  # type: ignore[attr-defined]
+    Pool.connect = connect  # type: ignore[method-assign]
+
+
+def _collect_pools() -> None:
+    for pool, name in list(_pools.items()):
+        for gauge, method in ((POOL_SIZE, "size"), (POOL_CHECKED_OUT, "checkedout"), (POOL_OVERFLOW, "overflow")):
+            if hasattr(pool, method):
+                gauge.set(getattr(pool, method)(), (name,))
+
+
+class MetricsCollector:
+    """
+    Фоновая задача воркера: лаг event loop (насколько позже запланированного
+    просыпается sleep) и снимок состояния пулов.
+    """
+
+    def __init__(self, interval: float = metrics_config.collect_interval) -> None:
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            LOOP_LAG.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+            try:
+                _collect_pools()
+            except Exception:
+                logger.exception("Failed to collect pool metrics")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="metrics-collector")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+metrics_collector = MetricsCollector()
@@ -1,10 +1,31 @@
 import argparse
-import glob
+import difflib
 import importlib
-import os
+import importlib.util
+from functools import cache
+from pathlib import Path
 from types import ModuleType
 
-from core.logger import logger
+COMMANDS_PACKAGE = "management"
+
+
+@cache
+def command_index() -> dict[str, Path]:
+    """
+    Индекс команд: имя -> файл management/<name>.py.
+
+    Строится по файлам пакета (модули команд не импортируются) и не зависит от
+    рабочего каталога; __init__ и модули с "_" в начале имени командами не считаются.
+    """
+    spec = importlib.util.find_spec(COMMANDS_PACKAGE)
+    if spec is None or not spec.submodule_search_locations:
+        return {}
+    index: dict[str, Path] = {}
+    for location in spec.submodule_search_locations:
+        for path in sorted(Path(location).glob("*.py")):
+            if not path.stem.startswith("_"):
+                index.setdefault(path.stem, path)
+    return index
 
 
 class Parser:
@@ -25,12 +46,21 @@ class Parser:
         try:
             self.add_arguments()
             arguments = self.parser.parse_args(sys_args[0:1])
-            module: ModuleType = importlib.import_module(f"management.{arguments.mode}")
+            if arguments.mode not in command_index():
+                close = difflib.get_close_matches(arguments.mode, self.list_of_commands(), n=1)
+                hint = f" Did you mean '{close[0]}'?" if close else ""
+                raise LookupError(f"unknown mode '{arguments.mode}'.{hint}")
+            module: ModuleType = importlib.import_module(f"{COMMANDS_PACKAGE}.{arguments.mode}")
             cls = module.Command
             command = cls(sys_args[1:], self.parser)
         except Exception as exc:
+            from core.logger import logger
+
             logger.error(f"Command not found, please type another command from this 'List of modes'. Details: {exc}")
         else:
+            # конфигурация логирования (dictConfig) — только когда команда действительно выполняется
+            import core.logger  # noqa: F401
+
             command.execute()
 
     def remove_argument(self, arg):
@@ -49,8 +79,4 @@ class Parser:
 
     @staticmethod
     def list_of_commands():
-        return [
-            name[: len(name) - 3]
-            for name in map(os.path.basename, glob.glob("./management/*.py"))
-            if name[: len(name) - 3] != "__init__"
-        ]
+        return list(command_index())
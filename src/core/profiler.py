@@ -0,0 +1,184 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+from asgi_correlation_id.context import correlation_id
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ProfilerConfig(BaseSettings):
+    # Без токена эндпоинт профилировщика выключен
+    token: str = Field(default="")
+    max_seconds: float = Field(default=60.0, gt=0)
+    default_rate: float = Field(default=100.0, gt=0, description="Частота выборки по умолчанию, Гц")
+    max_rate: float = Field(default=1000.0, gt=0)
+    max_overhead: float = Field(
+        default=0.05, gt=0, le=1, description="Доля времени, которую профилировщик может занимать (держит GIL)"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="PROFILER_")
+
+
+profiler_config = ProfilerConfig()
+
+_WARMUP_SAMPLES = 10
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class ProfileResult:
+    stacks: Counter[str] = field(default_factory=Counter)
+    samples: int = 0
+    seconds: float = 0.0
+    sampling_seconds: float = 0.0
+    requested_rate: float = 0.0
+    final_rate: float = 0.0
+
+    @property
+    def overhead(self) -> float:
+        """Доля времени, которую поток профилировщика держал GIL, собирая стеки."""
+        return self.sampling_seconds / self.seconds if self.seconds else 0.0
+
+    def collapsed(self) -> str:
+        """Формат collapsed stacks (flamegraph.pl, speedscope): "root;...;leaf count" на строку."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _walk(frame: FrameType | None) -> list[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _task_correlation_id(task: asyncio.Task | None) -> str | None:
+    if task is None or not hasattr(task, "get_context"):  # Task.get_context — Python 3.12+
+        return None
+    return task.get_context().get(correlation_id)
+
+
+def _tag(root: str, cid: str | None) -> list[str]:
+    return [root, f"cid={cid}"] if cid else [root]
+
+
+class SamplingProfiler:
+    """
+    Выборочный профилировщик внутри воркера.
+
+    Отдельный поток с частотой rate снимает стеки всех потоков (sys._current_frames)
+    и, если tasks=True, стеки ожидающих asyncio-задач цикла loop (где они "висят").
+    Стек потока event loop и стеки задач помечаются correlation_id запроса.
+
+    Накладные расходы — время, пока поток профилировщика держит GIL, собирая стеки;
+    если их доля превышает max_overhead, частота выборки снижается вдвое.
+    Одновременно в процессе работает только один профилировщик.
+    Создавать в потоке event loop (например, в обработчике), запускать — в другом потоке.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        seconds: float,
+        rate: float = profiler_config.default_rate,
+        tasks: bool = True,
+        loop: asyncio.AbstractEventLoop | None = None,
+        max_overhead: float = profiler_config.max_overhead,
+    ) -> None:
+        self.seconds = min(seconds, profiler_config.max_seconds)
+        self.rate = min(rate, profiler_config.max_rate)
+        self.tasks = tasks
+        self.loop = loop
+        self.loop_thread = threading.get_ident() if loop is not None else None
+        self.max_overhead = max_overhead
+
+    def _sample(self, result: ProfileResult, own_thread: int) -> None:
+        loop = self.loop
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            cid = None
+            if thread_id == self.loop_thread:
+                cid = _task_correlation_id(asyncio.current_task(loop))
+            stack = _tag(f"thread:{names.get(thread_id, thread_id)}", cid) + _walk(frame)
+            result.stacks[";".join(stack)] += 1
+
+        if self.tasks and loop is not None:
+            running = asyncio.current_task(loop)
+            for task in asyncio.all_tasks(loop):
+                if task is running or task.done():
+                    continue
+                stack = _tag(f"task:{task.get_name()}", _task_correlation_id(task))
+                stack += [_frame_label(frame) for frame in task.get_stack()]
+                result.stacks[";".join(stack)] += 1
+
+    def run(self) -> ProfileResult:
+        """Блокирует вызывающий поток на время профилирования (вызывать через to_thread)."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("Профилировщик уже запущен в этом процессе")
+        try:
+            return self._run()
+        finally:
+            self._lock.release()
+
+    def _run(self) -> ProfileResult:
+        result = ProfileResult(requested_rate=self.rate)
+        own_thread = threading.get_ident()
+        interval = 1.0 / self.rate
+        started = time.perf_counter()
+        deadline = started + self.seconds
+        next_at = started
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_at:
+                time.sleep(min(next_at - now, deadline - now))
+                continue
+
+            sample_started = time.perf_counter()
+            self._sample(result, own_thread)
+            sample_end = time.perf_counter()
+            result.samples += 1
+            result.sampling_seconds += sample_end - sample_started
+
+            # ограничение накладных расходов: реже, если профилировщик занимает слишком много времени
+            # (первые выборки пропускаем — на коротком интервале доля ещё не показательна)
+            if result.samples >= _WARMUP_SAMPLES and result.sampling_seconds > self.max_overhead * (
+                sample_end - started
+            ):
+                interval *= 2
+            next_at = sample_end + interval
+
+        result.seconds = time.perf_counter() - started
+        result.final_rate = 1.0 / interval
+        return result
+
+
+def profile_headers(result: ProfileResult, pid: int) -> dict[str, Any]:
+    return {
+        "X-Profile-Worker": str(pid),
+        "X-Profile-Samples": str(result.samples),
+        "X-Profile-Seconds": f"{result.seconds:.3f}",
+        "X-Profile-Overhead": f"{result.overhead:.4f}",
+        "X-Profile-Rate": f"{result.requested_rate:g}/{result.final_rate:g}",
+    }
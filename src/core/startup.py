@@ -0,0 +1,90 @@
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from core.logger import logger
+
+
+class StartupTimer:
+    """
+    Разбивка старта воркера по фазам (импорт конфигурации, роутеров, сборка приложения, lifespan).
+
+    При gunicorn --preload фазы импорта выполняются один раз в master-процессе, воркеры
+    получают их результат через fork (copy-on-write) — в отчёте воркера они помечены как preloaded.
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.preloaded: dict[str, float] = {}
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # всё, что замерено до fork, сделано в master
+        self.preloaded.update(self.phases)
+        self.phases = {}
+        self.pid = os.getpid()
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def log(self) -> None:
+        total = time.perf_counter() - self.started
+        line = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items())
+        if self.preloaded:
+            line += " preloaded[" + " ".join(f"{name}={s * 1000:.1f}ms" for name, s in self.preloaded.items()) + "]"
+        logger.info(
+            f"Worker {self.pid} started in {total * 1000:.1f}ms: {line}",
+            extra={
+                "startup": {
+                    "pid": self.pid,
+                    "total_seconds": total,
+                    "phases": self.phases,
+                    "preloaded": self.preloaded,
+                }
+            },
+        )
+
+
+startup_timer = StartupTimer()
+
+
+def install_fork_guard() -> None:
+    """
+    Соединения пулов SQLAlchemy не переходят через fork (gunicorn --preload).
+
+    Рецепт из документации SQLAlchemy ("Using Connection Pools with Multiprocessing"):
+    соединение помечается pid процесса, который его открыл; в другом процессе
+    при checkout оно инвалидируется, и пул открывает новое — сокет родителя не используется.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.pool import Pool
+
+    if event.contains(Pool, "connect", _remember_pid):
+        return
+
+    event.listen(Pool, "connect", _remember_pid)
+    event.listen(Pool, "checkout", _check_pid)
+
+
+def _remember_pid(dbapi_connection, connection_record) -> None:
+    connection_record.info["pid"] = os.getpid()
+
+
+def _check_pid(dbapi_connection, connection_record, connection_proxy) -> None:
+    from sqlalchemy import exc
+
+    pid = os.getpid()
+    if connection_record.info.get("pid", pid) != pid:
+        connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+        raise exc.DisconnectionError(
+            f"Connection record belongs to pid {connection_record.info['pid']}, attempting to check out in pid {pid}"
+        )
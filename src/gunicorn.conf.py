@@ -0,0 +1,51 @@
+# Конфигурация gunicorn (подхватывается автоматически из рабочего каталога).
+# Класс воркера, адрес, число воркеров и уровень логов задаются в entrypoint.sh.
+import gc
+import os
+import tempfile
+from pathlib import Path
+
+# GUNICORN_PRELOAD=true — main:app импортируется один раз в master, воркеры получают
+# его через fork (copy-on-write). main.py не открывает соединений на импорте,
+# а пулы SQLAlchemy не отдают воркеру соединения master (core.startup.install_fork_guard).
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+# Общий каталог файлов метрик воркеров (core.metrics); задаётся до загрузки приложения,
+# чтобы его унаследовали и preload, и каждый воркер. Каталог, заданный через METRICS_DIR,
+# может быть общим (том, /tmp) — в нём удаляются только файлы метрик, сам каталог остаётся
+metrics_dir_owned = "METRICS_DIR" not in os.environ
+metrics_dir = Path(
+    os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), f"app-metrics-{os.getpid()}"))
+)
+
+
+def on_starting(server):
+    from core.metrics import clear_metrics_files
+
+    # значения прошлого запуска не должны попасть в счётчики
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    clear_metrics_files(metrics_dir)
+
+
+def when_ready(server):
+    if preload_app:
+        # объекты, созданные при импорте, сборщик мусора больше не трогает —
+        # их страницы памяти не копируются в воркеры при обходе gc
+        gc.freeze()
+
+
+def child_exit(server, worker):
+    from core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    from core.metrics import clear_metrics_files
+
+    clear_metrics_files(metrics_dir)
+    if metrics_dir_owned:
+        try:
+            metrics_dir.rmdir()  # только пустой: чужие файлы не трогаем
+        except OSError:
+            pass
@@ -1,14 +1,69 @@
-from core.config import config
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-app = FastAPI(
-    lifespan=lifespan,
-    title="Publishing Service",
-    version=config.version,
-    root_path=config.server_path,
-    servers=[{"url": config.server_path, "description": "Publishing Service API"}],
-)
+from core.startup import install_fork_guard, startup_timer
 
-app.include_router(routers)
+# Модуль безопасен для gunicorn --preload: на импорте не открываются соединения,
+# сокеты и фоновые задачи — всё это создаётся в lifespan каждого воркера
+with startup_timer.phase("imports"):
+    import uvicorn
+    from asgi_correlation_id import CorrelationIdMiddleware
+    from fastapi import FastAPI
+
+    from core.access_log import AccessLogMiddleware, access_log_aggregator, access_log_config
+    from core.cache import response_cache
+    from core.config import config
+    from core.db_routing import replica_router
+    from core.metrics import MetricsMiddleware, install_pool_metrics, metrics_collector, metrics_config
+
+with startup_timer.phase("routers"):
+    from routers import routers
+    from routers.healthcheck_router import health_monitor
+
+install_fork_guard()
+if metrics_config.enabled:
+    install_pool_metrics()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    with startup_timer.phase("lifespan"):
+        await health_monitor.start()
+        await replica_router.start()
+        if access_log_config.enabled:
+            access_log_aggregator.start()
+        if metrics_config.enabled:
+            metrics_collector.start()
+    startup_timer.log()
+    try:
+        yield
+    finally:
+        await health_monitor.stop()
+        await replica_router.stop()
+        if access_log_config.enabled:
+            await access_log_aggregator.stop()
+        if metrics_config.enabled:
+            await metrics_collector.stop()
+        await response_cache.close()
+
+
+with startup_timer.phase("app"):
+    app = FastAPI(
+        lifespan=lifespan,
+        title="Publishing Service",
+        version=config.version,
+        root_path=config.server_path,
+        servers=[{"url": config.server_path, "description": "Publishing Service API"}],
+    )
+
+    app.include_router(routers)
+
+    # добавленный последним — внешний: correlation_id уже выставлен, когда пишется access log
+    if access_log_config.enabled:
+        app.add_middleware(AccessLogMiddleware)
+    if metrics_config.enabled:
+        app.add_middleware(MetricsMiddleware)
+    app.add_middleware(CorrelationIdMiddleware)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
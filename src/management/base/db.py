@@ -0,0 +1,14 @@
+import os
+
+
+def apply_db_override(db_dsn: str | None) -> None:
+    from db import database_async
+
+    final_dsn = db_dsn or os.getenv("POSTGRES_DSN") or database_async.ASYNC_DSN
+    if not final_dsn:
+        raise RuntimeError(
+            "Не удалось определить DSN подключения (нет --db-dsn, POSTGRES_DSN и config.postgres.async_dsn)."
+        )
+
+    database_async.ASYNC_DSN = final_dsn
+    database_async.init_async_engine()  # type: ignore[attr-defined]
@@ -0,0 +1,36 @@
+import cProfile
+import io
+import logging
+import pstats
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger("app")
+
+PROFILE_TOP = 20
+
+
+@contextmanager
+def profile_to(path: Path | None) -> Iterator[None]:
+    """
+    Профилирует блок через cProfile и сохраняет pstats в path (None — без профилирования).
+
+    Смотреть: python -m pstats <path> или snakeviz <path>.
+    """
+    if path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+        logger.info(f"Profile written to {path}")
+        logger.debug(out.getvalue())
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any
+
+from management.base.command import BaseCommand
+from management.base.db import apply_db_override
+from management.seed.constants import SUITE_E2E, SUITE_FILES, SUITE_MEMORY, SUITE_MICRO, SUITES
+from management.seed.manifest import DEFAULT_MANIFEST_NAME
+from management.seed.synthetic import SyntheticSpec
+
+# логгер "app" настраивает core.logger перед execute()
+logger = logging.getLogger("app")
+
+DEFAULT_RESOURCES_DIR = Path(__file__).resolve().parents[1] / "resources"
+DEFAULT_BATCH_SIZES = [100, 1000, 5000]
+DEFAULT_MEMORY_COUNT = 100_000
+DEFAULT_JSON_OUT = "bench_seed_report.json"
+# значения по умолчанию — с экземпляра: у slots-dataclass атрибуты класса — дескрипторы
+DEFAULT_SPEC = SyntheticSpec()
+
+
+def _log_result(result: dict[str, Any]) -> None:
+    if "bytes_per_record" in result:
+        logger.info(
+            f"[bench_seed] {result['suite']} {result['name']}: "
+            f"{result['bytes_per_record']:.1f} bytes/record (n={result['rows']})"
+        )
+        return
+
+    line = (
+        f"[bench_seed] {result['suite']} {result['name']}: rows={result['rows']} "
+        f"best={result['seconds']:.3f}s rows/s={result['rows_per_sec']:.0f}"
+    )
+    if "speedup_vs_per_row" in result:
+        line += f" x{result['speedup_vs_per_row']:.1f} vs per-row"
+    logger.info(line)
+
+
+async def _run(
+    suites: list[str],
+    spec: SyntheticSpec,
+    resources_dir: Path,
+    manifest_path: Path,
+    command_name: str,
+    files_override: list[str] | None,
+    batch_sizes: list[int],
+    repeat: int,
+    memory_count: int,
+    json_out: Path,
+) -> None:
+    from management.seed.bench import build_report, run_e2e, run_files, run_memory, run_micro, write_report
+
+    results: list[dict[str, Any]] = []
+
+    if SUITE_MICRO in suites:
+        results += await run_micro(spec, repeat, max(batch_sizes))
+    if SUITE_MEMORY in suites:
+        results += run_memory(memory_count)
+
+    if SUITE_E2E in suites or SUITE_FILES in suites:
+        # БД нужна только сквозным замерам; импорт движка — только здесь
+        from db.database_async import session_scope
+        from management.seed import collect_models_registry, resolve_seed_files
+        from management.seed.engine import load_json
+
+        if SUITE_E2E in suites:
+            results += await run_e2e(spec, session_scope, batch_sizes, repeat)
+        if SUITE_FILES in suites:
+            paths = resolve_seed_files(
+                command_name=command_name,
+                resources_dir=resources_dir,
+                manifest_path=manifest_path,
+                files_override=files_override,
+                use_all=False,
+                glob_mask=None,
+                exclude=None,
+            )
+            logger.info(f"[bench_seed] Files: {', '.join(str(p) for p in paths)}")
+            results += await run_files(paths, load_json, collect_models_registry(), session_scope, batch_sizes, repeat)
+
+    for result in results:
+        _log_result(result)
+
+    # отчёт — только в файл: stdout занят логом (его пишет фоновый поток)
+    write_report(build_report(spec, results), json_out)
+    logger.info(f"[bench_seed] Report written to {json_out}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the seed engine: CPU micro-benchmarks on synthetic payloads, memory per record, "
+        "end-to-end per-row vs batched writes (changes are rolled back). Emits a JSON report"
+    )
+
+    def add_arguments(self):
+        self.parser.add_argument(
+            "--suite",
+            dest="suites",
+            nargs="*",
+            choices=SUITES,
+            default=[SUITE_MICRO],
+            help="Какие наборы запускать: micro и memory без БД, e2e и files — против Postgres",
+        )
+
+        self.parser.add_argument("--models", type=int, default=DEFAULT_SPEC.models, help="Синтетика: число моделей")
+        self.parser.add_argument("--rows", type=int, default=DEFAULT_SPEC.rows, help="Синтетика: записей на модель")
+        self.parser.add_argument(
+            "--fanout", type=int, default=DEFAULT_SPEC.fanout, help="Синтетика: __children__ на запись"
+        )
+        self.parser.add_argument(
+            "--fk-density", type=int, default=DEFAULT_SPEC.fk_density, help="Синтетика: FK на модель"
+        )
+        self.parser.add_argument("--seed", type=int, default=DEFAULT_SPEC.seed, help="Синтетика: seed генератора")
+
+        self.parser.add_argument("--resources-dir", default=str(DEFAULT_RESOURCES_DIR))
+        self.parser.add_argument("--manifest", default=str(DEFAULT_RESOURCES_DIR / DEFAULT_MANIFEST_NAME))
+        self.parser.add_argument("--command", dest="command_name", default="load_init_data")
+        self.parser.add_argument("--files", nargs="*", default=None, help="Явно указать список json файлов")
+
+        self.parser.add_argument("--batch-sizes", nargs="*", type=int, default=DEFAULT_BATCH_SIZES)
+        self.parser.add_argument("--repeat", type=int, default=3)
+        self.parser.add_argument(
+            "--memory",
+            type=int,
+            default=DEFAULT_MEMORY_COUNT,
+            metavar="N",
+            help="Число синтетических ключей/записей для набора memory",
+        )
+        self.parser.add_argument("--json-out", default=DEFAULT_JSON_OUT, help="Куда записать JSON-отчёт")
+
+        self.parser.add_argument("--db-dsn", dest="db_dsn", required=False, default=None)
+
+    def execute(self):
+        suites = self.args.suites or [SUITE_MICRO]
+        if SUITE_E2E in suites or SUITE_FILES in suites:
+            apply_db_override(self.args.db_dsn)
+
+        spec = SyntheticSpec(
+            models=max(1, self.args.models),
+            rows=max(1, self.args.rows),
+            fanout=max(0, self.args.fanout),
+            fk_density=max(0, self.args.fk_density),
+            seed=self.args.seed,
+        )
+        asyncio.run(
+            _run(
+                suites=suites,
+                spec=spec,
+                resources_dir=Path(self.args.resources_dir),
+                manifest_path=Path(self.args.manifest),
+                command_name=self.args.command_name,
+                files_override=self.args.files,
+                batch_sizes=self.args.batch_sizes or DEFAULT_BATCH_SIZES,
+                repeat=max(1, self.args.repeat),
+                memory_count=max(1, self.args.memory),
+                json_out=Path(self.args.json_out),
+            )
+        )
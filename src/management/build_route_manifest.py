@@ -0,0 +1,52 @@
+import importlib.util
+import logging
+from pathlib import Path
+
+from management.base.command import BaseCommand
+
+# логгер "app" настраивает core.logger перед execute()
+logger = logging.getLogger("app")
+
+ROUTERS_PACKAGE = "routers"
+ROUTER_SUFFIX = "_router.py"
+MANIFEST_NAME = "_manifest.py"
+
+MANIFEST_TEMPLATE = """# Сгенерировано командой: python manager.py build_route_manifest
+# Не редактировать вручную. Без этого файла routers/__init__.py сканирует папку.
+ROUTER_MODULES = {modules!r}
+"""
+
+
+def find_router_modules(package_dir: Path) -> tuple[str, ...]:
+    return tuple(sorted(path.name[:-3] for path in package_dir.glob(f"*{ROUTER_SUFFIX}")))
+
+
+class Command(BaseCommand):
+    help = "Generate a static route manifest so app workers import routers without scanning the routers folder"
+
+    def add_arguments(self):
+        self.parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить, что манифест актуален (код возврата 1, если нет)",
+        )
+
+    def execute(self):
+        # find_spec не исполняет routers/__init__.py — роутеры и их зависимости не импортируются
+        spec = importlib.util.find_spec(ROUTERS_PACKAGE)
+        if spec is None or not spec.submodule_search_locations:
+            raise RuntimeError(f"Пакет {ROUTERS_PACKAGE} не найден")
+        package_dir = Path(next(iter(spec.submodule_search_locations)))
+
+        manifest = package_dir / MANIFEST_NAME
+        content = MANIFEST_TEMPLATE.format(modules=find_router_modules(package_dir))
+
+        if self.args.check:
+            if not manifest.exists() or manifest.read_text("utf-8") != content:
+                logger.error(f"Route manifest {manifest} is missing or stale, run 'build_route_manifest'")
+                raise SystemExit(1)
+            logger.info(f"Route manifest {manifest} is up to date")
+            return
+
+        manifest.write_text(content, "utf-8")
+        logger.info(f"Route manifest written to {manifest}: {', '.join(find_router_modules(package_dir))}")
@@ -0,0 +1,85 @@
+import logging
+from pathlib import Path
+
+from management.base.command import BaseCommand
+from management.seed.constants import DEFAULT_SNAPSHOT_DIR_NAME
+from management.seed.manifest import DEFAULT_JSON_GLOB, DEFAULT_MANIFEST_NAME
+
+# логгер "app" настраивает core.logger перед execute()
+logger = logging.getLogger("app")
+
+DEFAULT_RESOURCES_DIR = Path(__file__).resolve().parents[1] / "resources"
+
+
+def _run(
+    resources_dir: Path,
+    manifest_path: Path,
+    command_name: str,
+    files_override: list[str] | None,
+    use_all: bool,
+    glob_mask: str | None,
+    exclude: list[str] | None,
+    out_dir: Path,
+) -> None:
+    from management.seed import collect_models_registry, resolve_seed_files
+    from management.seed.plan import compile_seed_plans
+    from management.seed.snapshot import compile_snapshot, snapshot_path
+
+    paths = resolve_seed_files(
+        command_name=command_name,
+        resources_dir=resources_dir,
+        manifest_path=manifest_path,
+        files_override=files_override,
+        use_all=use_all,
+        glob_mask=glob_mask,
+        exclude=exclude,
+    )
+
+    registry = collect_models_registry()
+    plans = compile_seed_plans(registry)
+
+    for path in paths:
+        target = snapshot_path(out_dir, path)
+        rows = compile_snapshot(path, target, registry, plans)
+        logger.info(f"Compiled {path.name} -> {target} ({rows} rows, {target.stat().st_size} bytes)")
+
+    logger.info("Compile completed.")
+
+
+class Command(BaseCommand):
+    help = "Compile seed JSON into validated binary snapshots for fast load_init_data (no DB needed)"
+
+    def add_arguments(self):
+        self.parser.add_argument("--resources-dir", default=str(DEFAULT_RESOURCES_DIR))
+        self.parser.add_argument("--manifest", default=str(DEFAULT_RESOURCES_DIR / DEFAULT_MANIFEST_NAME))
+        self.parser.add_argument(
+            "--command",
+            dest="command_name",
+            default="load_init_data",
+            help="Для какой команды брать список файлов из manifest",
+        )
+
+        self.parser.add_argument("--files", nargs="*", default=None, help="Явно указать список json файлов")
+        self.parser.add_argument("--all", action="store_true", help="Скомпилировать все json из папки resources")
+
+        self.parser.add_argument("--file-glob", default=DEFAULT_JSON_GLOB)
+        self.parser.add_argument("--exclude", nargs="*", default=None)
+
+        self.parser.add_argument(
+            "--out-dir",
+            default=None,
+            help=f"Куда писать снимки (по умолчанию <resources-dir>/{DEFAULT_SNAPSHOT_DIR_NAME})",
+        )
+
+    def execute(self):
+        resources_dir = Path(self.args.resources_dir)
+        _run(
+            resources_dir=resources_dir,
+            manifest_path=Path(self.args.manifest),
+            command_name=self.args.command_name,
+            files_override=self.args.files,
+            use_all=bool(self.args.all),
+            glob_mask=str(self.args.file_glob) if self.args.file_glob else None,
+            exclude=self.args.exclude,
+            out_dir=Path(self.args.out_dir) if self.args.out_dir else resources_dir / DEFAULT_SNAPSHOT_DIR_NAME,
+        )
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from core.parser import COMMANDS_PACKAGE, command_index
+from management.base.command import BaseCommand
+
+# логгер "app" настраивает core.logger перед execute()
+logger = logging.getLogger("app")
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_TOP = 15
+
+
+def parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    """
+    Разбирает вывод -X importtime:
+        import time: self [us] | cumulative | imported package
+    Вложенность пакета — по отступу имени.
+    """
+    rows: list[dict[str, Any]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # заголовок
+        rows.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return rows
+
+
+def measure_import(module: str) -> dict[str, Any]:
+    """
+    Импортирует module в чистом интерпретаторе с -X importtime и возвращает сводку.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows = parse_importtime(completed.stderr)
+    top_level = next((row for row in reversed(rows) if row["module"] == module), None)
+    return {
+        "module": module,
+        "ok": completed.returncode == 0,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode else None,
+        "total_ms": top_level["cumulative_ms"] if top_level else sum(row["self_ms"] for row in rows),
+        "modules": len(rows),
+        "imports": rows,
+    }
+
+
+def _summary(result: dict[str, Any], top: int) -> dict[str, Any]:
+    imports = result.pop("imports")
+    result["top_self"] = sorted(imports, key=lambda row: row["self_ms"], reverse=True)[:top]
+    # накопительное время интересно для пакетов, которые тянет сама цель
+    result["top_cumulative"] = sorted(
+        (row for row in imports if row["module"] != result["module"]),
+        key=lambda row: row["cumulative_ms"],
+        reverse=True,
+    )[:top]
+    return result
+
+
+class Command(BaseCommand):
+    help = "Report import time (-X importtime) of manager.py and each management command to catch startup regressions"
+
+    def add_arguments(self):
+        self.parser.add_argument(
+            "--modules",
+            nargs="*",
+            default=None,
+            help="Какие модули замерять (по умолчанию core.parser и все команды management)",
+        )
+        self.parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Сколько самых дорогих импортов выводить")
+        self.parser.add_argument("--json-out", default=None, help="Куда записать JSON-отчёт")
+
+    def execute(self):
+        modules = self.args.modules or ["core.parser", *(f"{COMMANDS_PACKAGE}.{name}" for name in command_index())]
+        top = max(1, self.args.top)
+
+        report = []
+        for module in modules:
+            result = _summary(measure_import(module), top)
+            report.append(result)
+            if not result["ok"]:
+                logger.warning(f"[import_report] {module}: import failed: {result['error']}")
+                continue
+            logger.info(f"[import_report] {module}: {result['total_ms']:.1f} ms, {result['modules']} modules")
+            for row in result["top_self"]:
+                logger.info(
+                    f"[import_report]   {row['module']}: self={row['self_ms']:.1f} ms "
+                    f"cumulative={row['cumulative_ms']:.1f} ms"
+                )
+
+        if self.args.json_out:
+            Path(self.args.json_out).write_text(json.dumps(report, ensure_ascii=False, indent=2), "utf-8")
+            logger.info(f"[import_report] Report written to {self.args.json_out}")
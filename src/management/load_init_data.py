@@ -1,27 +1,132 @@
+from __future__ import annotations
+
 import asyncio
-import os
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from core.logger import logger
-from db.database_async import session_scope
 from management.base.command import BaseCommand
-from management.seed import collect_models_registry, resolve_seed_files, seed_files
+from management.base.db import apply_db_override
+from management.base.profile import profile_to
+from management.seed.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_COPY_THRESHOLD,
+    DEFAULT_LOCK_TIMEOUT,
+    DEFAULT_SNAPSHOT_DIR_NAME,
+)
 from management.seed.manifest import DEFAULT_JSON_GLOB, DEFAULT_MANIFEST_NAME
 
+# Движок seed (sqlalchemy, модели, asyncpg) импортируется внутри _run, а логгер "app"
+# настраивает core.logger перед execute(): --help и проверка аргументов их не поднимают
+if TYPE_CHECKING:
+    from management.seed.ledger import SeedLedger
+    from management.seed.plan import ModelPlan
+    from management.seed.snapshot import SeedSnapshot
+    from management.seed.stats import SeedStats
+
+logger = logging.getLogger("app")
+
 DEFAULT_RESOURCES_DIR = Path(__file__).resolve().parents[1] / "resources"
+DEFAULT_PROFILE_PATH = "load_init_data.pstats"
+
+
+def _open_snapshots(paths: list[Path], snapshot_dir: Path, plans: dict[Any, ModelPlan]) -> dict[Path, SeedSnapshot]:
+    """
+    Актуальные снимки compile_seed; для устаревших / отсутствующих — загрузка из JSON.
+    """
+    from management.seed.snapshot import StaleSnapshotError, open_snapshot, snapshot_path
+
+    snapshots: dict[Path, SeedSnapshot] = {}
+    for path in paths:
+        if not snapshot_path(snapshot_dir, path).exists():
+            logger.debug(f"No snapshot for {path.name}, loading JSON")
+            continue
+        try:
+            snapshots[path] = open_snapshot(snapshot_dir, path, plans)
+        except StaleSnapshotError as e:
+            logger.warning(f"{e}. Falling back to JSON for {path.name}; rebuild with 'compile_seed'")
+            continue
+        logger.info(f"Using snapshot {snapshots[path].path} ({snapshots[path].rows} rows)")
+    return snapshots
+
+
+def _log_stats(stats: SeedStats) -> None:
+    """
+    Сводка прогона: по файлам, по моделям (самые тяжёлые первыми) и итог.
+
+    Цифры дублируются в extra — JSON formatter выводит их отдельными полями.
+    """
+    for file_stats in stats.files.values():
+        if file_stats.skipped:
+            logger.info(f"[seed] {file_stats.path}: unchanged, skipped", extra={"seed_file": file_stats.as_dict()})
+            continue
+        logger.info(
+            f"[seed] {file_stats.path}: rows={file_stats.rows_prepared} written={file_stats.rows_written} "
+            f"statements={file_stats.statements} decompress={file_stats.decompress_seconds:.3f}s "
+            f"parse={file_stats.parse_seconds:.3f}s "
+            f"prepare={file_stats.prepare_seconds:.3f}s db={file_stats.db_seconds:.3f}s "
+            f"ledger={file_stats.ledger_seconds:.3f}s rows/s={file_stats.rows_per_sec:.0f}",
+            extra={"seed_file": file_stats.as_dict()},
+        )
+
+    for model_name, model in stats.as_dict()["models"].items():
+        logger.info(
+            f"[seed] {model_name}: rows={model['rows_prepared']} written={model['rows_written']} "
+            f"statements={model['statements']} prepare={model['prepare_seconds']:.3f}s "
+            f"db={model['db_seconds']:.3f}s rows/s={model['rows_per_sec']:.0f}",
+            extra={"seed_model": {"model": model_name, **model}},
+        )
+
+    totals = stats.totals()
+    logger.info(
+        f"[seed] total: files={totals['files']} skipped={totals['files_skipped']} rows={totals['rows_prepared']} "
+        f"written={totals['rows_written']} statements={totals['statements']} "
+        f"decompress={totals['decompress_seconds']:.3f}s parse={totals['parse_seconds']:.3f}s prepare={totals['prepare_seconds']:.3f}s "
+        f"db={totals['db_seconds']:.3f}s ledger={totals['ledger_seconds']:.3f}s",
+        extra={"seed_totals": totals},
+    )
 
 
-def _apply_db_override(db_dsn: str | None) -> None:
-    from db import database_async
+@asynccontextmanager
+async def _seed_lock(
+    command_name: str, paths: list[Path], ledger: SeedLedger, timeout: float, enabled: bool
+) -> AsyncIterator[bool]:
+    """
+    Один экземпляр на кластер выполняет seed (pg advisory lock), остальные ждут его
+    или выходят, как только ledger показывает, что seed актуален.
 
-    final_dsn = db_dsn or os.getenv("POSTGRES_DSN") or database_async.ASYNC_DSN
-    if not final_dsn:
-        raise RuntimeError(
-            "Не удалось определить DSN подключения (нет --db-dsn, POSTGRES_DSN и config.postgres.async_dsn)."
+    Отдаёт True, если этот экземпляр должен выполнить seed.
+    """
+    if not enabled:
+        yield True
+        return
+
+    from db.database_async import session_scope
+    from management.seed.leader import SKIPPED, SeedLeaderLock
+
+    lock = SeedLeaderLock(f"seed:{command_name}", timeout)
+    async with session_scope() as session:
+        engine = session.bind
+    # отдельное соединение на всё время блокировки: сессия отдала бы его в пул на commit
+    async with engine.connect() as lock_connection:
+        outcome = await lock.acquire(
+            lock_connection,
+            is_current=lambda s: ledger.is_current(s, paths),
+            on_wait=lambda: logger.info(f"Seed lock is held by another instance, waiting up to {timeout:.0f}s"),
         )
+        if outcome == SKIPPED:
+            logger.info(f"Seed is already current (ledger), skipped after waiting {lock.waited:.2f}s")
+            yield False
+            return
 
-    database_async.ASYNC_DSN = final_dsn
-    database_async.init_async_engine()  # type: ignore[attr-defined]
+        logger.info(f"Seed lock acquired after waiting {lock.waited:.2f}s")
+        try:
+            yield True
+        finally:
+            held = await lock.release(lock_connection)
+            logger.info(f"Seed lock released, held for {held:.2f}s")
 
 
 async def _run(
@@ -31,9 +136,45 @@ async def _run(
     use_all: bool,
     glob_mask: str | None,
     exclude: list[str] | None,
+    batch_size: int,
+    copy_threshold: int | None,
+    stream: bool,
+    jobs: int,
+    pipeline: int,
+    commit_every: int,
+    resume: bool,
+    force: bool,
+    diff: bool,
+    dry_run: bool,
+    snapshot_dir: Path | None,
+    use_lock: bool,
+    lock_timeout: float,
 ) -> None:
+    from db.database_async import session_scope
+    from management.seed import collect_models_registry, resolve_seed_files, seed_files
+    from management.seed.chunked import CheckpointStore, seed_files_chunked
+    from management.seed.ledger import SeedLedger
+    from management.seed.manifest import load_command_options
+    from management.seed.parallel import seed_files_parallel
+    from management.seed.pipeline import seed_files_pipelined
+    from management.seed.plan import compile_seed_plans
+    from management.seed.registry import resolve_models
+    from management.seed.stats import SeedStats
+    from management.seed.tables import ensure_seed_tables
+    from management.seed.writer import WriteOptions
+
     command_name = Path(__file__).stem  # init_project_templates
 
+    if jobs > 1 and pipeline:
+        raise RuntimeError("--jobs и --pipeline не совместимы: выберите что-то одно")
+    if jobs > 1 and stream:
+        # параллельный режим раскладывает по уровням строки всех файлов сразу — память растёт с объёмом seed
+        raise RuntimeError("--stream не совместим с --jobs > 1: параллельная загрузка держит все строки в памяти")
+    if commit_every and (jobs > 1 or pipeline or dry_run):
+        raise RuntimeError("--commit-every не совместим с --jobs, --pipeline и --dry-run")
+    if resume and not commit_every:
+        raise RuntimeError("--resume работает только вместе с --commit-every")
+
     paths = resolve_seed_files(
         command_name=command_name,
         resources_dir=resources_dir,
@@ -47,11 +188,84 @@ async def _run(
     logger.info(f"Executing command '{command_name}'. Loading files: {', '.join(str(p) for p in paths)}")
 
     registry = collect_models_registry()
+    ledger = SeedLedger(force=force)
 
-    async with session_scope() as session:
-        await seed_files(session, paths, registry)
+    command_options = load_command_options(command_name, manifest_path)
+    if copy_threshold is None:
+        copy_threshold = int(command_options.get("copy_threshold", DEFAULT_COPY_THRESHOLD))
+    options = WriteOptions(
+        batch_size=batch_size,
+        copy_threshold=copy_threshold,
+        copy_models=resolve_models(command_options.get("copy_models", []), registry),
+        diff=diff,
+        dry_run=dry_run,
+    )
+
+    async with _seed_lock(command_name, paths, ledger, lock_timeout, enabled=use_lock and not dry_run) as leader:
+        if not leader:
+            return
+
+        # служебные таблицы seed живут вне миграций (см. management.seed.tables); dry-run схему не меняет
+        if not dry_run:
+            async with session_scope() as session:
+                await ensure_seed_tables(session)
+
+        # чанкам нужны границы записей верхнего уровня, а снимки разложены по моделям
+        use_snapshots = snapshot_dir is not None and not commit_every
+        snapshots = _open_snapshots(paths, snapshot_dir, compile_seed_plans(registry)) if use_snapshots else {}
+
+        stats = SeedStats()
+        try:
+            if commit_every:
+                async with session_scope() as session:
+                    report, resumed_from = await seed_files_chunked(
+                        session,
+                        paths,
+                        registry,
+                        CheckpointStore(command_name),
+                        commit_every,
+                        options,
+                        stream,
+                        ledger,
+                        stats,
+                        resume,
+                    )
+                if resumed_from is not None:
+                    position = (
+                        f"{resumed_from.source} / {resumed_from.model} / {resumed_from.seed_key}"
+                        if resumed_from.seed_key
+                        else f"{resumed_from.source} (file completed)"
+                    )
+                    logger.info(f"Resumed after {position}: {resumed_from.rows} rows were already committed")
+                elif resume:
+                    logger.info("No checkpoint found, seeded from the beginning")
+            elif jobs > 1:
+                report = await seed_files_parallel(
+                    paths, registry, session_scope, options, jobs, stream, ledger, stats, snapshots
+                )
+            else:
+                async with session_scope() as session:
+                    if pipeline:
+                        report = await seed_files_pipelined(
+                            session, paths, registry, options, pipeline, stream, ledger, stats, snapshots
+                        )
+                    else:
+                        report = await seed_files(session, paths, registry, options, stream, ledger, stats, snapshots)
+                    if dry_run:
+                        await session.rollback()
+        finally:
+            for snapshot in snapshots.values():
+                snapshot.close()
+
+        for model_name, counts in report.items():
+            logger.info(
+                f"{'[dry-run] ' if dry_run else ''}{model_name}: "
+                + " ".join(f"{kind}={count}" for kind, count in counts.items())
+            )
+
+        _log_stats(stats)
 
-    logger.info("Init completed.")
+        logger.info("Dry run completed, nothing was written." if dry_run else "Init completed.")
 
 
 class Command(BaseCommand):
@@ -67,17 +281,137 @@ class Command(BaseCommand):
         self.parser.add_argument("--file-glob", default=DEFAULT_JSON_GLOB)
         self.parser.add_argument("--exclude", nargs="*", default=None)
 
+        self.parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Сколько строк одной модели писать одним INSERT ... ON CONFLICT",
+        )
+
+        self.parser.add_argument(
+            "--copy-threshold",
+            type=int,
+            default=None,
+            help="С какого числа строк модели писать её через COPY (0 — никогда). "
+            f"По умолчанию из manifest (copy_threshold) или {DEFAULT_COPY_THRESHOLD}",
+        )
+
+        self.parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Потоковый разбор JSON: память не зависит от размера файла",
+        )
+
+        self.parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Число параллельных соединений; > 1 — запись независимых таблиц параллельно "
+            "(каждая таблица — своя транзакция; строки всех файлов держатся в памяти, без --stream)",
+        )
+
+        self.parser.add_argument(
+            "--pipeline",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Готовить следующие файлы в N процессах, пока пишется текущий (0 — выключено). "
+            "Транзакция одна, как без флага",
+        )
+
+        self.parser.add_argument(
+            "--commit-every",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Фиксировать транзакцию примерно каждые N строк и вести checkpoint "
+            "(0 — всё одной транзакцией, по умолчанию)",
+        )
+        self.parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Продолжить прерванный прогон --commit-every с последнего checkpoint",
+        )
+
+        self.parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Игнорировать seed ledger и перезаписать все записи",
+        )
+
+        self.parser.add_argument(
+            "--diff",
+            action="store_true",
+            help="Сравнить строки с БД по PK и писать только новые / изменённые",
+        )
+        self.parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Показать, сколько строк будет вставлено / обновлено / пропущено, ничего не записывая",
+        )
+
+        self.parser.add_argument(
+            "--snapshot-dir",
+            default=None,
+            help=f"Где искать снимки compile_seed (по умолчанию <resources-dir>/{DEFAULT_SNAPSHOT_DIR_NAME})",
+        )
+        self.parser.add_argument(
+            "--no-snapshot",
+            action="store_true",
+            help="Не использовать снимки compile_seed, всегда читать JSON",
+        )
+
+        self.parser.add_argument(
+            "--lock-timeout",
+            type=float,
+            default=DEFAULT_LOCK_TIMEOUT,
+            help="Сколько секунд ждать, пока seed выполняет другой экземпляр",
+        )
+        self.parser.add_argument(
+            "--no-lock",
+            action="store_true",
+            help="Не брать advisory lock (один экземпляр / локальная разработка)",
+        )
+
+        self.parser.add_argument(
+            "--profile",
+            nargs="?",
+            const=DEFAULT_PROFILE_PATH,
+            default=None,
+            metavar="PATH",
+            help=f"Снять cProfile прогона и сохранить pstats (по умолчанию {DEFAULT_PROFILE_PATH})",
+        )
+
         self.parser.add_argument("--db-dsn", dest="db_dsn", required=False, default=None)
 
     def execute(self):
-        _apply_db_override(self.args.db_dsn)
-        asyncio.run(
-            _run(
-                resources_dir=Path(self.args.resources_dir),
-                manifest_path=Path(self.args.manifest),
-                files_override=self.args.files,
-                use_all=bool(self.args.all),
-                glob_mask=str(self.args.file_glob) if self.args.file_glob else None,
-                exclude=self.args.exclude,
+        apply_db_override(self.args.db_dsn)
+        with profile_to(Path(self.args.profile) if self.args.profile else None):
+            asyncio.run(
+                _run(
+                    resources_dir=Path(self.args.resources_dir),
+                    manifest_path=Path(self.args.manifest),
+                    files_override=self.args.files,
+                    use_all=bool(self.args.all),
+                    glob_mask=str(self.args.file_glob) if self.args.file_glob else None,
+                    exclude=self.args.exclude,
+                    batch_size=self.args.batch_size,
+                    copy_threshold=self.args.copy_threshold,
+                    stream=bool(self.args.stream),
+                    jobs=self.args.jobs,
+                    pipeline=max(0, self.args.pipeline),
+                    commit_every=max(0, self.args.commit_every),
+                    resume=bool(self.args.resume),
+                    force=bool(self.args.force),
+                    diff=bool(self.args.diff),
+                    dry_run=bool(self.args.dry_run),
+                    snapshot_dir=None if self.args.no_snapshot else self._snapshot_dir(),
+                    use_lock=not self.args.no_lock,
+                    lock_timeout=max(0.0, self.args.lock_timeout),
+                )
             )
-        )
+
+    def _snapshot_dir(self) -> Path:
+        if self.args.snapshot_dir:
+            return Path(self.args.snapshot_dir)
+        return Path(self.args.resources_dir) / DEFAULT_SNAPSHOT_DIR_NAME
@@ -1,4 +1,22 @@
-from .constants import CHILDREN_FIELD, KEY_FIELD
-from .engine import seed_files
-from .manifest import load_manifest, resolve_seed_files
-from .registry import collect_models_registry
+from importlib import import_module
+from typing import Any
+
+# Экспорты подгружаются при первом обращении: импорт пакета не тянет sqlalchemy и модели
+_EXPORTS = {
+    "CHILDREN_FIELD": ".constants",
+    "KEY_FIELD": ".constants",
+    "seed_files": ".engine",
+    "load_manifest": ".manifest",
+    "resolve_seed_files": ".manifest",
+    "collect_models_registry": ".registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from management.seed.constants import SUITE_E2E, SUITE_FILES, SUITE_MEMORY, SUITE_MICRO
+from management.seed.engine import (
+    SeedRecord,
+    build_key_to_id,
+    flatten_payload,
+    iter_prepared_rows,
+    prepare_row,
+    seed_files,
+    seed_payload,
+    split_scalars_and_children,
+    upsert_by_pk,
+)
+from management.seed.keyindex import KeyIndex, uuid5_str
+from management.seed.plan import compile_seed_plans
+from management.seed.recording import RecordingSession
+from management.seed.registry import collect_models_registry
+from management.seed.synthetic import SyntheticSpec, build_synthetic_models, generate_payload
+from management.seed.writer import WriteOptions
+
+
+def _result(suite: str, name: str, seconds: float, rows: int, **extra: Any) -> dict[str, Any]:
+    return {
+        "suite": suite,
+        "name": name,
+        "seconds": seconds,
+        "rows": rows,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        **extra,
+    }
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def _best_of_async(repeat: int, fn: Callable[[], Awaitable[Any]]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def build_report(spec: SyntheticSpec | None, results: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Машиночитаемый отчёт: окружение + параметры + результаты (для отслеживания регрессий).
+    """
+    return {
+        "created_at": datetime.now(UTC).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "spec": spec.as_dict() if spec else None,
+        "results": results,
+    }
+
+
+def write_report(report: dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), "utf-8")
+
+
+async def run_micro(spec: SyntheticSpec, repeat: int, batch_size: int) -> list[dict[str, Any]]:
+    """
+    CPU-бенчмарки этапов подготовки и записи против RecordingSession (без БД).
+    """
+    schema = build_synthetic_models(spec)
+    registry = collect_models_registry(schema.Base)
+    plans = compile_seed_plans(registry)
+    payload = generate_payload(spec, schema)
+
+    records = flatten_payload(payload, registry)
+    key_to_id = build_key_to_id(records)
+    total_rows = sum(1 for _ in iter_prepared_rows(payload, registry, plans))
+    params = {"batch_size": batch_size}
+
+    results = [
+        _result(
+            SUITE_MICRO, "flatten_payload", _best_of(repeat, lambda: flatten_payload(payload, registry)), len(records)
+        ),
+        _result(SUITE_MICRO, "build_key_to_id", _best_of(repeat, lambda: build_key_to_id(records)), len(key_to_id)),
+        _result(
+            SUITE_MICRO,
+            "split_scalars_and_children",
+            _best_of(repeat, lambda: [split_scalars_and_children(r.row) for r in records]),
+            len(records),
+        ),
+    ]
+
+    scalars = [(plans[r.Model], split_scalars_and_children(r.row)[0]) for r in records]
+    results.append(
+        _result(
+            SUITE_MICRO,
+            "prepare_row",
+            _best_of(repeat, lambda: [prepare_row(plan.Model, row, key_to_id, plan) for plan, row in scalars]),
+            len(scalars),
+        )
+    )
+    results.append(
+        _result(
+            SUITE_MICRO,
+            "iter_prepared_rows",
+            _best_of(repeat, lambda: sum(1 for _ in iter_prepared_rows(payload, registry, plans))),
+            total_rows,
+        )
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.json"
+        path.write_text(json.dumps(payload, ensure_ascii=False), "utf-8")
+        options = WriteOptions(batch_size=batch_size, copy_threshold=0)
+
+        for stream in (False, True):
+            session = RecordingSession()
+            seconds = await _best_of_async(
+                repeat, lambda s=stream: seed_files(RecordingSession(), [path], registry, options, s)
+            )
+            await seed_files(session, [path], registry, options, stream)
+            results.append(
+                _result(
+                    SUITE_MICRO,
+                    "seed_files[stream]" if stream else "seed_files",
+                    seconds,
+                    session.rows,
+                    statements=session.statements,
+                    **params,
+                )
+            )
+
+    return results
+
+
+def _bytes_per_item(build: Callable[[], Any], count: int) -> float:
+    tracemalloc.start()
+    try:
+        built = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del built
+    return current / count
+
+
+@dataclass(frozen=True)
+class _DictSeedRecord:
+    """Прежняя раскладка SeedRecord (без __slots__) — для сравнения памяти."""
+
+    model_key: str
+    Model: Any
+    row: dict[str, Any]
+
+
+def run_memory(count: int) -> list[dict[str, Any]]:
+    """
+    Память на запись: key -> id (dict[str, str] vs KeyIndex) и SeedRecord (dict vs __slots__).
+    """
+    uuid5_str.cache_clear()
+    keys = [f"model:{i}" for i in range(count)]
+    row: dict[str, Any] = {}
+
+    def old_index() -> dict[str, str]:
+        return {k: str(uuid.uuid5(uuid.NAMESPACE_OID, k)) for k in keys}
+
+    def new_index() -> KeyIndex:
+        index = KeyIndex()
+        for k in keys:
+            index.put(k)
+        return index
+
+    measured = {
+        "key_to_id dict[str, str]": _bytes_per_item(old_index, count),
+        "key_to_id KeyIndex": _bytes_per_item(new_index, count),
+        "SeedRecord without slots": _bytes_per_item(lambda: [_DictSeedRecord("m", None, row) for _ in keys], count),
+        "SeedRecord with slots": _bytes_per_item(lambda: [SeedRecord("m", None, row) for _ in keys], count),
+    }
+    return [
+        {"suite": SUITE_MEMORY, "name": name, "rows": count, "bytes_per_record": per_item}
+        for name, per_item in measured.items()
+    ]
+
+
+async def _compare_write_paths(
+    suite: str,
+    session_factory: Callable[[], Any],
+    payloads: list[dict[str, Any]],
+    registry: dict[str, Any],
+    batch_sizes: list[int],
+    repeat: int,
+    setup: Callable[[Any], Awaitable[None]] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Построчный upsert vs пачки разного размера в реальной БД.
+
+    Каждый прогон — отдельная транзакция с откатом в конце, БД не меняется.
+    """
+    plans = compile_seed_plans(registry)
+    rows = sum(1 for payload in payloads for _ in iter_prepared_rows(payload, registry, plans))
+
+    async def per_row(session: Any) -> None:
+        for payload in payloads:
+            for plan, values in iter_prepared_rows(payload, registry, plans):
+                await upsert_by_pk(session, plan.Model, values, plan)
+
+    def batched(batch_size: int) -> Callable[[Any], Awaitable[None]]:
+        async def run(session: Any) -> None:
+            for payload in payloads:
+                await seed_payload(session, payload, registry, batch_size, plans)
+
+        return run
+
+    async def measure(name: str, runner: Callable[[Any], Awaitable[None]], **extra: Any) -> dict[str, Any]:
+        best = float("inf")
+        for _ in range(repeat):
+            async with session_factory() as session:
+                if setup is not None:
+                    await setup(session)
+                started = time.perf_counter()
+                await runner(session)
+                best = min(best, time.perf_counter() - started)
+                await session.rollback()
+        return _result(suite, name, best, rows, **extra)
+
+    results = [await measure("per-row", per_row)]
+    for batch_size in batch_sizes:
+        results.append(await measure(f"batch={batch_size}", batched(batch_size), batch_size=batch_size))
+
+    baseline = results[0]["rows_per_sec"]
+    for result in results[1:]:
+        result["speedup_vs_per_row"] = result["rows_per_sec"] / baseline if baseline else 0.0
+    return results
+
+
+async def run_e2e(
+    spec: SyntheticSpec,
+    session_factory: Callable[[], Any],
+    batch_sizes: list[int],
+    repeat: int,
+) -> list[dict[str, Any]]:
+    """
+    Сквозной замер на локальном Postgres: синтетические таблицы создаются
+    внутри транзакции прогона и исчезают вместе с её откатом.
+    """
+    schema = build_synthetic_models(spec)
+    registry = collect_models_registry(schema.Base)
+    payload = generate_payload(spec, schema)
+
+    async def create_tables(session: Any) -> None:
+        await session.run_sync(lambda s: schema.Base.metadata.create_all(s.connection()))
+
+    return await _compare_write_paths(
+        SUITE_E2E, session_factory, [payload], registry, batch_sizes, repeat, setup=create_tables
+    )
+
+
+async def run_files(
+    paths: list[Path],
+    load: Callable[[Path], dict[str, Any]],
+    registry: dict[str, Any],
+    session_factory: Callable[[], Any],
+    batch_sizes: list[int],
+    repeat: int,
+) -> list[dict[str, Any]]:
+    """
+    Замер на реальных seed-файлах и моделях проекта.
+    """
+    payloads = [load(p) for p in paths]
+    results = await _compare_write_paths(SUITE_FILES, session_factory, payloads, registry, batch_sizes, repeat)
+    for result in results:
+        result["files"] = [str(p) for p in paths]
+    return results
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from sqlalchemy import ARRAY, JSON, column, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management.seed.plan import ModelPlan
+
+_COPY_CHUNK_ROWS = 5000
+_TEMP_SCHEMA = "pg_temp"
+
+
+def _array_literal(items: list[Any]) -> str:
+    parts = []
+    for item in items:
+        if item is None:
+            parts.append("NULL")
+        elif isinstance(item, list):
+            parts.append(_array_literal(item))
+        else:
+            value = _text_value(item)
+            parts.append('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _text_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _csv_field(value: Any, kind: str | None) -> str:
+    """
+    Значение в CSV для COPY: NULL — пустое поле без кавычек, всё остальное — в кавычках.
+
+    Типы разбирает сам PostgreSQL из текстового представления (uuid, timestamp, enum ...).
+    """
+    if value is None:
+        return ""
+    if kind == "json":
+        text_value = json.dumps(value, ensure_ascii=False)
+    elif kind == "array" and isinstance(value, list):
+        text_value = _array_literal(value)
+    else:
+        text_value = _text_value(value)
+    return '"' + text_value.replace('"', '""') + '"'
+
+
+def _column_kinds(plan: ModelPlan, columns: tuple[str, ...]) -> list[str | None]:
+    table_columns = plan.Model.__table__.c
+    kinds: list[str | None] = []
+    for key in columns:
+        col_type = table_columns[key].type
+        if isinstance(col_type, JSON):
+            kinds.append("json")
+        elif isinstance(col_type, ARRAY):
+            kinds.append("array")
+        else:
+            kinds.append(None)
+    return kinds
+
+
+async def _csv_chunks(
+    rows: list[dict[str, Any]], columns: tuple[str, ...], kinds: list[str | None]
+) -> AsyncIterator[bytes]:
+    for start in range(0, len(rows), _COPY_CHUNK_ROWS):
+        lines = [
+            ",".join(_csv_field(row[key], kind) for key, kind in zip(columns, kinds, strict=True))
+            for row in rows[start : start + _COPY_CHUNK_ROWS]
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def copy_upsert(
+    session: AsyncSession, plan: ModelPlan, columns: tuple[str, ...], rows: list[dict[str, Any]]
+) -> None:
+    """
+    Быстрый путь для больших таблиц:
+
+    1) временная staging-таблица с нужными колонками (без ограничений, ON COMMIT DROP)
+    2) COPY строк в staging (поток CSV, без промежуточных файлов)
+    3) один INSERT ... SELECT ... ON CONFLICT (PK) в целевую таблицу
+
+    Строки должны иметь одинаковый набор колонок и не повторять PK (это обеспечивает BatchWriter).
+    """
+    target = plan.Model.__table__
+    conn = await session.connection()
+    preparer = conn.dialect.identifier_preparer
+
+    # всегда через pg_temp: без схемы имя ищется по search_path, и DROP мог бы удалить
+    # обычную таблицу с таким именем, пока временной ещё нет
+    stage_name = f"_seed_stage_{target.name}"
+    quoted_stage = f"{_TEMP_SCHEMA}.{preparer.quote(stage_name)}"
+    quoted_columns = ", ".join(preparer.quote(target.c[key].name) for key in columns)
+
+    # ON COMMIT DROP удаляет staging только на commit, а модель может попасть сюда
+    # дважды за транзакцию
+    await conn.execute(text(f"DROP TABLE IF EXISTS {quoted_stage}"))
+    await conn.execute(
+        text(
+            f"CREATE TEMP TABLE {quoted_stage} ON COMMIT DROP AS "
+            f"SELECT {quoted_columns} FROM {preparer.format_table(target)} WITH NO DATA"
+        )
+    )
+
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_to_table(
+        stage_name,
+        schema_name=_TEMP_SCHEMA,
+        source=_csv_chunks(rows, columns, _column_kinds(plan, columns)),
+        columns=[target.c[key].name for key in columns],
+        format="csv",
+    )
+
+    stage = table(stage_name, *(column(target.c[key].name) for key in columns), schema=_TEMP_SCHEMA)
+    stmt = pg_insert(target).from_select([target.c[key] for key in columns], select(*stage.c))
+    update_cols = {target.c[key].name: stmt.excluded[target.c[key].name] for key in columns if key not in plan.pk_keys}
+    if update_cols:
+        stmt = stmt.on_conflict_do_update(index_elements=plan.index_elements, set_=update_cols)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=plan.index_elements)
+    await conn.execute(stmt)
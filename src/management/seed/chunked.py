@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management.seed.diff import merge_diff_reports
+from management.seed.engine import _get_key, iter_file_records
+from management.seed.ledger import SeedLedger
+from management.seed.plan import compile_seed_plans
+from management.seed.stats import SeedStats
+from management.seed.tables import seed_checkpoint_table, table_exists
+from management.seed.writer import BatchWriter, WriteOptions
+
+
+@dataclass(frozen=True, slots=True)
+class Checkpoint:
+    """
+    Последняя зафиксированная позиция: файл, модель и __key__ записи верхнего уровня.
+    seed_key=None — файл source записан целиком.
+    """
+
+    source: str
+    model: str | None
+    seed_key: str | None
+    rows: int
+
+
+class CheckpointStore:
+    """
+    Checkpoint в таблице seed_checkpoint. Сохраняется в той же транзакции,
+    что и данные чанка, поэтому после сбоя указывает ровно на зафиксированное.
+    Таблицу не создаёт (см. management.seed.tables): пока её нет, checkpoint нет.
+    """
+
+    def __init__(self, run: str) -> None:
+        self.run = run
+
+    async def load(self, session: AsyncSession) -> Checkpoint | None:
+        if not await table_exists(session, seed_checkpoint_table):
+            return None
+        row = (
+            await session.execute(
+                select(
+                    seed_checkpoint_table.c.source,
+                    seed_checkpoint_table.c.model,
+                    seed_checkpoint_table.c.seed_key,
+                    seed_checkpoint_table.c.rows,
+                ).where(seed_checkpoint_table.c.run == self.run)
+            )
+        ).first()
+        return Checkpoint(*row) if row else None
+
+    async def save(self, session: AsyncSession, checkpoint: Checkpoint) -> None:
+        values = {
+            "run": self.run,
+            "source": checkpoint.source,
+            "model": checkpoint.model,
+            "seed_key": checkpoint.seed_key,
+            "rows": checkpoint.rows,
+        }
+        stmt = pg_insert(seed_checkpoint_table).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[seed_checkpoint_table.c.run],
+            set_={**{k: stmt.excluded[k] for k in values if k != "run"}, "updated_at": func.now()},
+        )
+        await session.execute(stmt)
+
+    async def clear(self, session: AsyncSession) -> None:
+        await session.execute(delete(seed_checkpoint_table).where(seed_checkpoint_table.c.run == self.run))
+
+
+async def seed_files_chunked(
+    session: AsyncSession,
+    paths: list[Path],
+    registry: dict[str, Any],
+    store: CheckpointStore,
+    commit_every: int,
+    options: WriteOptions | None = None,
+    stream: bool = False,
+    ledger: SeedLedger | None = None,
+    stats: SeedStats | None = None,
+    resume: bool = False,
+) -> tuple[dict[str, dict[str, int]], Checkpoint | None]:
+    """
+    Загрузка с фиксацией каждые commit_every строк (по границе записи верхнего уровня).
+
+    Вместе с каждым чанком коммитится checkpoint (файл, модель, последний __key__).
+    resume=True — продолжить с checkpoint прошлого прерванного прогона: записанные файлы
+    пропускаются, в текущем файле записи до checkpoint только готовятся (для ссылок через
+    __key__ и seed ledger), но не пишутся. После успешного прогона checkpoint удаляется.
+
+    Атомарности всего прогона здесь нет — это осознанный обмен на короткие транзакции.
+
+    Возвращает diff-отчёт по моделям и checkpoint, с которого продолжили (или None).
+    """
+    if commit_every < 1:
+        raise RuntimeError(f"commit_every должен быть >= 1, получено: {commit_every}")
+
+    options = options or WriteOptions()
+    plans = compile_seed_plans(registry)
+    report: dict[str, dict[str, int]] = {}
+
+    resumed_from = await store.load(session) if resume else None
+    sources = [SeedLedger.source_name(p) for p in paths]
+    if resumed_from is not None and resumed_from.source not in sources:
+        raise RuntimeError(f"Файл из checkpoint '{resumed_from.source}' отсутствует в списке загрузки")
+
+    # пока не дошли до файла из checkpoint — всё уже записано
+    skip_files = resumed_from is not None
+    rows_total = resumed_from.rows if resumed_from else 0
+
+    for path, source in zip(paths, sources, strict=True):
+        resume_key = None
+        if skip_files:
+            if source != resumed_from.source:
+                continue
+            skip_files = False
+            if resumed_from.seed_key is None:
+                continue
+            resume_key = resumed_from.seed_key
+
+        file_stats = stats.start_file(path) if stats is not None else None
+
+        ledger_state = None
+        if ledger is not None:
+            started = time.perf_counter()
+            ledger_state = await ledger.open(session, path)
+            if file_stats is not None:
+                file_stats.ledger_seconds += time.perf_counter() - started
+            if ledger_state is None:
+                if file_stats is not None:
+                    file_stats.skipped = True
+                continue
+
+        writer = BatchWriter(session, options, stats)
+        pending = 0
+        for rec, rows in iter_file_records(path, registry, plans, stream, ledger_state, stats):
+            seed_key = _get_key(rec.row)
+            if resume_key is not None:
+                # запись уже зафиксирована прошлым прогоном
+                if seed_key == resume_key:
+                    resume_key = None
+                continue
+
+            for plan, values in rows:
+                await writer.add(plan, values)
+            pending += len(rows)
+
+            if pending >= commit_every:
+                await writer.flush()
+                rows_total += pending
+                pending = 0
+                await store.save(session, Checkpoint(source, rec.Model.__name__, seed_key, rows_total))
+                await session.commit()
+
+        if resume_key is not None:
+            raise RuntimeError(f"__key__ '{resume_key}' из checkpoint не найден в {source}")
+
+        await writer.flush()
+        merge_diff_reports(report, writer.diff_report)
+        rows_total += pending
+
+        if ledger_state is not None:
+            started = time.perf_counter()
+            await ledger_state.save(session)
+            if file_stats is not None:
+                file_stats.ledger_seconds += time.perf_counter() - started
+
+        # файл целиком: при сбое на следующем файле этот не повторяется
+        await store.save(session, Checkpoint(source, None, None, rows_total))
+        await session.commit()
+
+    await store.clear(session)
+    await session.commit()
+    return report, resumed_from
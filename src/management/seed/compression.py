@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import io
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, TextIO
+
+if TYPE_CHECKING:
+    from management.seed.stats import SeedStats
+
+# Поддерживаемые seed-ресурсы: обычный JSON и сжатые варианты
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".xz")
+SEED_SUFFIXES = (".json", *(f".json{suffix}" for suffix in COMPRESSED_SUFFIXES))
+
+
+def compression_of(path: Path) -> str | None:
+    """
+    Суффикс сжатия файла (".gz" / ".zst" / ".xz") или None для обычного JSON.
+    """
+    return path.suffix if path.suffix in COMPRESSED_SUFFIXES else None
+
+
+def is_seed_file(path: Path) -> bool:
+    return path.name.endswith(SEED_SUFFIXES)
+
+
+def _open_zstd(path: Path) -> BinaryIO:
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        pass
+    else:
+        return zstd.open(path, "rb")
+
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(f"Для {path.name} нужен пакет zstandard (pip install zstandard) или Python 3.14+") from e
+    return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+
+
+def _open_decompressor(path: Path, compression: str) -> BinaryIO:
+    if compression == ".gz":
+        import gzip
+
+        return gzip.open(path, "rb")
+    if compression == ".xz":
+        import lzma
+
+        return lzma.open(path, "rb")
+    return _open_zstd(path)
+
+
+class _TimedReader(io.RawIOBase):
+    """
+    Пропускает чтение из распаковщика насквозь, накапливая время распаковки
+    (вместе с чтением сжатых байт с диска).
+    """
+
+    def __init__(self, fp: Any) -> None:
+        self._fp = fp
+        self.seconds = 0.0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        started = time.perf_counter()
+        try:
+            return self._fp.readinto(buffer)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def readall(self) -> bytes:
+        started = time.perf_counter()
+        try:
+            return self._fp.read()
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def close(self) -> None:
+        if not self.closed:
+            self._fp.close()
+        super().close()
+
+
+@contextmanager
+def open_seed_file(path: Path, stats: SeedStats | None = None) -> Iterator[BinaryIO]:
+    """
+    Открывает seed-ресурс на чтение байт; сжатые файлы распаковываются потоком,
+    без временных файлов. Время распаковки уходит в stats (decompress_seconds).
+    """
+    compression = compression_of(path)
+    if compression is None:
+        with path.open("rb") as fp:
+            yield fp
+        return
+
+    reader = _TimedReader(_open_decompressor(path, compression))
+    try:
+        yield reader  # type: ignore[misc]
+    finally:
+        reader.close()
+        if stats is not None:
+            stats.add_decompress(reader.seconds)
+
+
+@contextmanager
+def open_seed_text(path: Path, stats: SeedStats | None = None) -> Iterator[TextIO]:
+    """
+    Как open_seed_file, но отдаёт текст (utf-8) — для потокового разбора.
+    """
+    with open_seed_file(path, stats) as fp:
+        text = io.TextIOWrapper(fp, encoding="utf-8")
+        try:
+            yield text
+        finally:
+            text.detach()
@@ -3,3 +3,28 @@ from __future__ import annotations
 # Стандартные служебные ключи JSON
 KEY_FIELD = "__key__"
 CHILDREN_FIELD = "__children__"
+
+# Размер пачки строк для multi-row INSERT ... ON CONFLICT
+DEFAULT_BATCH_SIZE = 1000
+
+# Ограничение PostgreSQL на число bind-параметров в одном запросе
+PG_MAX_BIND_PARAMS = 32767
+
+# С какого числа строк модели включается загрузка через COPY (0 — выключено)
+DEFAULT_COPY_THRESHOLD = 100_000
+
+# Сколько строк модели копить перед одним COPY + INSERT ... SELECT
+DEFAULT_COPY_BATCH_SIZE = 50_000
+
+# Каталог снимков compile_seed внутри resources
+DEFAULT_SNAPSHOT_DIR_NAME = "compiled"
+
+# Сколько секунд экземпляр ждёт advisory lock, пока seed выполняет другой
+DEFAULT_LOCK_TIMEOUT = 300.0
+
+# Наборы bench_seed
+SUITE_MICRO = "micro"
+SUITE_MEMORY = "memory"
+SUITE_E2E = "e2e"
+SUITE_FILES = "files"
+SUITES = (SUITE_MICRO, SUITE_MEMORY, SUITE_E2E, SUITE_FILES)
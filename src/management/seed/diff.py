@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import JSON, Integer, and_, cast, column, false, or_, select, values
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management.seed.constants import PG_MAX_BIND_PARAMS
+from management.seed.plan import ModelPlan
+
+DIFF_INSERT = "insert"
+DIFF_UPDATE = "update"
+DIFF_UNCHANGED = "unchanged"
+DIFF_KINDS = (DIFF_INSERT, DIFF_UPDATE, DIFF_UNCHANGED)
+
+_INDEX_COLUMN = "_seed_idx"
+
+
+def _comparable(expr: Any, col_type: Any) -> Any:
+    # у json нет оператора сравнения — сравниваем как jsonb
+    return cast(expr, JSONB) if isinstance(col_type, JSON) and not isinstance(col_type, JSONB) else expr
+
+
+async def classify_rows(
+    session: AsyncSession,
+    plan: ModelPlan,
+    columns: tuple[str, ...],
+    rows: list[dict[str, Any]],
+) -> list[str]:
+    """
+    Сравнивает подготовленные строки с тем, что уже лежит в БД.
+
+    Строки целиком уходят в БД одним VALUES на пачку и LEFT JOIN-ятся с таблицей по PK,
+    сравнение (IS DISTINCT FROM) делает PostgreSQL — так типы (uuid, timestamp, json ...)
+    приводятся так же, как при записи.
+
+    Возвращает для каждой строки: insert / update / unchanged.
+    """
+    target = plan.Model.__table__
+    pk_names = [target.c[k].name for k in plan.pk_keys]
+    data_keys = [k for k in columns if k not in plan.pk_keys]
+
+    result = [DIFF_UNCHANGED] * len(rows)
+    chunk = max(1, PG_MAX_BIND_PARAMS // (len(columns) + 1))
+
+    for start in range(0, len(rows), chunk):
+        part = rows[start : start + chunk]
+        seed_values = values(
+            column(_INDEX_COLUMN, Integer),
+            *(column(target.c[k].name, target.c[k].type) for k in columns),
+            name="seed_values",
+        ).data([(start + i, *(row[k] for k in columns)) for i, row in enumerate(part)])
+
+        on_pk = and_(*(seed_values.c[name] == target.c[name] for name in pk_names))
+        if data_keys:
+            changed = or_(
+                *(
+                    _comparable(target.c[k], target.c[k].type).is_distinct_from(
+                        _comparable(seed_values.c[target.c[k].name], target.c[k].type)
+                    )
+                    for k in data_keys
+                )
+            )
+        else:
+            changed = false()
+
+        stmt = select(
+            seed_values.c[_INDEX_COLUMN],
+            target.c[pk_names[0]].is_(None).label("is_new"),
+            changed.label("is_changed"),
+        ).select_from(seed_values.outerjoin(target, on_pk))
+
+        for idx, is_new, is_changed in (await session.execute(stmt)).tuples():
+            if is_new:
+                result[idx] = DIFF_INSERT
+            elif is_changed:
+                result[idx] = DIFF_UPDATE
+
+    return result
+
+
+def merge_diff_reports(target: dict[str, dict[str, int]], source: dict[str, dict[str, int]]) -> None:
+    for model_name, counts in source.items():
+        merged = target.setdefault(model_name, dict.fromkeys(DIFF_KINDS, 0))
+        for kind, count in counts.items():
+            merged[kind] += count
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 import json
-import uuid
+import time
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.utils.insert_or_update import upsert_generic
-from management.seed.constants import CHILDREN_FIELD, KEY_FIELD
+from management.seed.compression import open_seed_file
+from management.seed.constants import CHILDREN_FIELD, DEFAULT_BATCH_SIZE, KEY_FIELD
+from management.seed.diff import merge_diff_reports
+from management.seed.keyindex import KeyIndex, uuid5_str
+from management.seed.ledger import LedgerState, SeedLedger
+from management.seed.plan import ModelPlan, compile_model_plan, compile_seed_plans
+from management.seed.stats import SeedStats
+from management.seed.stream import SectionRows, iter_json_file_sections
+from management.seed.writer import BatchWriter, WriteOptions
 
+if TYPE_CHECKING:
+    from management.seed.snapshot import SeedSnapshot
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class SeedRecord:
     model_key: str
     Model: Any
@@ -21,15 +32,16 @@ class SeedRecord:
 
 
 def deterministic_id_from_key(key: str) -> str:
-    return str(uuid.uuid5(uuid.NAMESPACE_OID, key))
+    return uuid5_str(key)
 
 
-def load_json(path: Path) -> dict[str, Any]:
+def load_json(path: Path, stats: SeedStats | None = None) -> dict[str, Any]:
     """
-    Загружает JSON файл в память.
+    Загружает JSON файл (в т.ч. .json.gz / .zst / .xz) в память.
     Здесь нет логики — только I/O.
     """
-    return json.loads(path.read_text("utf-8"))
+    with open_seed_file(path, stats) as fp:
+        return json.loads(fp.read().decode("utf-8"))
 
 
 def _get_key(row: dict[str, Any]) -> str:
@@ -42,6 +54,32 @@ def _get_key(row: dict[str, Any]) -> str:
     return str(key)
 
 
+def _resolve_section(raw_key: Any, rows: Any, registry: dict[str, Any]) -> Any:
+    """
+    Валидирует секцию верхнего уровня и возвращает её модель.
+    """
+    if not isinstance(raw_key, str):
+        raise RuntimeError(f"Ключ верхнего уровня должен быть строкой, получено: {type(raw_key)}")
+
+    lookup = raw_key.strip().lower()
+    if lookup not in registry:
+        raise RuntimeError(
+            f"Неизвестная модель '{raw_key}' в JSON. Допустимо: имя класса / __tablename__ / snake_case."
+        )
+
+    if not isinstance(rows, list | SectionRows):
+        raise RuntimeError(f"Ожидается список записей для '{raw_key}', получено: {type(rows)}")
+
+    return registry[lookup]
+
+
+def _iter_section_records(raw_key: str, Model: Any, rows: Iterable[Any]) -> Iterator[SeedRecord]:
+    for row in rows:
+        if not isinstance(row, dict):
+            raise RuntimeError(f"Ожидается dict для '{raw_key}', получено: {type(row)}")
+        yield SeedRecord(raw_key, Model, row)
+
+
 def flatten_payload(payload: dict[str, Any], registry: dict[str, Any]) -> list[SeedRecord]:
     """
     Преобразует JSON payload в плоский список SeedRecord.
@@ -54,50 +92,46 @@ def flatten_payload(payload: dict[str, Any], registry: dict[str, Any]) -> list[S
     records: list[SeedRecord] = []
 
     for raw_key, rows in payload.items():
-        if not isinstance(raw_key, str):
-            raise RuntimeError(f"Ключ верхнего уровня должен быть строкой, получено: {type(raw_key)}")
+        Model = _resolve_section(raw_key, rows, registry)
+        records.extend(_iter_section_records(raw_key, Model, rows))
 
-        lookup = raw_key.strip().lower()
-        if lookup not in registry:
-            raise RuntimeError(
-                f"Неизвестная модель '{raw_key}' в JSON. Допустимо: имя класса / __tablename__ / snake_case."
-            )
+    return records
 
-        if not isinstance(rows, list):
-            raise RuntimeError(f"Ожидается список записей для '{raw_key}', получено: {type(rows)}")
 
-        Model = registry[lookup]
-        for row in rows:
-            if not isinstance(row, dict):
-                raise RuntimeError(f"Ожидается dict для '{raw_key}', получено: {type(row)}")
-            records.append(SeedRecord(raw_key, Model, row))
+def iter_stream_records(path: Path, registry: dict[str, Any], stats: SeedStats | None = None) -> Iterator[SeedRecord]:
+    """
+    Потоковый аналог load_json + flatten_payload.
 
-    return records
+    Файл разбирается по одной записи, в памяти не держится ни payload, ни список SeedRecord.
+    Валидация и тексты ошибок — те же, что у flatten_payload.
+    """
+    for raw_key, rows in iter_json_file_sections(path, stats=stats):
+        Model = _resolve_section(raw_key, rows, registry)
+        yield from _iter_section_records(raw_key, Model, rows)
 
 
-def build_key_to_id(records: list[SeedRecord]) -> dict[str, str]:
+def build_key_to_id(records: list[SeedRecord]) -> KeyIndex:
     """
     Строит mapping:
         __key__ -> id
 
     ВАЖНО:
-    - собираем ключи и из вложенных __children__
+    - собираем ключи и из вложенных __children__ любой глубины
     - это позволяет join-сущностям ссылаться на дочерние записи
+    - обход итеративный (стек), глубина дерева не упирается в лимит рекурсии
     """
-    key_to_id: dict[str, str] = {}
+    key_to_id = KeyIndex()
 
-    def visit_obj(obj: dict[str, Any]) -> None:
-        k = _get_key(obj)
-        key_to_id[k] = deterministic_id_from_key(k)
+    stack = [rec.row for rec in reversed(records)]
+    while stack:
+        obj = stack.pop()
+        key_to_id.put(_get_key(obj))
 
         raw_children = obj.get(CHILDREN_FIELD)
         if isinstance(raw_children, dict):
-            for items in raw_children.values():
-                for child in items:
-                    visit_obj(child)
-
-    for rec in records:
-        visit_obj(rec.row)
+            # в обратном порядке — чтобы ключи обходились в порядке JSON
+            for items in reversed(list(raw_children.values())):
+                stack.extend(reversed(items))
 
     return key_to_id
 
@@ -132,30 +166,33 @@ def split_scalars_and_children(
     return scalars, children
 
 
-def prepare_row(Model: Any, row: dict[str, Any], key_to_id: dict[str, str]) -> dict[str, Any]:
-    mapper = sa_inspect(Model)
-    columns = {c.key: c for c in mapper.columns}
+def prepare_row(
+    Model: Any,
+    row: dict[str, Any],
+    key_to_id: KeyIndex,
+    plan: ModelPlan | None = None,
+) -> dict[str, Any]:
+    if plan is None:
+        plan = compile_model_plan(Model)
+    columns = plan.columns
+    fk_columns = plan.fk_columns
 
     seed_key = _get_key(row)
     prepared: dict[str, Any] = {}
 
     for k, v in row.items():
-        if k in (KEY_FIELD, CHILDREN_FIELD):
-            continue
         if k not in columns:
-            # допускаем лишние поля в JSON
+            # допускаем лишние поля в JSON (служебные __key__ / __children__ тоже сюда)
             continue
 
-        col = columns[k]
-
         # FK: если значение строка и совпадает с __key__ другой сущности
-        if col.foreign_keys and isinstance(v, str) and v in key_to_id:
+        if k in fk_columns and isinstance(v, str) and v in key_to_id:
             v = key_to_id[v]
 
         prepared[k] = v
 
     # если у модели есть id — берём либо явный row["id"], либо id из key_to_id
-    if "id" in columns:
+    if plan.has_id:
         prepared["id"] = str(row.get("id") or key_to_id[seed_key])
 
     return prepared
@@ -165,6 +202,7 @@ async def upsert_by_pk(
     session: AsyncSession,
     Model: Any,
     values: dict[str, Any],
+    plan: ModelPlan | None = None,
 ) -> None:
     """
     Универсальный upsert по первичному ключу.
@@ -173,30 +211,176 @@ async def upsert_by_pk(
     - PK может быть составным (join-таблица)
     - если нечего обновлять → upsert_generic сделает ON CONFLICT DO NOTHING
     """
-    mapper = sa_inspect(Model)
-    pk_keys = [c.key for c in mapper.primary_key]
-    if not pk_keys:
-        raise RuntimeError(f"У модели {Model.__name__} не найден primary key")
-
-    index_elements = [getattr(Model, k) for k in pk_keys]
-    exclude_on_update = tuple(pk_keys)
+    if plan is None:
+        plan = compile_model_plan(Model)
 
     await upsert_generic(
         session=session,
         model=Model,
         values=values,
-        index_elements=index_elements,
-        exclude_on_update=exclude_on_update,
+        index_elements=list(plan.index_elements),
+        exclude_on_update=plan.pk_keys,
     )
 
 
-async def seed_payload(
-    session: AsyncSession,
+def _prefill_key_to_id(records: list[SeedRecord]) -> KeyIndex:
+    key_to_id = KeyIndex()
+    for rec in records:
+        key_to_id.put(_get_key(rec.row), rec.row.get("id"))
+    return key_to_id
+
+
+class ChildResolver:
+    """
+    Разрешение вложенных моделей из __children__ с кэшем на пару
+    (модель родителя, ключ вложенной модели) -> (план ребёнка, FK-колонка на родителя).
+
+    Нормализация ключа, поиск в registry и FK на родителя считаются один раз на пару,
+    а не на каждую дочернюю запись.
+    """
+
+    __slots__ = ("_cache", "_plans", "_registry")
+
+    def __init__(self, registry: dict[str, Any], plans: dict[Any, ModelPlan]) -> None:
+        self._registry = registry
+        self._plans = plans
+        self._cache: dict[tuple[Any, str], tuple[ModelPlan, str]] = {}
+
+    def resolve(self, parent_plan: ModelPlan, child_model_key: str) -> tuple[ModelPlan, str]:
+        cache_key = (parent_plan.Model, child_model_key)
+        resolved = self._cache.get(cache_key)
+        if resolved is not None:
+            return resolved
+
+        child_lookup = child_model_key.strip().lower()
+        if child_lookup not in self._registry:
+            raise RuntimeError(f"Неизвестная вложенная модель '{child_model_key}'")
+
+        ChildModel = self._registry[child_lookup]
+        child_plan = self._plans[ChildModel]
+
+        # FK дочерней модели, который указывает на родителя
+        fk_to_parent = child_plan.parent_fk.get(parent_plan.table_name)
+        if not fk_to_parent:
+            raise RuntimeError(f"Не найден FK у '{ChildModel.__name__}' на '{parent_plan.Model.__name__}'.")
+
+        resolved = self._cache[cache_key] = (child_plan, fk_to_parent)
+        return resolved
+
+
+def prepare_record(
+    rec: SeedRecord,
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    key_to_id: KeyIndex,
+    children: ChildResolver | None = None,
+) -> list[tuple[ModelPlan, dict[str, Any]]]:
+    """
+    Готовит одну запись верхнего уровня вместе со всеми её __children__ (любой глубины).
+
+    Вложенные записи обходятся по уровням без рекурсии: сначала все дети, затем все внуки и т.д.
+    Строки уровня сгруппированы по моделям, поэтому каждая модель уровня пишется пачкой,
+    а родители всегда идут раньше своих детей.
+
+    key_to_id может быть заполнен заранее (dict payload) или пополняться по ходу
+    (потоковый режим — тогда разрешаются только ссылки на уже встреченные __key__).
+    """
+    if children is None:
+        children = ChildResolver(registry, plans)
+
+    seed_key = _get_key(rec.row)
+    key_to_id.ensure(seed_key, rec.row.get("id"))
+
+    scalars, nested = split_scalars_and_children(rec.row)
+    plan = plans[rec.Model]
+
+    # 1) основная сущность
+    rows = [(plan, prepare_row(rec.Model, scalars, key_to_id, plan))]
+
+    # 2) O2M: уровни вложенности — (план родителя, id родителя, его __children__)
+    level = [(plan, key_to_id[seed_key], nested)] if nested else []
+    while level:
+        next_level: list[tuple[ModelPlan, str, dict[str, list[dict[str, Any]]]]] = []
+        level_rows: dict[Any, list[tuple[ModelPlan, dict[str, Any]]]] = {}
+
+        for parent_plan, parent_id, groups in level:
+            for child_model_key, items in groups.items():
+                child_plan, fk_to_parent = children.resolve(parent_plan, child_model_key)
+                model_rows = level_rows.setdefault(child_plan.Model, [])
+
+                for child in items:
+                    child_seed_key = _get_key(child)
+
+                    # если у дочерней модели есть id — мы его заполним в prepare_row, но для маппинга
+                    # (если дальше кто-то будет ссылаться на ребёнка) добавим сразу
+                    key_to_id.ensure(child_seed_key, child.get("id"))
+
+                    child_scalars, grandchildren = split_scalars_and_children(child)
+                    # Проставляем FK на родителя
+                    child_scalars[fk_to_parent] = parent_id
+
+                    model_rows.append((child_plan, prepare_row(child_plan.Model, child_scalars, key_to_id, child_plan)))
+                    if grandchildren:
+                        next_level.append((child_plan, key_to_id[child_seed_key], grandchildren))
+
+        for model_rows in level_rows.values():
+            rows.extend(model_rows)
+        level = next_level
+
+    return rows
+
+
+def iter_record_rows(
+    records: Iterable[SeedRecord],
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    key_to_id: KeyIndex,
+    ledger_state: LedgerState | None = None,
+    stats: SeedStats | None = None,
+) -> Iterator[tuple[SeedRecord, list[tuple[ModelPlan, dict[str, Any]]]]]:
+    """
+    Как iter_prepared_records, но по записям верхнего уровня: (запись, её строки вместе с __children__).
+
+    Запись, не изменившаяся с прошлого прогона (ledger_state), отдаётся с пустым списком строк.
+    """
+    children = ChildResolver(registry, plans)
+    for rec in records:
+        if stats is None:
+            rows = prepare_record(rec, registry, plans, key_to_id, children)
+        else:
+            started = time.perf_counter()
+            rows = prepare_record(rec, registry, plans, key_to_id, children)
+            stats.add_prepare(rec.Model, rows, time.perf_counter() - started)
+        if ledger_state is not None and not ledger_state.is_changed(_get_key(rec.row), rows):
+            rows = []
+        yield rec, rows
+
+
+def iter_prepared_records(
+    records: Iterable[SeedRecord],
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    key_to_id: KeyIndex,
+    ledger_state: LedgerState | None = None,
+    stats: SeedStats | None = None,
+) -> Iterator[tuple[ModelPlan, dict[str, Any]]]:
+    """
+    Подготовка записей к записи в БД в порядке JSON (ожидается: родители → дети → join).
+
+    Если передан ledger_state — записи, не изменившиеся с прошлого прогона, пропускаются
+    (их __key__ всё равно попадают в key_to_id, ссылки на них разрешаются).
+    """
+    for _, rows in iter_record_rows(records, registry, plans, key_to_id, ledger_state, stats):
+        yield from rows
+
+
+def iter_prepared_rows(
     payload: dict[str, Any],
     registry: dict[str, Any],
-) -> None:
+    plans: dict[Any, ModelPlan] | None = None,
+) -> Iterator[tuple[ModelPlan, dict[str, Any]]]:
     """
-    Главный алгоритм загрузки данных.
+    Отдаёт подготовленные строки (ModelPlan, values) в порядке записи.
 
     Правила:
     - O2M обрабатывается только через __children__
@@ -204,64 +388,166 @@ async def seed_payload(
       (join-таблица — обычная сущность на верхнем уровне JSON)
     - ссылки между сущностями — только через __key__
     """
+    if plans is None:
+        plans = compile_seed_plans(registry)
+
     records = flatten_payload(payload, registry)
+    yield from iter_prepared_records(records, registry, plans, _prefill_key_to_id(records))
 
-    key_to_id: dict[str, str] = {}
-    for rec in records:
-        seed_key = _get_key(rec.row)
-        key_to_id[seed_key] = str(rec.row.get("id") or deterministic_id_from_key(seed_key))
 
-    # Проходим записи в порядке JSON (ожидается: родители → дети → join)
-    for rec in records:
-        scalars, children = split_scalars_and_children(rec.row)
+def iter_file_rows(
+    path: Path,
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    stream: bool = False,
+    ledger_state: LedgerState | None = None,
+    stats: SeedStats | None = None,
+    snapshot: SeedSnapshot | None = None,
+) -> Iterator[tuple[ModelPlan, dict[str, Any]]]:
+    """
+    Подготовленные строки одного файла.
 
-        # 1) upsert основной сущности
-        values = prepare_row(rec.Model, scalars, key_to_id)
-        await upsert_by_pk(session, rec.Model, values)
+    stream=True — потоковый разбор: ссылки через __key__ разрешаются только
+    на записи, описанные выше по файлу (что и так требуется контрактом "родители → дети → join").
 
-        # 2) O2M: создаём дочерние записи
-        if not children:
-            continue
+    snapshot — актуальный снимок файла (compile_seed): строки берутся из него уже
+    подготовленными, JSON не читается; stream в этом случае не важен.
 
-        parent_id = key_to_id[_get_key(rec.row)]
-        parent_table = sa_inspect(rec.Model).persist_selectable.name
+    С stats время разбора JSON (или декодирования снимка) и подготовки строк копится в stats.current.
+    """
+    if snapshot is not None:
+        blocks = snapshot.iter_model_blocks(ledger_state)
+        if stats is not None:
+            blocks = stats.timed(blocks)
+        for plan, rows in blocks:
+            if stats is not None:
+                stats.add_rows(plan.Model, len(rows))
+            for values in rows:
+                yield plan, values
+        return
+
+    for _, rows in iter_file_records(path, registry, plans, stream, ledger_state, stats):
+        yield from rows
+
+
+def iter_file_records(
+    path: Path,
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    stream: bool = False,
+    ledger_state: LedgerState | None = None,
+    stats: SeedStats | None = None,
+) -> Iterator[tuple[SeedRecord, list[tuple[ModelPlan, dict[str, Any]]]]]:
+    """
+    Подготовленные строки одного файла по записям верхнего уровня (см. iter_record_rows).
+    Разбор JSON — как в iter_file_rows.
+    """
+    if stream:
+        records: Iterable[SeedRecord] = iter_stream_records(path, registry, stats)
+        if stats is not None:
+            records = stats.timed(records)
+        yield from iter_record_rows(records, registry, plans, KeyIndex(), ledger_state, stats)
+        return
 
-        for child_model_key, items in children.items():
-            child_lookup = child_model_key.strip().lower()
-            if child_lookup not in registry:
-                raise RuntimeError(f"Неизвестная вложенная модель '{child_model_key}'")
+    started = time.perf_counter()
+    records = flatten_payload(load_json(path, stats), registry)
+    key_to_id = _prefill_key_to_id(records)
+    if stats is not None:
+        stats.add_parse(time.perf_counter() - started)
+    yield from iter_record_rows(records, registry, plans, key_to_id, ledger_state, stats)
 
-            ChildModel = registry[child_lookup]
-            child_mapper = sa_inspect(ChildModel)
 
-            # Ищем FK у дочерней модели, который указывает на родителя
-            fk_to_parent: str | None = None
-            for col in child_mapper.columns:
-                for fk in col.foreign_keys:
-                    if fk.column.table.name == parent_table:
-                        fk_to_parent = col.key
-                        break
-                if fk_to_parent:
-                    break
+async def seed_payload(
+    session: AsyncSession,
+    payload: dict[str, Any],
+    registry: dict[str, Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    plans: dict[Any, ModelPlan] | None = None,
+) -> None:
+    """
+    Главный алгоритм загрузки данных.
 
-            if not fk_to_parent:
-                raise RuntimeError(f"Не найден FK у '{ChildModel.__name__}' на '{rec.Model.__name__}'.")
+    Строки из iter_prepared_rows пишутся пачками через BatchWriter,
+    порядок "родители → дети → join" сохраняется.
+    """
+    writer = BatchWriter(session, WriteOptions(batch_size=batch_size))
+    for plan, values in iter_prepared_rows(payload, registry, plans):
+        await writer.add(plan, values)
+    await writer.flush()
 
-            for child in items:
-                child_seed_key = _get_key(child)
 
-                # если у ChildModel есть id — мы его заполним в prepare_row, но для маппинга
-                # (если дальше кто-то будет ссылаться на ребёнка) добавим сразу
-                key_to_id.setdefault(child_seed_key, child.get("id") or deterministic_id_from_key(child_seed_key))
+async def seed_stream(
+    session: AsyncSession,
+    path: Path,
+    registry: dict[str, Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    plans: dict[Any, ModelPlan] | None = None,
+) -> None:
+    """
+    Потоковая загрузка файла: память ограничена буферами BatchWriter и key_to_id,
+    а не размером файла.
+    """
+    if plans is None:
+        plans = compile_seed_plans(registry)
+
+    writer = BatchWriter(session, WriteOptions(batch_size=batch_size))
+    for plan, values in iter_file_rows(path, registry, plans, stream=True):
+        await writer.add(plan, values)
+    await writer.flush()
 
-                # Проставляем FK на родителя
-                child[fk_to_parent] = parent_id
 
-                child_values = prepare_row(ChildModel, child, key_to_id)
-                await upsert_by_pk(session, ChildModel, child_values)
+async def seed_files(
+    session: AsyncSession,
+    paths: list[Path],
+    registry: dict[str, Any],
+    options: WriteOptions | None = None,
+    stream: bool = False,
+    ledger: SeedLedger | None = None,
+    stats: SeedStats | None = None,
+    snapshots: dict[Path, SeedSnapshot] | None = None,
+) -> dict[str, dict[str, int]]:
+    """
+    Загружает файлы по очереди в одной сессии.
 
+    С ledger неизменившиеся файлы пропускаются целиком, а в изменившихся
+    пишутся только новые / изменённые записи.
+
+    С stats заполняется разбивка времени по файлам и моделям (разбор / подготовка / запись).
+    snapshots — актуальные снимки compile_seed по исходным путям; остальные файлы читаются из JSON.
+
+    Возвращает diff-отчёт по моделям (пустой, если options.diff / options.dry_run выключены).
+    """
+    options = options or WriteOptions()
+    report: dict[str, dict[str, int]] = {}
 
-async def seed_files(session: AsyncSession, paths: list[Path], registry: dict[str, Any]) -> None:
+    # планы моделей компилируются один раз на весь прогон
+    plans = compile_seed_plans(registry)
     for path in paths:
-        payload = load_json(path)
-        await seed_payload(session, payload, registry)
+        file_stats = stats.start_file(path) if stats is not None else None
+
+        ledger_state = None
+        if ledger is not None:
+            started = time.perf_counter()
+            ledger_state = await ledger.open(session, path)
+            if file_stats is not None:
+                file_stats.ledger_seconds += time.perf_counter() - started
+            if ledger_state is None:
+                if file_stats is not None:
+                    file_stats.skipped = True
+                continue
+
+        writer = BatchWriter(session, options, stats)
+        for plan, values in iter_file_rows(
+            path, registry, plans, stream, ledger_state, stats, snapshots.get(path) if snapshots else None
+        ):
+            await writer.add(plan, values)
+        await writer.flush()
+        merge_diff_reports(report, writer.diff_report)
+
+        if ledger_state is not None and not options.dry_run:
+            started = time.perf_counter()
+            await ledger_state.save(session)
+            if file_stats is not None:
+                file_stats.ledger_seconds += time.perf_counter() - started
+
+    return report
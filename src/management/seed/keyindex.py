@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import uuid
+from functools import lru_cache
+from typing import Any
+
+# Сколько последних uuid5 держать в памяти (горячие ключи: родители, на которых ссылаются дети / join)
+UUID5_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=UUID5_CACHE_SIZE)
+def uuid5_str(key: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, key))
+
+
+class KeyIndex:
+    """
+    Компактный индекс __key__ -> id.
+
+    Вместо dict[str, str] с 36-символьной строкой на каждый ключ:
+    - для ключей без явного id сам id не хранится вовсе — он детерминирован (uuid5 от ключа),
+      храним только членство ключа в set
+    - uuid5 мемоизируется ограниченным LRU (uuid5_str), а не для всех ключей сразу
+    - явно заданные id (обычно единицы) хранятся в отдельном словаре как есть
+    """
+
+    __slots__ = ("_derived", "_explicit")
+
+    def __init__(self) -> None:
+        self._derived: set[str] = set()
+        self._explicit: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._derived) + len(self._explicit)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._derived or key in self._explicit
+
+    def __getitem__(self, key: str) -> str:
+        if key in self._derived:
+            return uuid5_str(key)
+        return self._explicit[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def put(self, key: str, explicit_id: Any = None) -> None:
+        """
+        Записывает id ключа (перезаписывая старый): явный explicit_id или uuid5 от ключа.
+        """
+        if explicit_id:
+            self._derived.discard(key)
+            self._explicit[key] = str(explicit_id)
+        else:
+            self._explicit.pop(key, None)
+            self._derived.add(key)
+
+    def ensure(self, key: str, explicit_id: Any = None) -> None:
+        """
+        Как put, но только для новых ключей.
+        """
+        if key not in self._derived and key not in self._explicit:
+            self.put(key, explicit_id)
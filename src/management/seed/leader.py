@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from management.seed.constants import DEFAULT_LOCK_TIMEOUT
+
+DEFAULT_LOCK_POLL_INTERVAL = 1.0
+
+LEADER = "leader"
+SKIPPED = "skipped"
+
+
+def advisory_lock_key(name: str) -> int:
+    """
+    Стабильный bigint-ключ advisory lock из имени (одинаковый во всех экземплярах).
+    """
+    return int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class SeedLeaderLock:
+    """
+    Выбор одного "лидера" загрузки seed на весь кластер через pg advisory lock.
+
+    Блокировка сессионная, поэтому все операции с ней (попытки, is_current, unlock)
+    идут через одно выделенное AsyncConnection (engine.connect()), которое вызывающий
+    держит весь прогон: AsyncSession возвращает соединение в пул на commit, и lock
+    оказался бы на чужом соединении. Остальные экземпляры ждут блокировку, проверяя
+    между попытками, не стал ли seed уже актуальным (is_current), — тогда выходят сразу.
+
+    После acquire доступны waited (сколько ждали) и outcome (LEADER / SKIPPED).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = DEFAULT_LOCK_TIMEOUT,
+        poll_interval: float = DEFAULT_LOCK_POLL_INTERVAL,
+    ) -> None:
+        self.name = name
+        self.key = advisory_lock_key(name)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.waited = 0.0
+        self.outcome: str | None = None
+        self._acquired_at: float | None = None
+
+    async def _try_lock(self, connection: AsyncConnection) -> bool:
+        locked = bool(await connection.scalar(select(func.pg_try_advisory_lock(self.key))))
+        # не держим соединение "idle in transaction" между попытками; сессионный lock commit не снимает,
+        # а соединение остаётся за нами
+        await connection.commit()
+        return locked
+
+    @staticmethod
+    async def _is_current(
+        connection: AsyncConnection, is_current: Callable[[AsyncSession], Awaitable[bool]] | None
+    ) -> bool:
+        if is_current is None:
+            return False
+        # сессия поверх того же соединения: при закрытии откатывает только свою транзакцию
+        async with AsyncSession(bind=connection) as session:
+            return await is_current(session)
+
+    async def acquire(
+        self,
+        connection: AsyncConnection,
+        is_current: Callable[[AsyncSession], Awaitable[bool]] | None = None,
+        on_wait: Callable[[], None] | None = None,
+    ) -> str:
+        """
+        Ждёт блокировку не дольше timeout.
+
+        LEADER — блокировка взята и seed нужно выполнить,
+        SKIPPED — seed уже актуален (до или после ожидания), блокировка не удерживается.
+        По истечении timeout — RuntimeError.
+        """
+        started = time.monotonic()
+        waiting = False
+        while True:
+            if await self._try_lock(connection):
+                self.waited = time.monotonic() - started
+                self._acquired_at = time.monotonic()
+                # пока ждали, seed мог выполнить другой экземпляр
+                if await self._is_current(connection, is_current):
+                    await self.release(connection)
+                    self.outcome = SKIPPED
+                else:
+                    self.outcome = LEADER
+                return self.outcome
+
+            if await self._is_current(connection, is_current):
+                self.waited = time.monotonic() - started
+                self.outcome = SKIPPED
+                return self.outcome
+
+            if not waiting:
+                waiting = True
+                if on_wait is not None:
+                    on_wait()
+
+            if time.monotonic() - started >= self.timeout:
+                raise RuntimeError(
+                    f"Не дождались блокировки seed '{self.name}' за {self.timeout:.0f}s: её держит другой экземпляр"
+                )
+            await asyncio.sleep(self.poll_interval)
+
+    async def release(self, connection: AsyncConnection) -> float:
+        """
+        Снимает блокировку (на том же соединении, что и acquire); возвращает, сколько секунд она удерживалась.
+        """
+        if self._acquired_at is None:
+            return 0.0
+        await connection.scalar(select(func.pg_advisory_unlock(self.key)))
+        await connection.commit()
+        held = time.monotonic() - self._acquired_at
+        self._acquired_at = None
+        return held
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management.seed.constants import PG_MAX_BIND_PARAMS
+from management.seed.tables import seed_ledger_table, table_exists
+
+# Служебный ключ ledger для хэша файла целиком
+FILE_LEDGER_KEY = "__file__"
+
+_CHUNK = PG_MAX_BIND_PARAMS // 3
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def rows_digest(rows: list[tuple[Any, dict[str, Any]]]) -> str:
+    """
+    Хэш подготовленных строк записи (вместе с __children__).
+
+    Считается после разрешения FK, поэтому смена id у сущности, на которую ссылаются,
+    тоже делает запись изменённой.
+    """
+    data = [(plan.table_name, values) for plan, values in rows]
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LedgerState:
+    """
+    Состояние ledger для одного файла на время его загрузки.
+    """
+
+    def __init__(self, source: str, file_hash: str, stored: dict[str, str], force: bool) -> None:
+        self.source = source
+        self.file_hash = file_hash
+        self.stored = stored
+        self.force = force
+        self.current: dict[str, str] = {}
+        self.changed = 0
+        self.skipped = 0
+
+    def is_changed(self, seed_key: str, rows: list[tuple[Any, dict[str, Any]]]) -> bool:
+        return self.check(seed_key, rows_digest(rows))
+
+    def check(self, seed_key: str, digest: str) -> bool:
+        """
+        То же, что is_changed, но по готовому хэшу записи (например, из снимка compile_seed).
+        """
+        self.current[seed_key] = digest
+        if self.force or self.stored.get(seed_key) != digest:
+            self.changed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    async def save(self, session: AsyncSession) -> None:
+        entries = {**self.current, FILE_LEDGER_KEY: self.file_hash}
+        changed = [
+            {"source": self.source, "seed_key": key, "digest": digest}
+            for key, digest in entries.items()
+            if self.stored.get(key) != digest
+        ]
+        for start in range(0, len(changed), _CHUNK):
+            stmt = pg_insert(seed_ledger_table).values(changed[start : start + _CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[seed_ledger_table.c.source, seed_ledger_table.c.seed_key],
+                set_={"digest": stmt.excluded.digest, "updated_at": func.now()},
+            )
+            await session.execute(stmt)
+
+        # записи, которых больше нет в файле, из ledger убираем
+        removed = [key for key in self.stored if key not in entries]
+        for start in range(0, len(removed), _CHUNK):
+            keys = [(self.source, key) for key in removed[start : start + _CHUNK]]
+            await session.execute(
+                delete(seed_ledger_table).where(
+                    tuple_(seed_ledger_table.c.source, seed_ledger_table.c.seed_key).in_(keys)
+                )
+            )
+
+
+class SeedLedger:
+    """
+    Ledger загруженных seed-данных: хэш файла и хэш каждой записи по __key__.
+
+    - файл не менялся → пропускается целиком
+    - файл менялся → пишутся только новые / изменённые записи
+    - force=True → пишется всё, ledger только обновляется
+
+    Таблицу seed_ledger ledger не создаёт (см. management.seed.tables): пока её нет,
+    все файлы считаются изменёнными.
+    """
+
+    def __init__(self, force: bool = False) -> None:
+        self.force = force
+        self._table_exists: bool | None = None
+        # файлы за прогон не меняются — хэшируем каждый один раз
+        self._digests: dict[Path, str] = {}
+
+    def digest(self, path: Path) -> str:
+        if path not in self._digests:
+            self._digests[path] = file_digest(path)
+        return self._digests[path]
+
+    @staticmethod
+    def source_name(path: Path) -> str:
+        return path.name
+
+    async def _has_table(self, session: AsyncSession) -> bool:
+        if not self._table_exists:
+            self._table_exists = await table_exists(session, seed_ledger_table)
+        return self._table_exists
+
+    async def open(self, session: AsyncSession, path: Path) -> LedgerState | None:
+        """
+        Возвращает состояние для загрузки файла или None, если файл не менялся.
+        """
+        source = self.source_name(path)
+        file_hash = self.digest(path)
+
+        stored: dict[str, str] = {}
+        if await self._has_table(session):
+            rows = await session.execute(
+                select(seed_ledger_table.c.seed_key, seed_ledger_table.c.digest).where(
+                    seed_ledger_table.c.source == source
+                )
+            )
+            stored = dict(rows.tuples().all())
+
+        if not self.force and stored.get(FILE_LEDGER_KEY) == file_hash:
+            return None
+        return LedgerState(source, file_hash, stored, self.force)
+
+    async def is_current(self, session: AsyncSession, paths: list[Path]) -> bool:
+        """
+        Все файлы уже загружены в текущей версии (хэш файла совпадает с ledger).
+
+        Таблицу не создаёт: пока её нет — seed не актуален.
+        """
+        if self.force:
+            return False
+        if not await self._has_table(session):
+            return False
+
+        sources = {self.source_name(p): p for p in paths}
+        rows = await session.execute(
+            select(seed_ledger_table.c.source, seed_ledger_table.c.digest).where(
+                seed_ledger_table.c.seed_key == FILE_LEDGER_KEY, seed_ledger_table.c.source.in_(list(sources))
+            )
+        )
+        stored = dict(rows.tuples().all())
+        return all(stored.get(source) == self.digest(path) for source, path in sources.items())
@@ -4,6 +4,8 @@ import json
 from pathlib import Path
 from typing import Any
 
+from management.seed.compression import is_seed_file
+
 DEFAULT_MANIFEST_NAME = "seed_manifest.json"
 DEFAULT_JSON_GLOB = "*.json"
 
@@ -19,6 +21,20 @@ def load_manifest(path: Path) -> dict[str, Any]:
     return data
 
 
+def glob_seed_files(resources_dir: Path, patterns: str | list[str], exclude: list[str] | None = None) -> list[Path]:
+    """
+    Файлы по glob (строка или список масок, например ["*.json", "*.json.gz"]) без exclude.
+
+    Сжатые ресурсы (.json.gz / .json.zst / .json.xz) выбираются маской так же, как .json;
+    всё, что маске подошло, но seed-ресурсом не является (ReadMe.md, снимки), отбрасывается.
+    """
+    excluded = set(exclude or [])
+    found = {
+        p for pattern in ([patterns] if isinstance(patterns, str) else patterns) for p in resources_dir.glob(pattern)
+    }
+    return sorted(p for p in found if p.name not in excluded and p.is_file() and is_seed_file(p))
+
+
 def resolve_seed_files(
     *,
     command_name: str,
@@ -36,6 +52,8 @@ def resolve_seed_files(
     3) manifest.commands[command_name].files
     4) manifest.commands["all"].glob/exclude
     5) fallback: *.json
+
+    glob в manifest — строка или список масок.
     """
     if not resources_dir.exists():
         raise RuntimeError(f"Директория ресурсов не найдена: {resources_dir}")
@@ -57,8 +75,7 @@ def resolve_seed_files(
     if use_all:
         eff_glob = glob_mask or all_glob
         eff_exclude = exclude if exclude is not None else all_exclude
-        files = sorted(resources_dir.glob(eff_glob))
-        files = [p for p in files if p.name not in set(eff_exclude)]
+        files = glob_seed_files(resources_dir, eff_glob, eff_exclude)
         if not files:
             raise RuntimeError(f"Не найдено файлов по glob='{eff_glob}' в {resources_dir}")
         return files
@@ -74,12 +91,22 @@ def resolve_seed_files(
         return paths
 
     eff_glob = all_glob if not glob_mask else glob_mask
-    files = sorted(resources_dir.glob(eff_glob))
-    files = [p for p in files if p.name not in set(all_exclude)]
+    files = glob_seed_files(resources_dir, eff_glob, all_exclude)
     if files:
         return files
 
-    files = sorted(resources_dir.glob(glob_mask or DEFAULT_JSON_GLOB))
+    files = glob_seed_files(resources_dir, glob_mask or DEFAULT_JSON_GLOB)
     if not files:
         raise RuntimeError(f"JSON файлы не найдены в {resources_dir} по маске {glob_mask}")
     return files
+
+
+def load_command_options(command_name: str, manifest_path: Path) -> dict[str, Any]:
+    """
+    Дополнительные настройки команды из manifest.commands[command_name]
+    (например copy_models / copy_threshold). Нет manifest или секции → {}.
+    """
+    if not manifest_path.exists():
+        return {}
+    cmd_cfg = load_manifest(manifest_path)["commands"].get(command_name)
+    return cmd_cfg if isinstance(cmd_cfg, dict) else {}
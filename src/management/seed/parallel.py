@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from management.seed.diff import merge_diff_reports
+from management.seed.engine import iter_file_rows
+from management.seed.ledger import LedgerState, SeedLedger
+from management.seed.plan import ModelPlan, compile_seed_plans
+from management.seed.stats import SeedStats
+from management.seed.writer import BatchWriter, WriteOptions
+
+if TYPE_CHECKING:
+    from management.seed.snapshot import SeedSnapshot
+
+
+def model_dependencies(plans: dict[Any, ModelPlan]) -> dict[Any, set[Any]]:
+    """
+    Граф зависимостей моделей по FK-метаданным SQLAlchemy:
+        Model -> множество моделей, на таблицы которых она ссылается.
+
+    Ссылки на саму себя не учитываются — такие строки пишутся одной сессией по порядку.
+    """
+    by_table = {plan.table_name: Model for Model, plan in plans.items()}
+    deps: dict[Any, set[Any]] = {}
+    for Model, plan in plans.items():
+        deps[Model] = {by_table[table] for table in plan.parent_fk if table != plan.table_name and table in by_table}
+    return deps
+
+
+def dependency_levels(models: list[Any], deps: dict[Any, set[Any]]) -> list[list[list[Any]]]:
+    """
+    Раскладывает модели по уровням (топологическая сортировка Кана).
+
+    Уровень — список "юнитов", юнит — список моделей, которые пишутся одной сессией
+    последовательно. Юниты одного уровня независимы и могут писаться параллельно.
+
+    Модели из FK-циклов (и всё, что от них зависит) собираются в один последний юнит
+    в исходном порядке — для них сохраняется последовательная семантика.
+    """
+    present = set(models)
+    pending = {M: deps.get(M, set()) & present for M in models}
+
+    levels: list[list[list[Any]]] = []
+    while pending:
+        ready = [M for M in models if M in pending and not pending[M]]
+        if not ready:
+            levels.append([[M for M in models if M in pending]])
+            break
+        levels.append([[M] for M in ready])
+        for M in ready:
+            del pending[M]
+        for left in pending.values():
+            left.difference_update(ready)
+    return levels
+
+
+def collect_prepared_rows(
+    paths: list[Path],
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    stream: bool = False,
+    ledger_states: dict[Path, LedgerState] | None = None,
+    stats: SeedStats | None = None,
+    snapshots: dict[Path, SeedSnapshot] | None = None,
+) -> dict[Any, list[dict[str, Any]]]:
+    """
+    Готовит строки всех файлов и раскладывает их по моделям.
+
+    Порядок строк внутри модели и порядок первого появления моделей сохраняются.
+    """
+    rows_by_model: dict[Any, list[dict[str, Any]]] = {}
+    for path in paths:
+        ledger_state = ledger_states.get(path) if ledger_states else None
+        if stats is not None:
+            stats.start_file(path)
+        snapshot = snapshots.get(path) if snapshots else None
+        for plan, values in iter_file_rows(path, registry, plans, stream, ledger_state, stats, snapshot):
+            rows_by_model.setdefault(plan.Model, []).append(values)
+    if stats is not None:
+        # дальше запись идёт по моделям сразу из всех файлов
+        stats.current = None
+    return rows_by_model
+
+
+async def seed_files_parallel(
+    paths: list[Path],
+    registry: dict[str, Any],
+    session_factory: Callable[[], Any],
+    options: WriteOptions | None = None,
+    jobs: int = 2,
+    stream: bool = False,
+    ledger: SeedLedger | None = None,
+    stats: SeedStats | None = None,
+    snapshots: dict[Path, SeedSnapshot] | None = None,
+) -> dict[str, dict[str, int]]:
+    """
+    Параллельная загрузка по нескольким соединениям.
+
+    - строки всех файлов группируются по моделям
+    - модели раскладываются по уровням графа FK-зависимостей
+    - юниты одного уровня пишутся одновременно (не более jobs сессий),
+      следующий уровень стартует только после фиксации предыдущего
+
+    ВАЖНО: каждый юнит — отдельная транзакция (session_factory), атомарности
+    всего прогона, как в последовательном режиме, здесь нет. Строки всех файлов
+    собираются в памяти до записи первого уровня: stream влияет только на разбор JSON.
+
+    Возвращает diff-отчёт по моделям (как seed_files); stats — как в seed_files,
+    но время записи учитывается только по моделям; snapshots — как в seed_files.
+    """
+    if jobs < 1:
+        raise RuntimeError(f"jobs должен быть >= 1, получено: {jobs}")
+
+    options = options or WriteOptions()
+    plans = compile_seed_plans(registry)
+    report: dict[str, dict[str, int]] = {}
+
+    ledger_states: dict[Path, LedgerState] = {}
+    if ledger is not None:
+        async with session_factory() as session:
+            for path in paths:
+                started = time.perf_counter()
+                ledger_state = await ledger.open(session, path)
+                if stats is not None:
+                    file_stats = stats.start_file(path)
+                    file_stats.ledger_seconds += time.perf_counter() - started
+                    file_stats.skipped = ledger_state is None
+                if ledger_state is not None:
+                    ledger_states[path] = ledger_state
+            # ledger здесь только читается; в dry-run транзакцию явно не фиксируем
+            if options.dry_run:
+                await session.rollback()
+        # неизменившиеся файлы пропускаем целиком
+        paths = [p for p in paths if p in ledger_states]
+
+    rows_by_model = collect_prepared_rows(paths, registry, plans, stream, ledger_states, stats, snapshots)
+    levels = dependency_levels(list(rows_by_model), model_dependencies(plans))
+
+    semaphore = asyncio.Semaphore(jobs)
+
+    async def write_unit(unit: list[Any]) -> None:
+        async with semaphore, session_factory() as session:
+            writer = BatchWriter(session, options, stats)
+            for Model in unit:
+                plan = plans[Model]
+                for values in rows_by_model[Model]:
+                    await writer.add(plan, values)
+            await writer.flush()
+            merge_diff_reports(report, writer.diff_report)
+            if options.dry_run:
+                await session.rollback()
+
+    for level in levels:
+        await asyncio.gather(*(write_unit(unit) for unit in level))
+
+    # ledger фиксируем только после того, как записаны все уровни
+    if ledger_states and not options.dry_run:
+        async with session_factory() as session:
+            for path, ledger_state in ledger_states.items():
+                started = time.perf_counter()
+                await ledger_state.save(session)
+                if stats is not None:
+                    stats.files[str(path)].ledger_seconds += time.perf_counter() - started
+
+    return report
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management.seed.diff import merge_diff_reports
+from management.seed.engine import iter_file_rows
+from management.seed.ledger import LedgerState, SeedLedger
+from management.seed.plan import ModelPlan, compile_seed_plans
+from management.seed.prepared import PreparedFile, prepare_file
+from management.seed.registry import collect_models_registry
+from management.seed.stats import SeedStats
+from management.seed.writer import BatchWriter, WriteOptions
+
+if TYPE_CHECKING:
+    from management.seed.snapshot import SeedSnapshot
+
+DEFAULT_PIPELINE_DEPTH = 2
+
+# Состояние процесса-подготовщика: реестр и планы строятся один раз на процесс
+_worker_registry: dict[str, Any] | None = None
+_worker_plans: dict[Any, ModelPlan] | None = None
+
+
+def _mp_context() -> Any:
+    """
+    forkserver, где он есть, иначе spawn — не fork: родитель к этому моменту многопоточный
+    (поток записи логов, event loop), а fork такого процесса может зависнуть в дочернем.
+    Реестр и планы подготовщик собирает сам в _init_worker; модуль с моделями forkserver
+    импортирует один раз, заранее.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _init_worker() -> None:
+    global _worker_registry, _worker_plans
+    _worker_registry = collect_models_registry()
+    _worker_plans = compile_seed_plans(_worker_registry)
+
+
+def _prepare_in_worker(path: str, stream: bool, digests: bool) -> tuple[PreparedFile, SeedStats]:
+    stats = SeedStats()
+    prepared = prepare_file(Path(path), _worker_registry, _worker_plans, stream, digests, stats)
+    stats.current = None
+    return prepared, stats
+
+
+async def seed_files_pipelined(
+    session: AsyncSession,
+    paths: list[Path],
+    registry: dict[str, Any],
+    options: WriteOptions | None = None,
+    workers: int = 2,
+    stream: bool = False,
+    ledger: SeedLedger | None = None,
+    stats: SeedStats | None = None,
+    snapshots: dict[Path, SeedSnapshot] | None = None,
+    depth: int = DEFAULT_PIPELINE_DEPTH,
+) -> dict[str, dict[str, int]]:
+    """
+    Конвейерная загрузка: файлы разбираются и готовятся в пуле процессов,
+    пока текущий файл пишется в БД — время прогона стремится к max(CPU, I/O), а не к сумме.
+
+    - не больше depth файлов подготавливается впрок (ограниченная очередь = backpressure)
+    - запись идёт по одной сессии в порядке файлов, семантика — как у seed_files
+      (одна транзакция, порядок "родители → дети → join" внутри файла)
+    - файлы с актуальным снимком compile_seed читаются из снимка, без пула
+
+    Процессы-подготовщики собирают реестр моделей сами (collect_models_registry()),
+    registry здесь должен быть тем же реестром проекта.
+    """
+    if workers < 1:
+        raise RuntimeError(f"workers должен быть >= 1, получено: {workers}")
+
+    options = options or WriteOptions()
+    snapshots = snapshots or {}
+    plans = compile_seed_plans(registry)
+    plans_by_table = {plan.table_name: plan for plan in plans.values()}
+    report: dict[str, dict[str, int]] = {}
+
+    # ledger сверяем заранее: неизменившиеся файлы даже не отправляем в пул
+    ledger_states: dict[Path, LedgerState | None] = {}
+    for path in paths:
+        if ledger is None:
+            ledger_states[path] = None
+            continue
+        started = time.perf_counter()
+        ledger_state = await ledger.open(session, path)
+        if stats is not None:
+            file_stats = stats.start_file(path)
+            file_stats.ledger_seconds += time.perf_counter() - started
+            file_stats.skipped = ledger_state is None
+        if ledger_state is not None:
+            ledger_states[path] = ledger_state
+    paths = [p for p in paths if p in ledger_states]
+
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(), initializer=_init_worker)
+    queue: asyncio.Queue[tuple[Path, asyncio.Future[Any] | None]] = asyncio.Queue(maxsize=max(1, depth))
+
+    async def produce() -> None:
+        for path in paths:
+            future = None
+            if path not in snapshots:
+                future = loop.run_in_executor(
+                    pool, _prepare_in_worker, str(path), stream, ledger_states[path] is not None
+                )
+            # put блокируется, пока впереди depth файлов — пул не убегает от записи
+            await queue.put((path, future))
+
+    producer = asyncio.create_task(produce())
+    try:
+        for _ in paths:
+            path, future = await queue.get()
+            ledger_state = ledger_states[path]
+            if stats is not None:
+                stats.start_file(path)
+
+            writer = BatchWriter(session, options, stats)
+            if future is None:
+                rows = iter_file_rows(path, registry, plans, stream, ledger_state, stats, snapshots[path])
+                for plan, values in rows:
+                    await writer.add(plan, values)
+            else:
+                prepared, worker_stats = await future
+                if stats is not None:
+                    stats.merge(worker_stats)
+                for plan, block in prepared.iter_model_blocks(plans_by_table, ledger_state):
+                    for values in block:
+                        await writer.add(plan, values)
+            await writer.flush()
+            merge_diff_reports(report, writer.diff_report)
+
+            if ledger_state is not None and not options.dry_run:
+                started = time.perf_counter()
+                await ledger_state.save(session)
+                if stats is not None:
+                    stats.files[str(path)].ledger_seconds += time.perf_counter() - started
+
+        await producer
+    finally:
+        producer.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return report
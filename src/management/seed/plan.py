@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import inspect as sa_inspect
+
+
+@dataclass(frozen=True, slots=True)
+class ModelPlan:
+    """
+    Скомпилированный "план" загрузки для одной ORM-модели.
+
+    Всё, что раньше вычислялось через sa_inspect на каждую строку,
+    считается один раз на модель и переиспользуется весь прогон.
+    """
+
+    Model: Any
+    table_name: str
+    columns: frozenset[str]
+    fk_columns: frozenset[str]
+    pk_keys: tuple[str, ...]
+    index_elements: tuple[Any, ...]
+    has_id: bool
+    # имя таблицы родителя -> ключ FK-колонки этой модели, который на неё указывает
+    parent_fk: dict[str, str] = field(default_factory=dict)
+
+
+def compile_model_plan(Model: Any) -> ModelPlan:
+    mapper = sa_inspect(Model)
+
+    pk_keys = tuple(c.key for c in mapper.primary_key)
+    if not pk_keys:
+        raise RuntimeError(f"У модели {Model.__name__} не найден primary key")
+
+    columns = list(mapper.columns)
+    parent_fk: dict[str, str] = {}
+    for col in columns:
+        for fk in col.foreign_keys:
+            # первая FK-колонка на таблицу выигрывает (как и при построчном поиске)
+            parent_fk.setdefault(fk.column.table.name, col.key)
+
+    column_keys = frozenset(c.key for c in columns)
+    return ModelPlan(
+        Model=Model,
+        table_name=mapper.persist_selectable.name,
+        columns=column_keys,
+        fk_columns=frozenset(c.key for c in columns if c.foreign_keys),
+        pk_keys=pk_keys,
+        index_elements=tuple(getattr(Model, k) for k in pk_keys),
+        has_id="id" in column_keys,
+        parent_fk=parent_fk,
+    )
+
+
+def compile_seed_plans(registry: dict[str, Any]) -> dict[Any, ModelPlan]:
+    """
+    Компилирует планы для всех моделей реестра.
+
+    Одна модель зарегистрирована под несколькими ключами — план строится один раз.
+    """
+    plans: dict[Any, ModelPlan] = {}
+    for Model in registry.values():
+        if Model not in plans:
+            plans[Model] = compile_model_plan(Model)
+    return plans
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from management.seed.engine import (
+    ChildResolver,
+    _get_key,
+    _prefill_key_to_id,
+    flatten_payload,
+    iter_stream_records,
+    load_json,
+    prepare_record,
+)
+from management.seed.keyindex import KeyIndex
+from management.seed.ledger import LedgerState, rows_digest
+from management.seed.plan import ModelPlan
+from management.seed.stats import SeedStats
+
+# (колонки, строки-кортежи в порядке колонок, номер записи верхнего уровня для каждой строки)
+RowGroup = tuple[tuple[str, ...], tuple[tuple[Any, ...], ...], tuple[int, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedFile:
+    """
+    Подготовленные строки одного seed-файла в компактном виде, разложенные по моделям.
+
+    Только встроенные типы — дёшево передаётся между процессами (pickle)
+    и кодируется в снимок compile_seed (marshal).
+
+    blocks — (имя таблицы, группы строк) в порядке первого появления моделей.
+    record_keys / record_digests — __key__ и хэш для seed ledger каждой записи верхнего уровня.
+    """
+
+    record_keys: tuple[str, ...]
+    record_digests: tuple[str, ...]
+    blocks: tuple[tuple[str, tuple[RowGroup, ...]], ...]
+
+    @property
+    def rows(self) -> int:
+        return sum(len(ordinals) for _, groups in self.blocks for *_, ordinals in groups)
+
+    def iter_model_blocks(
+        self, plans_by_table: dict[str, ModelPlan], ledger_state: LedgerState | None = None
+    ) -> Iterator[tuple[ModelPlan, list[dict[str, Any]]]]:
+        changed = changed_records(self.record_keys, self.record_digests, ledger_state) if ledger_state else None
+        for table_name, groups in self.blocks:
+            rows = block_rows(groups, changed)
+            if rows:
+                yield plans_by_table[table_name], rows
+
+
+def changed_records(record_keys: Iterable[str], record_digests: Iterable[str], ledger_state: LedgerState) -> set[int]:
+    """
+    Номера записей верхнего уровня, изменившихся относительно seed ledger.
+    """
+    return {
+        ordinal
+        for ordinal, (seed_key, digest) in enumerate(zip(record_keys, record_digests, strict=True))
+        if ledger_state.check(seed_key, digest)
+    }
+
+
+def block_rows(groups: Iterable[RowGroup], changed: set[int] | None = None) -> list[dict[str, Any]]:
+    """
+    Разворачивает группы блока в dict-строки; changed — оставить только эти записи верхнего уровня.
+    """
+    rows: list[dict[str, Any]] = []
+    for columns, values, ordinals in groups:
+        if changed is None:
+            rows.extend(dict(zip(columns, row, strict=True)) for row in values)
+        else:
+            rows.extend(
+                dict(zip(columns, row, strict=True))
+                for row, ordinal in zip(values, ordinals, strict=True)
+                if ordinal in changed
+            )
+    return rows
+
+
+def prepare_file(
+    source: Path,
+    registry: dict[str, Any],
+    plans: dict[Any, ModelPlan],
+    stream: bool = False,
+    digests: bool = True,
+    stats: SeedStats | None = None,
+) -> PreparedFile:
+    """
+    Разбирает, валидирует и готовит файл целиком (как iter_file_rows), но складывает
+    строки по моделям. digests=False — не считать хэши записей (ledger не нужен).
+    """
+    if stats is not None:
+        stats.start_file(source)
+
+    if stream:
+        records: Iterable[Any] = iter_stream_records(source, registry, stats)
+        if stats is not None:
+            records = stats.timed(records)
+        key_to_id = KeyIndex()
+    else:
+        started = time.perf_counter()
+        records = flatten_payload(load_json(source, stats), registry)
+        key_to_id = _prefill_key_to_id(records)
+        if stats is not None:
+            stats.add_parse(time.perf_counter() - started)
+
+    record_keys: list[str] = []
+    record_digests: list[str] = []
+    # Model -> (колонки -> (строки, номера записей)); dict сохраняет порядок появления
+    blocks: dict[Any, dict[tuple[str, ...], tuple[list[tuple[Any, ...]], list[int]]]] = {}
+
+    children = ChildResolver(registry, plans)
+    for ordinal, rec in enumerate(records):
+        started = time.perf_counter()
+        rows = prepare_record(rec, registry, plans, key_to_id, children)
+        if digests:
+            record_keys.append(_get_key(rec.row))
+            record_digests.append(rows_digest(rows))
+        for plan, values in rows:
+            group = blocks.setdefault(plan.Model, {}).setdefault(tuple(values), ([], []))
+            group[0].append(tuple(values.values()))
+            group[1].append(ordinal)
+        if stats is not None:
+            stats.add_prepare(rec.Model, rows, time.perf_counter() - started)
+
+    return PreparedFile(
+        record_keys=tuple(record_keys),
+        record_digests=tuple(record_digests),
+        blocks=tuple(
+            (
+                # table_name — quoted_name (подкласс str); marshal принимает только str
+                str(plans[Model].table_name),
+                tuple((columns, tuple(rows), tuple(ordinals)) for columns, (rows, ordinals) in groups.items()),
+            )
+            for Model, groups in blocks.items()
+        ),
+    )
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class RecordingSession:
+    """
+    Поддельная AsyncSession для CPU-бенчмарков: запросы не выполняются, только считаются.
+
+    compile=True дополнительно компилирует каждый запрос под диалект PostgreSQL,
+    чтобы в замер попала стоимость построения SQL.
+    """
+
+    def __init__(self, compile: bool = True) -> None:
+        self.compile = compile
+        self.statements = 0
+        self.rows = 0
+        self.tables: dict[str, int] = {}
+
+        if compile:
+            from sqlalchemy.dialects import postgresql
+
+            self._dialect = postgresql.dialect()
+
+    async def execute(self, stmt: Any, *args: Any, **kwargs: Any) -> Any:
+        self.statements += 1
+        table = getattr(stmt, "table", None)
+        multi_values = getattr(stmt, "_multi_values", None)
+        rows = len(multi_values[0]) if multi_values else 1
+        self.rows += rows
+        if table is not None:
+            self.tables[table.name] = self.tables.get(table.name, 0) + rows
+        if self.compile:
+            stmt.compile(dialect=self._dialect)
+        return None
+
+    async def commit(self) -> None:
+        return None
+
+    async def rollback(self) -> None:
+        return None
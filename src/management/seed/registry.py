@@ -20,7 +20,7 @@ def _snake(name: str) -> str:
     return "".join(out)
 
 
-def collect_models_registry() -> dict[str, Any]:
+def collect_models_registry(Base: Any = None) -> dict[str, Any]:
     """
     Собирает реестр ORM-моделей для разрешения ключей JSON.
 
@@ -30,10 +30,14 @@ def collect_models_registry() -> dict[str, Any]:
     - snake_case имени класса (project_templates)
 
     Все ключи нормализуются в lower().
+
+    Base — декларативная база моделей; по умолчанию db.models.Base.
     """
-    from db import models as models_module
+    if Base is None:
+        from db import models as models_module
+
+        Base = models_module.Base
 
-    Base = models_module.Base
     registry: dict[str, Any] = {}
 
     def add(key: str, model: Any) -> None:
@@ -61,3 +65,16 @@ def collect_models_registry() -> dict[str, Any]:
         add(_snake(cls.__name__), cls)
 
     return registry
+
+
+def resolve_models(keys: list[str], registry: dict[str, Any]) -> frozenset[Any]:
+    """
+    Разрешает список ключей (имя класса / __tablename__ / snake_case) в ORM-модели.
+    """
+    models = set()
+    for key in keys:
+        lookup = str(key).strip().lower()
+        if lookup not in registry:
+            raise RuntimeError(f"Неизвестная модель '{key}'. Допустимо: имя класса / __tablename__ / snake_case.")
+        models.add(registry[lookup])
+    return frozenset(models)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import mmap
+import struct
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from management.seed.ledger import LedgerState, file_digest
+from management.seed.plan import ModelPlan
+from management.seed.prepared import block_rows, changed_records, prepare_file
+
+SNAPSHOT_SUFFIX = ".seedsnap"
+
+SNAPSHOT_VERSION = 1
+_MAGIC = b"SEEDSNAP"
+# magic, версия формата, длина заголовка
+_PREFIX = struct.Struct(f"<{len(_MAGIC)}sII")
+
+
+class StaleSnapshotError(RuntimeError):
+    """Снимок не соответствует исходному JSON, схеме моделей или интерпретатору."""
+
+
+def snapshot_path(snapshot_dir: Path, source: Path) -> Path:
+    return snapshot_dir / f"{source.name}{SNAPSHOT_SUFFIX}"
+
+
+def _runtime_tag() -> str:
+    # формат marshal может отличаться между версиями Python
+    return f"{sys.version_info.major}.{sys.version_info.minor}/marshal{marshal.version}"
+
+
+def schema_fingerprint(plans: list[ModelPlan]) -> str:
+    """
+    Хэш схемы моделей, попавших в снимок: таблицы, колонки, FK и PK.
+    Миграция любой из них делает снимок устаревшим.
+    """
+    parts = sorted(
+        (plan.table_name, sorted(plan.columns), sorted(plan.fk_columns), list(plan.pk_keys)) for plan in plans
+    )
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def compile_snapshot(source: Path, target: Path, registry: dict[str, Any], plans: dict[Any, ModelPlan]) -> int:
+    """
+    Разбирает и валидирует JSON ровно так же, как load_init_data, и пишет бинарный снимок:
+
+        magic | версия | длина заголовка | заголовок | блоки моделей
+
+    Заголовок (marshal): хэш исходника, хэш схемы, тег интерпретатора, записи верхнего
+    уровня (__key__, хэш для seed ledger) и оглавление блоков. Блок модели (marshal) —
+    группы строк PreparedFile; FK в строках уже разрешены в детерминированные id.
+
+    Порядок блоков = порядок первого появления моделей, как у BatchWriter.
+    Возвращает число строк в снимке.
+    """
+    prepared = prepare_file(source, registry, plans)
+    by_table = {plan.table_name: plan for plan in plans.values()}
+
+    encoded: list[bytes] = []
+    toc: list[tuple[str, int, int, int]] = []
+    offset = 0
+    for table_name, groups in prepared.blocks:
+        raw = marshal.dumps(groups)
+        toc.append((table_name, offset, len(raw), sum(len(ordinals) for *_, ordinals in groups)))
+        encoded.append(raw)
+        offset += len(raw)
+
+    header = marshal.dumps(
+        {
+            "source_digest": file_digest(source),
+            "schema": schema_fingerprint([by_table[table_name] for table_name, _ in prepared.blocks]),
+            "runtime": _runtime_tag(),
+            "record_keys": prepared.record_keys,
+            "record_digests": prepared.record_digests,
+            "models": tuple(toc),
+        }
+    )
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with tmp.open("wb") as fp:
+        fp.write(_PREFIX.pack(_MAGIC, SNAPSHOT_VERSION, len(header)))
+        fp.write(header)
+        for raw in encoded:
+            fp.write(raw)
+    # атомарная замена: параллельный старт не увидит недописанный файл
+    tmp.replace(target)
+    return prepared.rows
+
+
+class SeedSnapshot:
+    """
+    Открытый через mmap снимок одного seed-файла.
+
+    Блоки моделей декодируются по одному прямо из отображённой памяти,
+    JSON не разбирается и не валидируется повторно.
+    """
+
+    def __init__(self, path: Path, source: Path, plans: dict[Any, ModelPlan]) -> None:
+        self.path = path
+        self.source = source
+        self._fp = path.open("rb")
+        try:
+            self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # пустой файл mmap не отображает
+            self._fp.close()
+            raise StaleSnapshotError(f"Снимок {path} пуст") from None
+
+        try:
+            self._open(plans)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, plans: dict[Any, ModelPlan]) -> None:
+        if len(self._mm) < _PREFIX.size:
+            raise StaleSnapshotError(f"Снимок {self.path} повреждён")
+        magic, version, header_len = _PREFIX.unpack_from(self._mm)
+        if magic != _MAGIC or version != SNAPSHOT_VERSION:
+            raise StaleSnapshotError(f"Снимок {self.path}: неизвестный формат (версия {version})")
+
+        self._data_start = _PREFIX.size + header_len
+        header = self._decode(_PREFIX.size, header_len)
+        if header["runtime"] != _runtime_tag():
+            raise StaleSnapshotError(f"Снимок {self.path} собран под {header['runtime']}")
+        if header["source_digest"] != file_digest(self.source):
+            raise StaleSnapshotError(f"Снимок {self.path} устарел: {self.source.name} изменён")
+
+        by_table = {plan.table_name: plan for plan in plans.values()}
+        missing = [entry[0] for entry in header["models"] if entry[0] not in by_table]
+        if missing:
+            raise StaleSnapshotError(f"Снимок {self.path}: нет моделей для таблиц {', '.join(missing)}")
+
+        self.models: list[tuple[ModelPlan, int, int, int]] = [
+            (by_table[table], offset, length, rows) for table, offset, length, rows in header["models"]
+        ]
+        if header["schema"] != schema_fingerprint([plan for plan, *_ in self.models]):
+            raise StaleSnapshotError(f"Снимок {self.path} устарел: схема моделей изменилась")
+
+        self.record_keys: tuple[str, ...] = header["record_keys"]
+        self.record_digests: tuple[str, ...] = header["record_digests"]
+
+    def _decode(self, start: int, length: int) -> Any:
+        with memoryview(self._mm) as view, view[start : start + length] as block:
+            return marshal.loads(block)
+
+    @property
+    def rows(self) -> int:
+        return sum(rows for *_, rows in self.models)
+
+    def iter_model_blocks(
+        self, ledger_state: LedgerState | None = None
+    ) -> Iterator[tuple[ModelPlan, list[dict[str, Any]]]]:
+        """
+        Строки снимка по моделям, в порядке записи.
+        """
+        changed = changed_records(self.record_keys, self.record_digests, ledger_state) if ledger_state else None
+        for plan, offset, length, _ in self.models:
+            rows = block_rows(self._decode(self._data_start + offset, length), changed)
+            if rows:
+                yield plan, rows
+
+    def close(self) -> None:
+        self._mm.close()
+        self._fp.close()
+
+
+def open_snapshot(snapshot_dir: Path, source: Path, plans: dict[Any, ModelPlan]) -> SeedSnapshot:
+    """
+    Открывает снимок для source; StaleSnapshotError, если его нет или он устарел.
+    """
+    path = snapshot_path(snapshot_dir, source)
+    if not path.exists():
+        raise StaleSnapshotError(f"Снимок {path} не найден")
+    return SeedSnapshot(path, source, plans)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class ModelStats:
+    """
+    Счётчики одной модели за прогон.
+
+    prepare_seconds — подготовка записей верхнего уровня этой модели (вместе с __children__),
+    db_seconds — запросы записи / diff этой модели.
+    """
+
+    rows_prepared: int = 0
+    rows_written: int = 0
+    statements: int = 0
+    prepare_seconds: float = 0.0
+    db_seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        seconds = self.prepare_seconds + self.db_seconds
+        return self.rows_prepared / seconds if seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "rows_per_sec": self.rows_per_sec}
+
+
+@dataclass(slots=True)
+class FileStats:
+    """
+    Счётчики одного файла: распаковка, разбор JSON, подготовка строк, запись, seed ledger.
+
+    decompress_seconds — распаковка сжатых ресурсов (.json.gz / .zst / .xz), она
+    не входит в parse_seconds.
+
+    В параллельном режиме запись идёт по моделям сразу из всех файлов,
+    поэтому db_seconds / statements файла там не заполняются — только по моделям.
+    """
+
+    path: str
+    skipped: bool = False
+    rows_prepared: int = 0
+    rows_written: int = 0
+    statements: int = 0
+    decompress_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    prepare_seconds: float = 0.0
+    db_seconds: float = 0.0
+    ledger_seconds: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return (
+            self.decompress_seconds + self.parse_seconds + self.prepare_seconds + self.db_seconds + self.ledger_seconds
+        )
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_prepared / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "seconds": self.seconds, "rows_per_sec": self.rows_per_sec}
+
+
+_MODEL_COUNTERS = ("rows_prepared", "rows_written", "statements", "prepare_seconds", "db_seconds")
+_FILE_COUNTERS = (*_MODEL_COUNTERS, "decompress_seconds", "parse_seconds", "ledger_seconds")
+
+
+@dataclass(slots=True)
+class SeedStats:
+    """
+    Инструментация прогона seed: по файлам и по моделям.
+
+    Передаётся в seed_files / seed_files_parallel и BatchWriter; без неё движок
+    ничего не замеряет.
+    """
+
+    files: dict[str, FileStats] = field(default_factory=dict)
+    models: dict[str, ModelStats] = field(default_factory=dict)
+    current: FileStats | None = None
+
+    def start_file(self, path: Path) -> FileStats:
+        self.current = self.files.setdefault(str(path), FileStats(str(path)))
+        return self.current
+
+    def model(self, Model: Any) -> ModelStats:
+        name = Model.__name__
+        stats = self.models.get(name)
+        if stats is None:
+            stats = self.models[name] = ModelStats()
+        return stats
+
+    def add_parse(self, seconds: float) -> None:
+        if self.current is not None:
+            self.current.parse_seconds += seconds
+
+    def add_decompress(self, seconds: float) -> None:
+        """
+        Распаковка идёт внутри замера разбора — переносим её время из parse_seconds.
+        """
+        if self.current is not None:
+            self.current.decompress_seconds += seconds
+            self.current.parse_seconds -= seconds
+
+    def add_prepare(self, Model: Any, rows: list[tuple[Any, dict[str, Any]]], seconds: float) -> None:
+        self.model(Model).prepare_seconds += seconds
+        for plan, _ in rows:
+            self.model(plan.Model).rows_prepared += 1
+        if self.current is not None:
+            self.current.prepare_seconds += seconds
+            self.current.rows_prepared += len(rows)
+
+    def add_rows(self, Model: Any, count: int) -> None:
+        """Строки, пришедшие уже подготовленными (из снимка compile_seed)."""
+        self.model(Model).rows_prepared += count
+        if self.current is not None:
+            self.current.rows_prepared += count
+
+    def add_write(self, Model: Any, rows: int, statements: int, seconds: float) -> None:
+        stats = self.model(Model)
+        stats.rows_written += rows
+        stats.statements += statements
+        stats.db_seconds += seconds
+        if self.current is not None:
+            self.current.rows_written += rows
+            self.current.statements += statements
+            self.current.db_seconds += seconds
+
+    def merge(self, other: SeedStats) -> None:
+        """
+        Добавляет счётчики другого прогона (например, из процесса-подготовщика).
+        """
+        for path, theirs in other.files.items():
+            ours = self.files.setdefault(path, FileStats(path))
+            for name in _FILE_COUNTERS:
+                setattr(ours, name, getattr(ours, name) + getattr(theirs, name))
+        for name, theirs in other.models.items():
+            ours = self.models.setdefault(name, ModelStats())
+            for counter in _MODEL_COUNTERS:
+                setattr(ours, counter, getattr(ours, counter) + getattr(theirs, counter))
+
+    def timed(self, items: Iterable[T]) -> Iterator[T]:
+        """
+        Пропускает итератор разбора насквозь, относя время его next() к parse_seconds
+        (в потоковом режиме разбор и подготовка чередуются).
+        """
+        it = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_parse(time.perf_counter() - started)
+                return
+            self.add_parse(time.perf_counter() - started)
+            yield item
+
+    def totals(self) -> dict[str, Any]:
+        files = self.files.values()
+        return {
+            "files": len(self.files),
+            "files_skipped": sum(f.skipped for f in files),
+            "rows_prepared": sum(f.rows_prepared for f in files),
+            "rows_written": sum(m.rows_written for m in self.models.values()),
+            "statements": sum(m.statements for m in self.models.values()),
+            "decompress_seconds": sum(f.decompress_seconds for f in files),
+            "parse_seconds": sum(f.parse_seconds for f in files),
+            "prepare_seconds": sum(f.prepare_seconds for f in files),
+            "db_seconds": sum(m.db_seconds for m in self.models.values()),
+            "ledger_seconds": sum(f.ledger_seconds for f in files),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "totals": self.totals(),
+            "files": [f.as_dict() for f in self.files.values()],
+            # самые тяжёлые модели — первыми
+            "models": {
+                name: stats.as_dict()
+                for name, stats in sorted(
+                    self.models.items(), key=lambda item: item[1].prepare_seconds + item[1].db_seconds, reverse=True
+                )
+            },
+        }
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+from management.seed.compression import open_seed_text
+
+if TYPE_CHECKING:
+    from management.seed.stats import SeedStats
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_TAIL = "0123456789.eE+-"
+
+
+class _JsonStream:
+    """
+    Минимальный инкрементальный разбор JSON из текстового потока.
+
+    В памяти держится только текущее окно буфера: значения разбираются
+    через JSONDecoder.raw_decode, буфер дочитывается, пока значение не станет полным.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # отбрасываем уже разобранную часть, чтобы буфер не рос вместе с файлом
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                # большое значение: читаем всё более крупными кусками, чтобы не разбирать его заново на каждый чанк
+                size *= 2
+                continue
+            # число у края буфера могло быть обрезано ("2." из "2.5") — дочитываем и разбираем заново
+            if (
+                isinstance(obj, int | float)
+                and not isinstance(obj, bool)
+                and (end == len(self.buf) or self.buf[end] in _NUMBER_TAIL)
+                and self._fill(size)
+            ):
+                continue
+            self.pos = end
+            return obj
+
+
+class SectionRows:
+    """
+    Ленивый итератор по строкам одной секции: {"Model": [row, ...]}.
+
+    Должен быть прочитан до перехода к следующей секции
+    (недочитанный остаток iter_json_sections пропустит сам).
+    """
+
+    def __init__(self, stream: _JsonStream) -> None:
+        self._stream = stream
+        self._done = False
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        stream = self._stream
+        if stream.peek() == "]":
+            stream.pos += 1
+            self._done = True
+            raise StopIteration
+        row = stream.value()
+        if stream.expect(",]") == "]":
+            self._done = True
+        return row
+
+    def drain(self) -> None:
+        for _ in self:
+            pass
+
+
+def iter_json_sections(fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[Any, Any]]:
+    """
+    Потоково разбирает seed JSON вида {"Model": [row, ...], ...}.
+
+    Отдаёт пары (ключ секции, значение). Для списков значение — SectionRows,
+    строки которого разбираются по одной; любое другое значение отдаётся целиком
+    (валидацию делает вызывающий).
+    """
+    stream = _JsonStream(fp, chunk_size)
+
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.pos += 1
+        return
+
+    while True:
+        raw_key = stream.value()
+        stream.expect(":")
+
+        if stream.peek() == "[":
+            stream.pos += 1
+            rows = SectionRows(stream)
+            yield raw_key, rows
+            rows.drain()
+        else:
+            yield raw_key, stream.value()
+
+        if stream.expect(",}") == "}":
+            break
+
+
+def iter_json_file_sections(
+    path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, stats: SeedStats | None = None
+) -> Iterator[tuple[Any, Any]]:
+    """
+    iter_json_sections по файлу; .json.gz / .zst / .xz распаковываются потоком.
+    """
+    with open_seed_text(path, stats) as fp:
+        yield from iter_json_sections(fp, chunk_size)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from management.seed.constants import CHILDREN_FIELD, KEY_FIELD
+
+
+@dataclass(frozen=True, slots=True)
+class SyntheticSpec:
+    """
+    Параметры синтетического seed:
+
+    models — число моделей верхнего уровня (synth_model_0 ... N-1)
+    rows — записей на модель
+    fanout — сколько __children__ у каждой записи (0 — без детей)
+    fk_density — сколько FK на предыдущие модели у каждой модели
+    """
+
+    models: int = 3
+    rows: int = 1000
+    fanout: int = 2
+    fk_density: int = 1
+    seed: int = 42
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "models": self.models,
+            "rows": self.rows,
+            "fanout": self.fanout,
+            "fk_density": self.fk_density,
+            "seed": self.seed,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class SyntheticSchema:
+    Base: Any
+    models: list[Any]
+    children: list[Any]
+
+
+def build_synthetic_models(spec: SyntheticSpec, schema: str | None = None) -> SyntheticSchema:
+    """
+    Создаёт набор ORM-моделей на отдельной MetaData (не пересекается с db.models).
+
+    Модель i ссылается FK на min(i, fk_density) предыдущих моделей,
+    у каждой модели есть дочерняя synth_child_i с FK на неё.
+    """
+    # sqlalchemy — только здесь: SyntheticSpec нужен bench_seed уже для --help
+    from sqlalchemy import JSON, Column, ForeignKey, Integer, MetaData, String
+    from sqlalchemy.orm import DeclarativeBase
+
+    class Base(DeclarativeBase):
+        metadata = MetaData(schema=schema)
+
+    def fk_target(table: str) -> str:
+        return f"{schema}.{table}.id" if schema else f"{table}.id"
+
+    models: list[Any] = []
+    children: list[Any] = []
+    for i in range(spec.models):
+        attrs: dict[str, Any] = {
+            "__tablename__": f"synth_model_{i}",
+            "id": Column(String, primary_key=True),
+            "name": Column(String, nullable=False),
+            "position": Column(Integer, nullable=False),
+            "payload": Column(JSON, nullable=True),
+        }
+        for j in range(max(0, i - spec.fk_density), i):
+            attrs[f"ref_{j}_id"] = Column(ForeignKey(fk_target(f"synth_model_{j}")), nullable=True)
+        models.append(type(f"SynthModel{i}", (Base,), attrs))
+
+        children.append(
+            type(
+                f"SynthChild{i}",
+                (Base,),
+                {
+                    "__tablename__": f"synth_child_{i}",
+                    "id": Column(String, primary_key=True),
+                    "parent_id": Column(ForeignKey(fk_target(f"synth_model_{i}")), nullable=False),
+                    "value": Column(String, nullable=False),
+                },
+            )
+        )
+
+    return SyntheticSchema(Base=Base, models=models, children=children)
+
+
+def generate_payload(spec: SyntheticSpec, schema: SyntheticSchema) -> dict[str, Any]:
+    """
+    Генерирует payload в формате seed JSON для моделей из build_synthetic_models.
+    """
+    rnd = random.Random(spec.seed)
+    payload: dict[str, Any] = {}
+
+    for i, Model in enumerate(schema.models):
+        fk_columns = [c.key for c in Model.__table__.columns if c.key.startswith("ref_")]
+        Child = schema.children[i]
+        rows: list[dict[str, Any]] = []
+        for n in range(spec.rows):
+            row: dict[str, Any] = {
+                KEY_FIELD: f"m{i}:{n}",
+                "name": f"model {i} row {n}",
+                "position": n,
+                "payload": {"tags": [f"t{n % 7}", f"t{n % 11}"], "weight": rnd.random()},
+            }
+            for fk in fk_columns:
+                target = int(fk.split("_")[1])
+                row[fk] = f"m{target}:{rnd.randrange(spec.rows)}"
+            if spec.fanout:
+                row[CHILDREN_FIELD] = {
+                    Child.__name__: [
+                        {KEY_FIELD: f"c{i}:{n}:{k}", "value": f"child {k} of {n}"} for k in range(spec.fanout)
+                    ]
+                }
+            rows.append(row)
+        payload[Model.__name__] = rows
+
+    return payload
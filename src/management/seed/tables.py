@@ -0,0 +1,60 @@
+"""
+Служебные таблицы seed (не модели приложения).
+
+Они не входят в metadata моделей и в миграции: их создаёт сама команда seed
+(ensure_seed_tables) перед записью. Чтобы `alembic revision --autogenerate` не
+предлагал их удалить, env.py проекта передаёт include_object:
+
+.. code-block:: python
+
+    from management.seed.tables import include_object
+
+    context.configure(..., include_object=include_object)
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+seed_metadata = MetaData()
+
+seed_ledger_table = Table(
+    "seed_ledger",
+    seed_metadata,
+    Column("source", String, primary_key=True),
+    Column("seed_key", String, primary_key=True),
+    Column("digest", String(64), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Одна строка на прогон (имя команды): до какой записи данные уже зафиксированы
+seed_checkpoint_table = Table(
+    "seed_checkpoint",
+    seed_metadata,
+    Column("run", String, primary_key=True),
+    Column("source", String, nullable=False),
+    Column("model", String, nullable=True),
+    Column("seed_key", String, nullable=True),
+    Column("rows", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+SEED_SERVICE_TABLES = frozenset(seed_metadata.tables)
+
+
+def include_object(obj: Any, name: str | None, type_: str, reflected: bool, compare_to: Any) -> bool:
+    """Хук include_object для alembic: служебные таблицы seed и их индексы не сравниваются."""
+    table = obj if type_ == "table" else getattr(obj, "table", None)
+    return getattr(table, "name", None) not in SEED_SERVICE_TABLES
+
+
+async def ensure_seed_tables(session: AsyncSession) -> None:
+    """CREATE TABLE IF NOT EXISTS для служебных таблиц; вызывается командой один раз перед записью."""
+    await session.run_sync(lambda s: seed_metadata.create_all(s.connection(), checkfirst=True))
+
+
+async def table_exists(session: AsyncSession, table: Table) -> bool:
+    return await session.scalar(select(cast(func.to_regclass(table.name), String))) is not None
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management.seed.bulk_copy import copy_upsert
+from management.seed.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_COPY_BATCH_SIZE,
+    DEFAULT_COPY_THRESHOLD,
+    PG_MAX_BIND_PARAMS,
+)
+from management.seed.diff import DIFF_KINDS, DIFF_UNCHANGED, classify_rows
+from management.seed.plan import ModelPlan
+from management.seed.stats import SeedStats
+
+
+@dataclass(frozen=True, slots=True)
+class WriteOptions:
+    """
+    Настройки записи seed-данных.
+
+    copy_threshold — после скольких строк модели она переключается на COPY (0 — никогда).
+    copy_models — модели, которые всегда пишутся через COPY (например, из manifest).
+    diff — перед записью сравнить строки с БД и писать только новые / изменённые.
+    dry_run — только сравнить и посчитать, ничего не писать (включает diff).
+    """
+
+    batch_size: int = DEFAULT_BATCH_SIZE
+    copy_threshold: int = DEFAULT_COPY_THRESHOLD
+    copy_models: frozenset[Any] = field(default_factory=frozenset)
+    copy_batch_size: int = DEFAULT_COPY_BATCH_SIZE
+    diff: bool = False
+    dry_run: bool = False
+
+
+def build_upsert(plan: ModelPlan, rows: list[dict[str, Any]]) -> Any:
+    """
+    Строит multi-row INSERT ... ON CONFLICT по первичному ключу.
+
+    ВАЖНО:
+    - все строки должны иметь одинаковый набор колонок
+    - если кроме PK обновлять нечего → ON CONFLICT DO NOTHING
+    """
+    stmt = pg_insert(plan.Model).values(rows)
+    update_cols = {k: stmt.excluded[k] for k in rows[0] if k not in plan.pk_keys}
+    if not update_cols:
+        return stmt.on_conflict_do_nothing(index_elements=plan.index_elements)
+    return stmt.on_conflict_do_update(index_elements=plan.index_elements, set_=update_cols)
+
+
+class BatchWriter:
+    """
+    Копит подготовленные строки и пишет их пачками multi-row INSERT ... ON CONFLICT.
+
+    Большие модели (copy_models или больше copy_threshold строк) пишутся через
+    COPY во временную таблицу + INSERT ... SELECT ... ON CONFLICT.
+
+    Строки группируются по модели и набору колонок (одна пачка = один запрос).
+    Порядок записи моделей = порядок их первого появления, поэтому гарантия
+    "родители → дети → join" из JSON сохраняется: при переполнении буфера модели
+    сначала сбрасываются все модели, появившиеся раньше неё.
+    """
+
+    def __init__(
+        self, session: AsyncSession, options: WriteOptions | None = None, stats: SeedStats | None = None
+    ) -> None:
+        options = options or WriteOptions()
+        if options.batch_size < 1:
+            raise RuntimeError(f"batch_size должен быть >= 1, получено: {options.batch_size}")
+        self.session = session
+        self.options = options
+        self.stats = stats
+        self.batch_size = options.batch_size
+        self.rows_written = 0
+        self.statements = 0
+        # имя модели -> {insert / update / unchanged: число строк}; заполняется в режиме diff
+        self.diff_report: dict[str, dict[str, int]] = {}
+        # Model -> (набор колонок -> (PK -> values)); dict сохраняет порядок появления
+        self._buffers: dict[Any, dict[tuple[str, ...], dict[Any, dict[str, Any]]]] = {}
+        self._pending: dict[Any, int] = {}
+        self._seen: dict[Any, int] = {}
+        self._copy: set[Any] = set(options.copy_models)
+        self._plans: dict[Any, ModelPlan] = {}
+        self._no_pk_seq = 0
+
+    async def add(self, plan: ModelPlan, values: dict[str, Any]) -> None:
+        Model = plan.Model
+        self._plans.setdefault(Model, plan)
+
+        pk = tuple(values.get(k) for k in plan.pk_keys)
+        if None in pk:
+            # PK заполнит БД — такие строки не схлопываем
+            self._no_pk_seq += 1
+            pk = (None, self._no_pk_seq)
+
+        groups = self._buffers.setdefault(Model, {})
+        rows = groups.setdefault(tuple(values), {})
+        if pk not in rows:
+            self._pending[Model] = self._pending.get(Model, 0) + 1
+        # Повтор PK внутри пачки: побеждает последняя запись (как при построчном upsert)
+        rows[pk] = values
+
+        seen = self._seen[Model] = self._seen.get(Model, 0) + 1
+        if self.options.copy_threshold and seen >= self.options.copy_threshold:
+            self._copy.add(Model)
+
+        limit = self.options.copy_batch_size if Model in self._copy else self.batch_size
+        if self._pending[Model] >= limit:
+            await self._flush_until(Model)
+
+    async def flush(self) -> None:
+        await self._flush_until(None)
+
+    async def _flush_until(self, last: Any) -> None:
+        for Model in list(self._buffers):
+            await self._flush_model(Model)
+            if Model is last:
+                break
+
+    async def _flush_model(self, Model: Any) -> None:
+        groups = self._buffers.get(Model)
+        if not groups:
+            return
+        # Модель остаётся на своём месте в порядке записи — очищаем только буфер
+        self._buffers[Model] = {}
+        self._pending[Model] = 0
+
+        plan = self._plans[Model]
+        started = time.perf_counter()
+        rows_written, statements = self.rows_written, self.statements
+        await self._write_groups(plan, groups)
+        if self.stats is not None:
+            self.stats.add_write(
+                Model, self.rows_written - rows_written, self.statements - statements, time.perf_counter() - started
+            )
+
+    async def _write_groups(self, plan: ModelPlan, groups: dict[tuple[str, ...], dict[Any, dict[str, Any]]]) -> None:
+        Model = plan.Model
+        for columns, rows_by_pk in groups.items():
+            rows = list(rows_by_pk.values())
+            if self.options.diff or self.options.dry_run:
+                rows = await self._diff(plan, columns, rows)
+                if self.options.dry_run or not rows:
+                    continue
+
+            if Model in self._copy:
+                await copy_upsert(self.session, plan, columns, rows)
+                self.statements += 1
+                self.rows_written += len(rows)
+                continue
+
+            chunk = max(1, min(self.batch_size, PG_MAX_BIND_PARAMS // max(1, len(columns))))
+            for start in range(0, len(rows), chunk):
+                part = rows[start : start + chunk]
+                await self.session.execute(build_upsert(plan, part))
+                self.statements += 1
+                self.rows_written += len(part)
+
+    async def _diff(
+        self, plan: ModelPlan, columns: tuple[str, ...], rows: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Оставляет только строки, которые реально отличаются от БД, и считает статистику.
+        """
+        kinds = await classify_rows(self.session, plan, columns, rows)
+        report = self.diff_report.setdefault(plan.Model.__name__, dict.fromkeys(DIFF_KINDS, 0))
+        for kind in kinds:
+            report[kind] += 1
+        return [row for row, kind in zip(rows, kinds, strict=True) if kind != DIFF_UNCHANGED]
@@ -6,15 +6,22 @@ from fastapi import APIRouter
 # Создаем корневой роутер
 routers = APIRouter()
 
-# Определяем путь, где будут лежать все модули с роутерами
-router_modules = [
-    module
-    for module in os.listdir(os.path.dirname(__file__))
-    if module.endswith("_router.py") and module != "__init__.py"
-]
+ROUTER_SUFFIX = "_router.py"
+
+# Список модулей с роутерами: из манифеста, собранного при сборке образа
+# (python manager.py build_route_manifest), иначе — сканированием папки
+try:
+    from ._manifest import ROUTER_MODULES
+except ImportError:
+    ROUTER_MODULES = tuple(
+        sorted(
+            module[:-3]  # Убираем расширение '.py'
+            for module in os.listdir(os.path.dirname(__file__))
+            if module.endswith(ROUTER_SUFFIX)
+        )
+    )
 
 # Импортируем каждый модуль динамически и добавляем его роутер
-for module in router_modules:
-    module_name = module[:-3]  # Убираем расширение '.py'
+for module_name in ROUTER_MODULES:
     router = importlib.import_module(f".{module_name}", package=__name__).router
     routers.include_router(router)
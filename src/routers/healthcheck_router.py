@@ -1,45 +1,75 @@
-# import sqlalchemy as sa
-from fastapi import APIRouter
-from fastapi.params import Depends
-# from redis import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import aclosing
+
+import sqlalchemy as sa
+from fastapi import APIRouter, Response
 from starlette import status
 from starlette.responses import JSONResponse
 
+from core.health import HealthMonitor
 from db.postgres.base import get_async_session
+
+# import asyncio
+# from redis import Redis
 # from db.redis.session_monitor import redis_pool
 # from db.s3.s3_aws import get_general_storage
 
 router = APIRouter(tags=["Health check"])
 
 
+async def check_db() -> None:
+    # aclosing — сессия возвращается в пул сразу, а не при сборке генератора
+    async with aclosing(get_async_session()) as sessions:
+        async for session in sessions:
+            await session.execute(sa.text("SELECT 1"))
+            break
+
+
+# async def check_redis() -> None:
+#     redis_client = Redis(connection_pool=redis_pool)
+#     await asyncio.to_thread(redis_client.ping)
+
+
+# async def check_s3() -> None:
+#     storage = await get_general_storage()
+#     if not await storage.ping():
+#         raise RuntimeError("endpoint или credentials недоступны")
+
+
+# Проверки запускаются фоновой задачей (старт / остановка — в lifespan приложения)
+health_monitor = HealthMonitor(
+    {
+        "db": check_db,
+        # "redis": check_redis,
+        # "s3": check_s3,
+    }
+)
+
+
+@router.get(
+    "/health/live",
+    description="Liveness: процесс жив и обслуживает запросы, зависимости не проверяются",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def liveness():
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/health/ready",
+    description="Readiness: последний результат фоновой проверки зависимостей (БД, Redis, S3)",
+)
+async def readiness():
+    ready, body = health_monitor.readiness()
+    return JSONResponse(body, status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 @router.get(
     "/health",
-    description="Возвращает статус сервера",
+    description="Возвращает статус сервера (то же, что /health/ready)",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-async def healthcheck(session: AsyncSession = Depends(get_async_session)):
-    errors: list[str] = []
-    # DB
-    # try:
-    #     await session.execute(sa.text("SELECT 1"))
-    # except Exception as exc:
-    #     errors.append(f"DB: {type(exc).__name__}: {exc}")
-    # Redis
-    # try:
-    #     redis_client = Redis(connection_pool=redis_pool)
-    #     redis_client.ping()
-    # except Exception as exc:
-    #     errors.append(f"Redis: {type(exc).__name__}: {exc}")
-    # S3
-    # try:
-    #     storage = await get_general_storage()
-    #     is_ok = await storage.ping()
-    #     if not is_ok:
-    #         errors.append("S3: endpoint или credentials недоступны")
-    # except Exception as exc:
-    #     errors.append(f"S3: {type(exc).__name__}: {exc}")
-
-    if errors:
-        return JSONResponse({"success": False, "errors": errors}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
-    return JSONResponse({"success": True}, status_code=status.HTTP_204_NO_CONTENT)
+async def healthcheck():
+    ready, body = health_monitor.readiness()
+    if not ready:
+        return JSONResponse(body, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
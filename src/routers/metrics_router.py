@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from core.metrics import CONTENT_TYPE, generate_latest
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    description="Метрики в формате Prometheus, агрегированные по всем воркерам",
+    include_in_schema=False,
+)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE)
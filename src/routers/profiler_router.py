@@ -0,0 +1,41 @@
+import asyncio
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from starlette.responses import PlainTextResponse
+
+from core.profiler import ProfilerBusyError, SamplingProfiler, profile_headers, profiler_config
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    # без PROFILER_TOKEN эндпоинта как будто нет
+    if not profiler_config.token:
+        raise HTTPException(status.HTTP_404_NOT_FOUND)
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, profiler_config.token):
+        raise HTTPException(status.HTTP_403_FORBIDDEN)
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post(
+    "/profile",
+    description=(
+        "Выборочное профилирование воркера, принявшего запрос. "
+        "Ответ — collapsed stacks для flamegraph, статистика выборки — в заголовках X-Profile-*"
+    ),
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def profile(
+    seconds: float = Query(default=10.0, gt=0, le=profiler_config.max_seconds),
+    rate: float = Query(default=profiler_config.default_rate, gt=0, le=profiler_config.max_rate),
+    tasks: bool = Query(default=True, description="Снимать стеки ожидающих asyncio-задач"),
+):
+    profiler = SamplingProfiler(seconds, rate, tasks=tasks, loop=asyncio.get_running_loop())
+    try:
+        result = await asyncio.to_thread(profiler.run)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(exc)) from exc
+    return PlainTextResponse(result.collapsed(), headers=profile_headers(result, os.getpid()))
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    # приложение работает на asyncio (uvicorn), trio не проверяем
+    return "asyncio"
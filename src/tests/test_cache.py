@@ -0,0 +1,313 @@
+import asyncio
+import fnmatch
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+import core.cache as cache_module
+from core.cache import CacheConfig, LRUCache, RedisCache, ResponseCache, cached, invalidates, make_key
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """In-memory замена redis.asyncio.Redis: только команды, которые использует RedisCache."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.data: dict[str, tuple[float, bytes]] = {}
+        self.calls: list[str] = []
+        self.fail = False
+
+    def _call(self, name: str) -> None:
+        self.calls.append(name)
+        if self.fail:
+            raise ConnectionError("redis is down")
+
+    async def get(self, key: str) -> bytes | None:
+        self._call("get")
+        item = self.data.get(key)
+        if item is None or item[0] <= self.clock.now:
+            return None
+        return item[1]
+
+    async def set(self, key: str, value: str, px: int) -> None:
+        self._call("set")
+        self.data[key] = (self.clock.now + px / 1000, value.encode())
+
+    async def unlink(self, *keys: str) -> None:
+        self._call("unlink")
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match: str, count: int):
+        self._call("scan")
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def aclose(self) -> None:
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    # часы подменяются только в core.cache: event loop продолжает жить по настоящим
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def fake_redis(clock: FakeClock) -> FakeRedis:
+    return FakeRedis(clock)
+
+
+def make_cache(redis: FakeRedis | None = None, **config) -> ResponseCache:
+    tier = None
+    if redis is not None:
+        tier = RedisCache("redis://fake", timeout=1.0, prefix="test:")
+        tier._client = redis
+    return ResponseCache(CacheConfig(**config), redis=tier)
+
+
+class Loader:
+    def __init__(self, value="value", delay: float = 0.0) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self.started = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_lru_expires_entries(clock: FakeClock) -> None:
+    lru = LRUCache(max_entries=10)
+    lru.set("a", 1, ttl=5)
+    assert lru.get("a") == 1
+    clock.now += 5
+    assert lru.get("a") is cache_module._MISSING
+    assert len(lru) == 0
+
+
+def test_lru_evicts_least_recently_used(clock: FakeClock) -> None:
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.get("a")
+    lru.set("c", 3, ttl=60)
+    assert lru.get("b") is cache_module._MISSING
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+
+def test_lru_delete_prefix(clock: FakeClock) -> None:
+    lru = LRUCache(max_entries=10)
+    for key in ("items:1", "items:2", "users:1"):
+        lru.set(key, key, ttl=60)
+    lru.delete_prefix("items:")
+    assert len(lru) == 1
+    assert lru.get("users:1") == "users:1"
+
+
+async def test_memory_tier_hit_and_ttl(clock: FakeClock) -> None:
+    cache = make_cache(ttl=10)
+    loader = Loader({"id": 1})
+
+    assert await cache.get_or_set("items", "1", loader) == {"id": 1}
+    assert await cache.get_or_set("items", "1", loader) == {"id": 1}
+    assert loader.calls == 1
+
+    clock.now += 10
+    await cache.get_or_set("items", "1", loader)
+    assert loader.calls == 2
+
+
+async def test_values_are_json_encoded(clock: FakeClock) -> None:
+    cache = make_cache()
+    assert await cache.get_or_set("items", "1", Loader((1, 2))) == [1, 2]
+
+
+async def test_redis_tier_is_shared(clock: FakeClock, fake_redis: FakeRedis) -> None:
+    # два воркера — два ResponseCache над одним Redis
+    first = make_cache(fake_redis, ttl=30, local_ttl=5)
+    second = make_cache(fake_redis, ttl=30, local_ttl=5)
+    loader = Loader({"id": 1})
+
+    await first.get_or_set("items", "1", loader)
+    assert "test:items:1" in fake_redis.data
+
+    assert await second.get_or_set("items", "1", loader) == {"id": 1}
+    assert loader.calls == 1
+
+
+async def test_redis_tier_caps_local_ttl(clock: FakeClock, fake_redis: FakeRedis) -> None:
+    cache = make_cache(fake_redis, ttl=30, local_ttl=5)
+    loader = Loader()
+    await cache.get_or_set("items", "1", loader)
+
+    clock.now += 6  # в памяти истекло, в Redis — нет
+    fake_redis.calls.clear()
+    await cache.get_or_set("items", "1", loader)
+    assert loader.calls == 1
+    assert fake_redis.calls == ["get"]
+
+
+async def test_single_flight_coalesces_concurrent_misses(clock: FakeClock) -> None:
+    cache = make_cache()
+    loader = Loader("shared", delay=0.05)
+
+    results = await asyncio.gather(*(cache.get_or_set("items", "1", loader) for _ in range(20)))
+
+    assert results == ["shared"] * 20
+    assert loader.calls == 1
+    assert not cache._inflight
+
+
+async def test_single_flight_propagates_errors(clock: FakeClock) -> None:
+    cache = make_cache()
+    started = asyncio.Event()
+
+    async def failing():
+        started.set()
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    owner = asyncio.create_task(cache.get_or_set("items", "1", failing))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_set("items", "1", Loader()))
+
+    for task in (owner, waiter):
+        with pytest.raises(ValueError, match="boom"):
+            await task
+    assert not cache._inflight
+
+
+async def test_waiters_reload_when_owner_is_cancelled(clock: FakeClock) -> None:
+    cache = make_cache()
+    slow = Loader("owner", delay=10)
+    owner = asyncio.create_task(cache.get_or_set("items", "1", slow))
+    await slow.started.wait()
+
+    fallback = Loader("waiter")
+    waiter = asyncio.create_task(cache.get_or_set("items", "1", fallback))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert await waiter == "waiter"
+    assert fallback.calls == 1
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+
+async def test_cancelled_waiter_does_not_cancel_load(clock: FakeClock) -> None:
+    cache = make_cache()
+    loader = Loader("value", delay=0.05)
+    owner = asyncio.create_task(cache.get_or_set("items", "1", loader))
+    await loader.started.wait()
+
+    waiter = asyncio.create_task(cache.get_or_set("items", "1", loader))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await owner == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+
+async def test_invalidate_during_load_discards_result(clock: FakeClock, fake_redis: FakeRedis) -> None:
+    cache = make_cache(fake_redis)
+    stale = Loader("stale", delay=0.05)
+    load = asyncio.create_task(cache.get_or_set("items", "1", stale))
+    await stale.started.wait()
+
+    await cache.invalidate("items", "1")
+
+    # запрос, начавший загрузку, получает свой результат, но в кэш он не попадает
+    assert await load == "stale"
+    assert "test:items:1" not in fake_redis.data
+    assert await cache.get_or_set("items", "1", Loader("fresh")) == "fresh"
+
+
+async def test_invalidate_namespace(clock: FakeClock, fake_redis: FakeRedis) -> None:
+    cache = make_cache(fake_redis)
+    await cache.get_or_set("items", "1", Loader())
+    await cache.get_or_set("items", "2", Loader())
+    await cache.get_or_set("users", "1", Loader())
+
+    await cache.invalidate("items")
+
+    assert sorted(fake_redis.data) == ["test:users:1"]
+    loader = Loader()
+    await cache.get_or_set("items", "1", loader)
+    await cache.get_or_set("users", "1", loader)
+    assert loader.calls == 1
+
+
+async def test_redis_errors_back_off(clock: FakeClock, fake_redis: FakeRedis) -> None:
+    cache = make_cache(fake_redis, redis_retry=5)
+    fake_redis.fail = True
+    loader = Loader()
+
+    # ошибка Redis не ломает запрос: значение загружается и кэшируется в памяти
+    assert await cache.get_or_set("items", "1", loader) == "value"
+    assert fake_redis.calls == ["get"]
+
+    # в паузе redis_retry Redis не трогаем
+    await cache.get_or_set("items", "2", loader)
+    assert fake_redis.calls == ["get"]
+    assert loader.calls == 2
+
+    clock.now += 5
+    fake_redis.fail = False
+    await cache.get_or_set("items", "3", loader)
+    assert fake_redis.calls == ["get", "get", "set"]
+    assert "test:items:3" in fake_redis.data
+
+
+async def test_cached_endpoint(clock: FakeClock) -> None:
+    cache = make_cache()
+    calls = []
+
+    class Session:
+        pass
+
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    @cached("items", cache=cache)
+    async def get_item(item_id: int, q: str | None = None, session: Session = Depends(Session)):
+        calls.append((item_id, q))
+        return {"id": item_id, "q": q}
+
+    @app.post("/items")
+    @invalidates("items", cache=cache)
+    def create_item():
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        for _ in range(2):
+            assert (await client.get("/items/1", params={"q": "a"})).json() == {"id": 1, "q": "a"}
+        await client.get("/items/2")
+        assert calls == [(1, "a"), (2, None)]
+
+        # ключ — параметры запроса; зависимость (session) в него не входит
+        assert cache.memory.get(cache.full_key("items", make_key(item_id=1, q="a"))) == {"id": 1, "q": "a"}
+
+        await client.post("/items")
+        await client.get("/items/1", params={"q": "a"})
+        assert calls == [(1, "a"), (2, None), (1, "a")]
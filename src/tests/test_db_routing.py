@@ -0,0 +1,219 @@
+import pytest
+from asgi_correlation_id.context import correlation_id
+
+pytest.importorskip("db.postgres.base")  # get_async_session приходит из пакета db
+
+import core.db_routing as db_routing  # noqa: E402
+from core.db_routing import DBRoutingConfig, ReplicaRouter, get_read_session, get_write_session  # noqa: E402
+
+pytestmark = pytest.mark.anyio
+
+DSNS = "postgresql+asyncpg://u:p@replica1/app, postgresql+asyncpg://u:p@replica2/app"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeSession:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+
+class Primary:
+    """Замена get_async_session из пакета db: запоминает, что генератору передали."""
+
+    def __init__(self) -> None:
+        self.errors: list[BaseException] = []
+        self.closed = 0
+
+    async def get_async_session(self):
+        try:
+            yield FakeSession("primary")
+        except Exception as exc:
+            self.errors.append(exc)
+            raise
+        finally:
+            self.closed += 1
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(db_routing, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def primary(monkeypatch: pytest.MonkeyPatch) -> Primary:
+    primary = Primary()
+    monkeypatch.setattr(db_routing, "get_async_session", primary.get_async_session)
+    return primary
+
+
+@pytest.fixture
+def cid():
+    token = correlation_id.set("request-1")
+    yield "request-1"
+    correlation_id.reset(token)
+
+
+def make_router(monkeypatch: pytest.MonkeyPatch, lags: dict, **config) -> ReplicaRouter:
+    """Роутер с репликами без сети: отставание берётся из lags (исключение — реплика недоступна)."""
+    router = ReplicaRouter(DBRoutingConfig(**{"replica_dsns": DSNS, "max_lag": 1.0, **config}))
+    for replica in router.replicas:
+
+        async def measure_lag(replica=replica) -> float:
+            lag = lags[replica.name]
+            if isinstance(lag, Exception):
+                raise lag
+            return lag
+
+        async def close() -> None:
+            pass
+
+        replica.open = lambda pool_size, max_overflow, replica=replica: setattr(
+            replica, "sessionmaker", lambda: FakeSession(replica.name)
+        )
+        replica.measure_lag = measure_lag
+        replica.close = close
+    monkeypatch.setattr(db_routing, "replica_router", router)
+    return router
+
+
+@pytest.fixture
+def lags() -> dict:
+    return {"replica1:5432/app": 0.1, "replica2:5432/app": 0.2}
+
+
+async def read() -> str:
+    sessions = get_read_session()
+    session = await anext(sessions)
+    await sessions.aclose()
+    return session.name
+
+
+async def write() -> None:
+    sessions = get_write_session()
+    await anext(sessions)
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+
+async def test_round_robin(monkeypatch, primary, lags) -> None:
+    router = make_router(monkeypatch, lags)
+    await router.start()
+    try:
+        assert [await read() for _ in range(4)] == [
+            "replica1:5432/app",
+            "replica2:5432/app",
+            "replica1:5432/app",
+            "replica2:5432/app",
+        ]
+    finally:
+        await router.stop()
+
+
+async def test_lagging_replica_is_excluded(monkeypatch, primary, lags) -> None:
+    router = make_router(monkeypatch, lags)
+    await router.start()
+    try:
+        lags["replica2:5432/app"] = 5.0
+        await router.refresh()
+        assert {await read() for _ in range(4)} == {"replica1:5432/app"}
+
+        lags["replica2:5432/app"] = 0.5
+        await router.refresh()
+        assert {await read() for _ in range(4)} == {"replica1:5432/app", "replica2:5432/app"}
+    finally:
+        await router.stop()
+
+
+async def test_fallback_to_primary(monkeypatch, primary, lags) -> None:
+    router = make_router(monkeypatch, lags)
+    assert router.route() == (None, "fallback")  # монитор не запущен
+
+    await router.start()
+    try:
+        lags["replica1:5432/app"] = ConnectionError("refused")
+        lags["replica2:5432/app"] = 5.0
+        await router.refresh()
+        assert router.route() == (None, "fallback")
+        assert await read() == "primary"
+        assert router.replicas[0].as_dict() == {
+            "healthy": False,
+            "lag_seconds": None,
+            "error": "ConnectionError: refused",
+        }
+    finally:
+        await router.stop()
+
+
+async def test_without_replicas_everything_goes_to_primary(monkeypatch, primary, cid) -> None:
+    router = ReplicaRouter(DBRoutingConfig(replica_dsns=""))
+    monkeypatch.setattr(db_routing, "replica_router", router)
+    await router.start()
+
+    for i in range(1000):
+        correlation_id.set(f"request-{i}")
+        await write()
+    assert router._sticky == {}
+    assert router.route() == (None, "primary")
+    assert await read() == "primary"
+
+
+async def test_reads_stick_to_primary_after_write(monkeypatch, primary, lags, clock, cid) -> None:
+    router = make_router(monkeypatch, lags, sticky_seconds=10)
+    await router.start()
+    try:
+        await write()
+        assert router.route() == (None, "sticky")
+        assert await read() == "primary"
+
+        # другой запрос привязку не наследует
+        token = correlation_id.set("request-2")
+        assert await read() != "primary"
+        correlation_id.reset(token)
+
+        clock.now += 10
+        assert await read() != "primary"
+    finally:
+        await router.stop()
+
+
+async def test_expired_sticky_entries_are_pruned_on_write(monkeypatch, lags, clock, cid) -> None:
+    router = make_router(monkeypatch, lags, sticky_seconds=10)
+    for i in range(100):
+        correlation_id.set(f"request-{i}")
+        router.mark_write()
+    assert len(router._sticky) == 100
+
+    clock.now += 5
+    correlation_id.set("request-0")
+    router.mark_write()  # продление переставляет запись в конец
+    clock.now += 5
+    correlation_id.set("request-new")
+    router.mark_write()
+    assert list(router._sticky) == ["request-0", "request-new"]
+
+
+async def test_error_is_passed_to_primary_session(monkeypatch, primary, lags, cid) -> None:
+    make_router(monkeypatch, lags)
+
+    sessions = get_write_session()
+    await anext(sessions)
+    with pytest.raises(ValueError, match="boom"):
+        await sessions.athrow(ValueError("boom"))
+
+    assert [str(exc) for exc in primary.errors] == ["boom"]
+    assert primary.closed == 1